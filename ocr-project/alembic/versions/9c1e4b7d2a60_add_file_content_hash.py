@@ -0,0 +1,46 @@
+"""add file content hash
+
+Revision ID: 9c1e4b7d2a60
+Revises: f370356ed716
+Create Date: 2026-10-18 09:12:40.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e4b7d2a60"
+down_revision: Union[str, Sequence[str], None] = "f370356ed716"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "files",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_files_content_hash"),
+        "files",
+        ["content_hash"],
+        unique=False,
+    )
+    # Duplicate uploads share the stored blob of the original file.
+    op.drop_constraint(op.f("files_storage_path_key"), "files", type_="unique")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint(
+        op.f("files_storage_path_key"),
+        "files",
+        ["storage_path"],
+    )
+    op.drop_index(op.f("ix_files_content_hash"), table_name="files")
+    op.drop_column("files", "content_hash")
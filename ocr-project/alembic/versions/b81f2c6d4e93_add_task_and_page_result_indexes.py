@@ -0,0 +1,97 @@
+"""add task and page result indexes
+
+Revision ID: b81f2c6d4e93
+Revises: 3d7a5f0c8e21
+Create Date: 2026-10-18 12:21:40.518337
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f2c6d4e93"
+down_revision: Union[str, Sequence[str], None] = "3d7a5f0c8e21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Retried page ranges may have stored a page twice. Keep the newest row
+    # so the unique index below can be built.
+    op.execute(
+        """
+        DELETE FROM page_results AS older
+        USING page_results AS newer
+        WHERE older.file_id = newer.file_id
+          AND older.page_number = newer.page_number
+          AND (older.created_at, older.id) < (newer.created_at, newer.id)
+        """
+    )
+    # Built concurrently so writers are not blocked while large tables are
+    # indexed. CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_page_results_task_id"),
+            "page_results",
+            ["task_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "uq_page_results_file_id_page_number",
+            "page_results",
+            ["file_id", "page_number"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_tasks_file_id"),
+            "tasks",
+            ["file_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_status_active",
+            "tasks",
+            ["status"],
+            unique=False,
+            postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')"),
+            postgresql_concurrently=True,
+        )
+    # Promoting the finished index to a constraint only takes a brief lock.
+    op.execute(
+        "ALTER TABLE page_results"
+        " ADD CONSTRAINT uq_page_results_file_id_page_number"
+        " UNIQUE USING INDEX uq_page_results_file_id_page_number"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "uq_page_results_file_id_page_number",
+        "page_results",
+        type_="unique",
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_status_active",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_tasks_file_id"),
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_page_results_task_id"),
+            table_name="page_results",
+            postgresql_concurrently=True,
+        )
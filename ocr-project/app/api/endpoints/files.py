@@ -1,25 +1,40 @@
+import asyncio
 import logging
+import time
 import uuid
+from collections.abc import Iterable
 from http import HTTPStatus
 from pathlib import Path
+from typing import Any
 
-from celery.exceptions import CeleryError
 from fastapi import APIRouter, Depends, File, UploadFile
 from fastapi.responses import JSONResponse
 from minio.error import S3Error
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constant.constant import BUCKET_FILE_STORAGE
-from app.db.dependencies import get_db_session
+from app.core.config import settings
+from app.core.metrics import (
+    DEDUPE_HITS,
+    DEDUPE_LOOKUPS,
+    FILE_BYTES_UPLOADED,
+    UPLOAD_DATABASE_SECONDS,
+    UPLOAD_STORAGE_SECONDS,
+)
+from app.core.tracing import tracer
+from app.db.dependencies import get_async_db_session
 from app.models.file import File as FileModel
 from app.models.task import Task, TaskStatus
 from app.repository.file_repository import file_repo
+from app.repository.outbox_repository import outbox_repo
+from app.repository.page_result_repository import page_result_repo
 from app.repository.task_repository import task_repo
 from app.services.file.file_service import FileService
 from app.services.minio.minio_service import get_minio_client
 from app.storage.file_storage import FileStorage
 from app.worker.file_process_worker import process_file
+from app.worker.routing import queue_for
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +46,39 @@ file_storage = FileStorage(get_minio_client())
 router = APIRouter()
 
 
+def unsupported_type_message(content_type: str | None) -> str:
+    return (
+        f"File type '{content_type}' is not allowed."
+        " Please upload a PDF, PNG, or JPG."
+    )
+
+
 @router.post("/files", status_code=HTTPStatus.CREATED)
 async def upload_file(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_db_session),
 ) -> JSONResponse:
     if not file_service.is_allowed_file_type(file.content_type):
         return JSONResponse(
             status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
             content={
                 "code": HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
-                "message": f"File type '{file.content_type}' is not allowed."
-                f" Please upload a PDF, PNG, or JPG.",
+                "message": unsupported_type_message(file.content_type),
             },
         )
 
     file_id = uuid.uuid4()
-    file_extension = Path(file.filename).suffix
+    file_extension = Path(file.filename or "").suffix
     storage_path = f"{file_id!s}{file_extension}"
 
     try:
-        await file_storage.upload_file(file, storage_path, BUCKET_FILE_STORAGE)
+        with UPLOAD_STORAGE_SECONDS.time():
+            content_hash = await file_storage.upload_file(
+                file,
+                storage_path,
+                BUCKET_FILE_STORAGE,
+            )
+        FILE_BYTES_UPLOADED.inc(file.size or 0)
     except S3Error as e:
         return JSONResponse(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -66,27 +93,56 @@ async def upload_file(
         filename=file.filename,
         storage_path=storage_path,
         file_type=file.content_type,
+        content_hash=content_hash,
     )
 
+    database_started = time.perf_counter()
     try:
-        saved_file = file_repo.add(db, file_model)
+        DEDUPE_LOOKUPS.inc()
+        original = await db.run_sync(
+            file_repo.get_processed_by_content_hash,
+            content_hash,
+        )
+        if original:
+            # Share the blob and results of the earlier upload instead of
+            # running OCR again.
+            file_model.storage_path = original.storage_path
+            file_model.total_pages = original.total_pages
+
+        saved_file = await db.run_sync(file_repo.add, file_model)
 
         task_model = Task(
             file_id=saved_file.id,
-            status=TaskStatus.PENDING,
+            status=TaskStatus.COMPLETED if original else TaskStatus.PENDING,
         )
-        saved_task = task_repo.add(db, task_model)
+        saved_task = await db.run_sync(task_repo.add, task_model)
 
-        process_file.delay(saved_task.id)
+        if original:
+            await db.run_sync(
+                page_result_repo.copy_to,
+                original.id,
+                saved_task.id,
+                saved_file.id,
+            )
+        else:
+            # Published by the outbox dispatcher once this commit is
+            # visible, never for a task that was rolled back.
+            await db.run_sync(
+                outbox_repo.add,
+                process_file.name,
+                [str(saved_task.id)],
+                queue_for(file.content_type, file.size),
+                tracer.inject(),
+            )
 
-        db.commit()
-        db.refresh(saved_task)
+        await db.commit()
+        UPLOAD_DATABASE_SECONDS.observe(time.perf_counter() - database_started)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.exception(
             "Failed to save file metadata or task to database",
         )
-        get_minio_client().remove_object(BUCKET_FILE_STORAGE, storage_path)
+        await file_storage.remove_file(storage_path, BUCKET_FILE_STORAGE)
         return JSONResponse(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             content={
@@ -94,29 +150,29 @@ async def upload_file(
                 "message": f"Failed to save file metadata to database: {e}",
             },
         )
-    except CeleryError as e:
-        db.rollback()
-        logger.exception(
-            "Failed to queue task for file %s",
-            saved_file.id,
-        )
-        get_minio_client().remove_object(BUCKET_FILE_STORAGE, storage_path)
+    except Exception:
+        await db.rollback()
+        logger.exception("Failed to save file metadata to database")
+        await file_storage.remove_file(storage_path, BUCKET_FILE_STORAGE)
         return JSONResponse(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             content={
                 "code": HTTPStatus.INTERNAL_SERVER_ERROR,
-                "message": f"Failed to queue file processing task: {e}",
+                "message": "Server error occurred while processing the file.",
             },
         )
-    except Exception:
-        db.rollback()
-        logger.exception("Failed to save file metadata to database")
-        get_minio_client().remove_object(BUCKET_FILE_STORAGE, storage_path)
+
+    if original:
+        DEDUPE_HITS.inc()
+        await file_storage.remove_file(storage_path, BUCKET_FILE_STORAGE)
         return JSONResponse(
-            status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
+            status_code=HTTPStatus.CREATED,
             content={
-                "code": HTTPStatus.INTERNAL_SERVER_ERROR,
-                "message": "Server error occurred while processing the file.",
+                "message": "Identical file was already processed; "
+                "reusing its results.",
+                "task_id": str(saved_task.id),
+                "filename": file.filename,
+                "status": TaskStatus.COMPLETED.value,
             },
         )
 
@@ -129,3 +185,249 @@ async def upload_file(
             "status": TaskStatus.PENDING.value,
         },
     )
+
+
+@router.post("/files/batch", status_code=HTTPStatus.CREATED)
+async def upload_files(
+    files: list[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> JSONResponse:
+    if len(files) > settings.UPLOAD_BATCH_MAX_FILES:
+        return JSONResponse(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "code": HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                "message": "A batch may contain at most "
+                f"{settings.UPLOAD_BATCH_MAX_FILES} files.",
+            },
+        )
+
+    # One result per uploaded file, in request order. A file that fails
+    # validation, storage or queueing is reported without failing the rest.
+    results: list[dict[str, Any]] = [
+        {"filename": file.filename} for file in files
+    ]
+    accepted: list[int] = []
+    for index, file in enumerate(files):
+        if file_service.is_allowed_file_type(file.content_type):
+            accepted.append(index)
+        else:
+            results[index].update(
+                code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                message=unsupported_type_message(file.content_type),
+            )
+
+    with UPLOAD_STORAGE_SECONDS.time():
+        file_models = await upload_batch_to_storage(files, accepted, results)
+    FILE_BYTES_UPLOADED.inc(
+        sum(files[index].size or 0 for index in file_models),
+    )
+    if file_models:
+        queues = {
+            index: queue_for(files[index].content_type, files[index].size)
+            for index in file_models
+        }
+        with UPLOAD_DATABASE_SECONDS.time():
+            saved = await save_batch(db, file_models, queues, results)
+        if saved is not None:
+            duplicates, new_tasks = saved
+            await finish_duplicates(file_models, duplicates, results)
+            accept_new_tasks(new_tasks, results)
+
+    created = sum(result["code"] == HTTPStatus.CREATED for result in results)
+    status_code = (
+        HTTPStatus.CREATED
+        if created == len(results)
+        else HTTPStatus.MULTI_STATUS
+    )
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "message": f"Accepted {created} of {len(results)} files.",
+            "results": results,
+        },
+    )
+
+
+async def upload_batch_to_storage(
+    files: list[UploadFile],
+    accepted: list[int],
+    results: list[dict[str, Any]],
+) -> dict[int, FileModel]:
+    # Uploads run concurrently, bounded by the storage executor.
+    file_models: dict[int, FileModel] = {}
+    for index in accepted:
+        file_id = uuid.uuid4()
+        file_extension = Path(files[index].filename or "").suffix
+        file_models[index] = FileModel(
+            id=file_id,
+            filename=files[index].filename,
+            storage_path=f"{file_id!s}{file_extension}",
+            file_type=files[index].content_type,
+        )
+    outcomes = await asyncio.gather(
+        *(
+            file_storage.upload_file(
+                files[index],
+                file_model.storage_path,
+                BUCKET_FILE_STORAGE,
+            )
+            for index, file_model in file_models.items()
+        ),
+        return_exceptions=True,
+    )
+    for index, outcome in zip(list(file_models), outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            del file_models[index]
+            results[index].update(
+                code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                message=f"Failed to upload file to storage: {outcome}",
+            )
+        else:
+            file_models[index].content_hash = outcome
+    return file_models
+
+
+async def save_batch(
+    db: AsyncSession,
+    file_models: dict[int, FileModel],
+    queues: dict[int, str],
+    results: list[dict[str, Any]],
+) -> tuple[dict[int, Task], dict[int, Task]] | None:
+    # Files, tasks and outbox messages go in with bulk inserts and a single
+    # commit. Returns the tasks that reuse earlier results and the tasks
+    # that need OCR.
+    duplicates: dict[int, Task] = {}
+    new_tasks: dict[int, Task] = {}
+    content_hashes = {
+        index: file_model.content_hash
+        for index, file_model in file_models.items()
+        if file_model.content_hash is not None
+    }
+    try:
+        DEDUPE_LOOKUPS.inc(len(file_models))
+        originals = await db.run_sync(
+            file_repo.get_processed_by_content_hashes,
+            set(content_hashes.values()),
+        )
+        file_rows = []
+        for index, file_model in file_models.items():
+            original = originals.get(content_hashes[index])
+            file_rows.append(
+                {
+                    "id": file_model.id,
+                    "filename": file_model.filename,
+                    "storage_path": original.storage_path
+                    if original
+                    else file_model.storage_path,
+                    "file_type": file_model.file_type,
+                    "content_hash": file_model.content_hash,
+                    "total_pages": original.total_pages if original else None,
+                },
+            )
+            task = Task(
+                id=uuid.uuid4(),
+                file_id=file_model.id,
+                status=TaskStatus.COMPLETED
+                if original
+                else TaskStatus.PENDING,
+            )
+            if original:
+                duplicates[index] = task
+            else:
+                new_tasks[index] = task
+
+        await db.run_sync(file_repo.add_many, file_rows)
+        await db.run_sync(
+            task_repo.add_many,
+            [
+                {"id": task.id, "file_id": task.file_id, "status": task.status}
+                for task in (*duplicates.values(), *new_tasks.values())
+            ],
+        )
+        headers = tracer.inject()
+        await db.run_sync(
+            outbox_repo.add_many,
+            [
+                {
+                    "task_name": process_file.name,
+                    "args": [str(task.id)],
+                    "queue": queues[index],
+                    "headers": headers,
+                }
+                for index, task in new_tasks.items()
+            ],
+        )
+        await db.run_sync(
+            page_result_repo.copy_many,
+            [
+                (
+                    originals[content_hashes[index]].id,
+                    task.id,
+                    task.file_id,
+                )
+                for index, task in duplicates.items()
+            ],
+        )
+
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.exception("Failed to save batch metadata to database")
+        await remove_uploaded(
+            file_model.storage_path for file_model in file_models.values()
+        )
+        for index in file_models:
+            results[index].update(
+                code=HTTPStatus.INTERNAL_SERVER_ERROR,
+                message=f"Failed to save file metadata to database: {e}",
+            )
+        return None
+    return duplicates, new_tasks
+
+
+async def finish_duplicates(
+    file_models: dict[int, FileModel],
+    duplicates: dict[int, Task],
+    results: list[dict[str, Any]],
+) -> None:
+    if not duplicates:
+        return
+    DEDUPE_HITS.inc(len(duplicates))
+    await remove_uploaded(
+        file_models[index].storage_path for index in duplicates
+    )
+    for index, task in duplicates.items():
+        results[index].update(
+            code=HTTPStatus.CREATED,
+            message="Identical file was already processed; "
+            "reusing its results.",
+            task_id=str(task.id),
+            status=TaskStatus.COMPLETED.value,
+        )
+
+
+def accept_new_tasks(
+    new_tasks: dict[int, Task],
+    results: list[dict[str, Any]],
+) -> None:
+    for index, task in new_tasks.items():
+        results[index].update(
+            code=HTTPStatus.CREATED,
+            message="File upload accepted and is being processed.",
+            task_id=str(task.id),
+            status=TaskStatus.PENDING.value,
+        )
+
+
+async def remove_uploaded(storage_paths: Iterable[str]) -> None:
+    outcomes = await asyncio.gather(
+        *(
+            file_storage.remove_file(storage_path, BUCKET_FILE_STORAGE)
+            for storage_path in storage_paths
+        ),
+        return_exceptions=True,
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            logger.warning("Failed to remove uploaded file: %s", outcome)
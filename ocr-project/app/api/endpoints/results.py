@@ -0,0 +1,159 @@
+import hashlib
+import uuid
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constant.constant import BUCKET_RESULT_STORAGE
+from app.core.config import settings
+from app.core.executors import run_in_executor, storage_executor
+from app.db.dependencies import get_async_db_session
+from app.db.session import AsyncSessionLocal
+from app.models import PageResult
+from app.repository.page_result_repository import page_result_repo
+from app.repository.task_repository import task_repo
+from app.services.minio.minio_service import get_minio_client
+from app.services.result.result_service import (
+    RangeNotSatisfiableError,
+    ResultService,
+    etag_matches,
+    page_record,
+    parse_byte_range,
+    parse_page_range,
+)
+from app.storage.result_storage import ResultStorage
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+result_storage = ResultStorage(get_minio_client())
+result_service = ResultService(
+    result_storage,
+    BUCKET_RESULT_STORAGE,
+    settings.RESULT_STREAM_PREFETCH,
+    settings.RESULT_STREAM_SEGMENT_BYTES,
+)
+
+router = APIRouter()
+
+
+def task_not_found(task_id: uuid.UUID) -> JSONResponse:
+    return JSONResponse(
+        status_code=HTTPStatus.NOT_FOUND,
+        content={
+            "code": HTTPStatus.NOT_FOUND,
+            "message": f"Task with ID {task_id} not found.",
+        },
+    )
+
+
+def result_etag(page: PageResult) -> str:
+    # A reprocessed page may be written to the same object, so the location
+    # is combined with the time the row was last written; upserts move it.
+    # A 304 then needs no storage round trip.
+    location = (
+        f"{page.result_path}:{page.result_offset}:{page.result_length}"
+        f":{page.updated_at.isoformat()}"
+    )
+    return f'"{hashlib.sha256(location.encode()).hexdigest()[:32]}"'
+
+
+@router.get("/tasks/{task_id}/results")
+async def get_task_results(
+    task_id: uuid.UUID,
+    pages: str | None = None,
+) -> Response:
+    first_page = last_page = None
+    if pages:
+        try:
+            first_page, last_page = parse_page_range(pages)
+        except ValueError:
+            return JSONResponse(
+                status_code=HTTPStatus.BAD_REQUEST,
+                content={
+                    "code": HTTPStatus.BAD_REQUEST,
+                    "message": f"Invalid page range '{pages}'."
+                    " Use a page number or a range such as 10-20.",
+                },
+            )
+
+    # The session is closed before streaming starts; a long stream must not
+    # hold a pooled connection.
+    async with AsyncSessionLocal() as db:
+        task = await db.run_sync(task_repo.get_by_id, task_id)
+        if not task:
+            return task_not_found(task_id)
+        locations = await db.run_sync(
+            page_result_repo.get_locations,
+            task_id,
+            first_page,
+            last_page,
+        )
+    return StreamingResponse(
+        result_service.stream_ndjson(locations),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.get("/tasks/{task_id}/results/{page_number}")
+async def get_page_result(
+    task_id: uuid.UUID,
+    page_number: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    page = await db.run_sync(
+        page_result_repo.get_by_task_and_page,
+        task_id,
+        page_number,
+    )
+    if not page:
+        return JSONResponse(
+            status_code=HTTPStatus.NOT_FOUND,
+            content={
+                "code": HTTPStatus.NOT_FOUND,
+                "message": f"Page {page_number} of task {task_id} not found.",
+            },
+        )
+
+    etag = result_etag(page)
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+
+    # Records may be stored compressed, so ranges are cut from the decoded
+    # record rather than requested from storage.
+    text = await run_in_executor(
+        storage_executor,
+        result_storage.read_page_text,
+        page.result_path,
+        BUCKET_RESULT_STORAGE,
+        page.result_offset,
+        page.result_length if page.result_offset is not None else None,
+    )
+    data = page_record(page.page_number, text)
+    size = len(data)
+
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    first, last = byte_range or (0, size - 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    return Response(
+        content=data[first : last + 1],
+        status_code=HTTPStatus.PARTIAL_CONTENT
+        if byte_range
+        else HTTPStatus.OK,
+        media_type="application/json",
+        headers=headers,
+    )
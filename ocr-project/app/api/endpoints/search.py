@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constant.constant import BUCKET_RESULT_STORAGE
+from app.core.config import settings
+from app.db.dependencies import get_async_db_session
+from app.services.minio.minio_service import get_minio_client
+from app.services.search.search_service import (
+    InvalidCursorError,
+    SearchService,
+)
+from app.storage.result_storage import ResultStorage
+
+search_service = SearchService(
+    ResultStorage(get_minio_client()),
+    BUCKET_RESULT_STORAGE,
+)
+
+router = APIRouter()
+
+
+def bad_request(message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=HTTPStatus.BAD_REQUEST,
+        content={"code": HTTPStatus.BAD_REQUEST, "message": message},
+    )
+
+
+@router.get("/search")
+async def search_pages(
+    q: str,
+    cursor: str | None = None,
+    limit: int = settings.SEARCH_PAGE_SIZE,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> JSONResponse:
+    if not q.strip():
+        return bad_request("The search query must not be empty.")
+    if not 1 <= limit <= settings.SEARCH_MAX_PAGE_SIZE:
+        return bad_request(
+            "The limit must be between 1 and"
+            f" {settings.SEARCH_MAX_PAGE_SIZE}.",
+        )
+    try:
+        return JSONResponse(
+            content=await search_service.search(db, q, limit, cursor),
+        )
+    except InvalidCursorError:
+        return bad_request(f"Invalid cursor '{cursor}'.")
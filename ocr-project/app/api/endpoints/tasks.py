@@ -1,42 +1,184 @@
+import asyncio
+import json
 import uuid
+from collections.abc import AsyncIterator
 from http import HTTPStatus
+from typing import Any
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.dependencies import get_db_session
+from app.cache.task_status_cache import (
+    is_status_not_modified,
+    status_etag,
+    status_last_modified,
+    status_payload,
+    task_status_cache,
+)
+from app.core.config import settings
+from app.db.dependencies import get_async_db_session
+from app.db.session import AsyncSessionLocal
+from app.models.task import TERMINAL_TASK_STATUSES, TaskStatus
 from app.repository.task_repository import task_repo
+from app.services.events.event_service import (
+    RETRY_EVENT,
+    STATUS_EVENT,
+    task_event_broker,
+)
+
+SSE_MEDIA_TYPE = "text/event-stream"
 
 router = APIRouter()
 
 
+def task_not_found(task_id: uuid.UUID) -> JSONResponse:
+    return JSONResponse(
+        status_code=HTTPStatus.NOT_FOUND,
+        content={
+            "code": HTTPStatus.NOT_FOUND,
+            "message": f"Task with ID {task_id} not found.",
+        },
+    )
+
+
+async def load_status(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+) -> dict[str, Any] | None:
+    payload = await task_status_cache.read(task_id)
+    if payload is None:
+        task = await db.run_sync(task_repo.get_by_id, task_id)
+        if not task:
+            return None
+        payload = status_payload(task)
+        await task_status_cache.fill(payload)
+    return payload
+
+
+def compact_status(payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "status": payload["status"],
+        "error_message": payload["error_message"],
+        "updated_at": payload["updated_at"],
+    }
+
+
+def format_sse(event: str, data: dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def is_terminal(payload: dict[str, Any]) -> bool:
+    return TaskStatus(payload["status"]) in TERMINAL_TASK_STATUSES
+
+
 @router.get("/tasks/{task_id}/status")
-def get_task_status(
+async def get_task_status(
     task_id: uuid.UUID,
-    db: Session = Depends(get_db_session),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    payload = await load_status(db, task_id)
+    if payload is None:
+        return task_not_found(task_id)
+
+    headers = {"ETag": status_etag(payload), "Cache-Control": "no-cache"}
+    last_modified = status_last_modified(payload)
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+
+    if is_status_not_modified(
+        payload,
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    return JSONResponse(
+        status_code=HTTPStatus.OK,
+        content=payload,
+        headers=headers,
+    )
+
+
+@router.post("/tasks/status:batch")
+async def get_task_statuses(
+    task_ids: list[uuid.UUID] = Body(..., embed=True),
+    db: AsyncSession = Depends(get_async_db_session),
 ) -> JSONResponse:
-    task = task_repo.get_by_id(db, task_id)
-    if not task:
+    task_ids = list(dict.fromkeys(task_ids))
+    if len(task_ids) > settings.TASK_STATUS_BATCH_MAX_IDS:
         return JSONResponse(
-            status_code=HTTPStatus.NOT_FOUND,
+            status_code=HTTPStatus.BAD_REQUEST,
             content={
-                "code": HTTPStatus.NOT_FOUND,
-                "message": f"Task with ID {task_id} not found.",
+                "code": HTTPStatus.BAD_REQUEST,
+                "message": "At most "
+                f"{settings.TASK_STATUS_BATCH_MAX_IDS} task IDs are allowed"
+                " per request.",
             },
         )
 
+    payloads = await task_status_cache.read_many(task_ids)
+    missing = [task_id for task_id in task_ids if task_id not in payloads]
+    if missing:
+        rows = await db.run_sync(task_repo.get_by_ids, missing)
+        loaded = [status_payload(row) for row in rows]
+        await task_status_cache.fill_many(loaded)
+        payloads.update(
+            (uuid.UUID(payload["task_id"]), payload) for payload in loaded
+        )
+
     return JSONResponse(
-        status_code=HTTPStatus.OK,
         content={
-            "task_id": str(task.id),
-            "status": task.status.value,
-            "error_message": task.error_message,
-            "created_at": task.created_at.isoformat()
-            if task.created_at
-            else None,
-            "updated_at": task.updated_at.isoformat()
-            if task.updated_at
-            else None,
+            "tasks": {
+                str(task_id): compact_status(payloads[task_id])
+                for task_id in task_ids
+                if task_id in payloads
+            },
+            "not_found": [
+                str(task_id) for task_id in task_ids if task_id not in payloads
+            ],
         },
     )
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: uuid.UUID) -> Response:
+    # A subscriber may stay connected for as long as the document takes,
+    # so the session is closed before the stream starts.
+    async with AsyncSessionLocal() as db:
+        initial = await load_status(db, task_id)
+    if initial is None:
+        return task_not_found(task_id)
+
+    async def events() -> AsyncIterator[bytes]:
+        async with task_event_broker.subscribe(task_id) as queue:
+            # The worker updates the cache before publishing, so reading it
+            # after subscribing cannot miss a transition.
+            payload = await task_status_cache.read(task_id) or initial
+            yield format_sse(STATUS_EVENT, payload)
+            if is_terminal(payload):
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(),
+                        settings.TASK_EVENTS_KEEPALIVE,
+                    )
+                except TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event["event"] == RETRY_EVENT:
+                    yield f"retry: {event['data']['retry']}\n\n".encode()
+                    return
+                yield format_sse(event["event"], event["data"])
+                if event["event"] == STATUS_EVENT and is_terminal(
+                    event["data"],
+                ):
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
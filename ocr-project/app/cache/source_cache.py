@@ -0,0 +1,138 @@
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, BinaryIO
+
+from filelock import FileLock
+
+from app.core.config import settings
+from app.core.metrics import (
+    SOURCE_CACHE_EVICTIONS,
+    SOURCE_CACHE_HITS,
+    SOURCE_CACHE_MISSES,
+)
+from app.models import File
+
+# Downloads left behind by a killed worker are removed after this long.
+STALE_DOWNLOAD_SECONDS = 24 * 60 * 60
+
+
+def source_cache_key(file: File) -> str:
+    # Uploads that share content share a key, whatever their path.
+    if file.content_hash:
+        return file.content_hash
+    return hashlib.sha256(file.storage_path.encode()).hexdigest()
+
+
+class SourceCache:
+    """On-disk LRU cache of source files shared by the workers of a host.
+
+    Entries are written to a temporary file and renamed into place, so a
+    reader never sees a partial file. A lock per key makes concurrent
+    misses for the same file download it once, and a global lock
+    serializes eviction. Evicting a file that is still open or mapped only
+    removes its name; readers keep their data until they close it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.objects_dir = Path(directory) / "objects"
+        self.downloads_dir = Path(directory) / "downloads"
+        self.locks_dir = Path(directory) / "locks"
+        for path in (self.objects_dir, self.downloads_dir, self.locks_dir):
+            path.mkdir(parents=True, exist_ok=True)
+        self.evict_lock = FileLock(Path(directory) / "evict.lock")
+
+    @contextmanager
+    def open(
+        self,
+        key: str,
+        fetch: Callable[[IO[bytes]], None],
+    ) -> Iterator[BinaryIO]:
+        source = self._open_cached(key)
+        if source is None:
+            # Keys are striped over a fixed set of lock files so the lock
+            # directory does not grow with the cache.
+            with FileLock(self.locks_dir / f"{key[:2]}.lock"):
+                source = self._open_cached(key) or self._download(key, fetch)
+        with source:
+            yield source
+
+    def _open_cached(self, key: str) -> BinaryIO | None:
+        path = self.objects_dir / key
+        try:
+            source = path.open("rb")
+        except FileNotFoundError:
+            return None
+        # The modification time orders entries for eviction.
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        SOURCE_CACHE_HITS.inc()
+        return source
+
+    def _download(
+        self,
+        key: str,
+        fetch: Callable[[IO[bytes]], None],
+    ) -> BinaryIO:
+        SOURCE_CACHE_MISSES.inc()
+        with tempfile.NamedTemporaryFile(
+            dir=self.downloads_dir,
+            delete=False,
+        ) as download:
+            try:
+                fetch(download)
+            except BaseException:
+                Path(download.name).unlink()
+                raise
+            size = download.tell()
+
+        source = Path(download.name).open("rb")  # noqa: SIM115
+        if size > self.max_bytes:
+            # Too large to keep; the open handle outlives the name.
+            Path(download.name).unlink()
+            return source
+        Path(download.name).replace(self.objects_dir / key)
+        self.evict(keep=key)
+        return source
+
+    def evict(self, keep: str | None = None) -> None:
+        with self.evict_lock:
+            entries = []
+            total_bytes = 0
+            for entry in os.scandir(self.objects_dir):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                if Path(path).name == keep:
+                    continue
+                Path(path).unlink(missing_ok=True)
+                total_bytes -= size
+                SOURCE_CACHE_EVICTIONS.inc()
+
+            stale_before = time.time() - STALE_DOWNLOAD_SECONDS
+            for entry in os.scandir(self.downloads_dir):
+                try:
+                    if entry.stat().st_mtime < stale_before:
+                        Path(entry.path).unlink()
+                except FileNotFoundError:
+                    continue
+
+
+source_cache = (
+    SourceCache(settings.WORKER_CACHE_DIR, settings.WORKER_CACHE_MAX_BYTES)
+    if settings.WORKER_CACHE_DIR
+    else None
+)
@@ -0,0 +1,182 @@
+import json
+import logging
+import uuid
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Protocol
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.models.task import TERMINAL_TASK_STATUSES, Task, TaskStatus
+from app.services.redis.redis_service import (
+    get_async_redis_client,
+    get_redis_client,
+)
+from app.services.result.result_service import etag_matches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "task-status:"
+
+
+class TaskStatusRow(Protocol):
+    id: uuid.UUID
+    status: TaskStatus
+    error_message: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+def status_payload(task: Task | TaskStatusRow) -> dict[str, Any]:
+    return {
+        "task_id": str(task.id),
+        "status": task.status.value,
+        "error_message": task.error_message,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+def status_etag(payload: dict[str, Any]) -> str:
+    return f'"{payload["status"]}-{payload["updated_at"]}"'
+
+
+def _updated_at(payload: dict[str, Any]) -> datetime | None:
+    if not payload["updated_at"]:
+        return None
+    updated_at = datetime.fromisoformat(payload["updated_at"])
+    return updated_at.replace(tzinfo=UTC, microsecond=0)
+
+
+def status_last_modified(payload: dict[str, Any]) -> str | None:
+    updated_at = _updated_at(payload)
+    return format_datetime(updated_at, usegmt=True) if updated_at else None
+
+
+def is_status_not_modified(
+    payload: dict[str, Any],
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> bool:
+    if if_none_match:
+        return etag_matches(status_etag(payload), if_none_match)
+    updated_at = _updated_at(payload)
+    if not if_modified_since or not updated_at:
+        return False
+    try:
+        return updated_at <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+class TaskStatusCache:
+    def __init__(
+        self,
+        client: Redis,
+        async_client: AsyncRedis,
+        ttl: int,
+        terminal_ttl: int,
+    ) -> None:
+        self.client = client
+        self.async_client = async_client
+        self.ttl = ttl
+        self.terminal_ttl = terminal_ttl
+
+    def _key(self, task_id: uuid.UUID | str) -> str:
+        return f"{KEY_PREFIX}{task_id}"
+
+    def _ttl(self, payload: dict[str, Any]) -> int:
+        if TaskStatus(payload["status"]) in TERMINAL_TASK_STATUSES:
+            return self.terminal_ttl
+        return self.ttl
+
+    def write(self, payload: dict[str, Any]) -> None:
+        try:
+            self.client.set(
+                self._key(payload["task_id"]),
+                json.dumps(payload),
+                ex=self._ttl(payload),
+            )
+        except RedisError:
+            logger.warning(
+                "Failed to cache status of task %s",
+                payload["task_id"],
+                exc_info=True,
+            )
+
+    async def fill(self, payload: dict[str, Any]) -> None:
+        # Read-through fills never overwrite an entry written meanwhile by
+        # the worker, which is always at least as fresh as the DB read.
+        try:
+            await self.async_client.set(
+                self._key(payload["task_id"]),
+                json.dumps(payload),
+                ex=self._ttl(payload),
+                nx=True,
+            )
+        except RedisError:
+            logger.warning(
+                "Failed to cache status of task %s",
+                payload["task_id"],
+                exc_info=True,
+            )
+
+    async def read(self, task_id: uuid.UUID) -> dict[str, Any] | None:
+        try:
+            cached = await self.async_client.get(self._key(task_id))
+        except RedisError:
+            logger.warning(
+                "Failed to read cached status of task %s",
+                task_id,
+                exc_info=True,
+            )
+            return None
+        return json.loads(cached) if cached else None
+
+    async def fill_many(self, payloads: Iterable[dict[str, Any]]) -> None:
+        try:
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                for payload in payloads:
+                    pipe.set(
+                        self._key(payload["task_id"]),
+                        json.dumps(payload),
+                        ex=self._ttl(payload),
+                        nx=True,
+                    )
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Failed to cache task statuses", exc_info=True)
+
+    async def read_many(
+        self,
+        task_ids: Sequence[uuid.UUID],
+    ) -> dict[uuid.UUID, dict[str, Any]]:
+        if not task_ids:
+            return {}
+        try:
+            cached = await self.async_client.mget(
+                [self._key(task_id) for task_id in task_ids],
+            )
+        except RedisError:
+            logger.warning(
+                "Failed to read cached task statuses",
+                exc_info=True,
+            )
+            return {}
+        return {
+            task_id: json.loads(value)
+            for task_id, value in zip(task_ids, cached, strict=True)
+            if value
+        }
+
+
+task_status_cache = TaskStatusCache(
+    get_redis_client(),
+    get_async_redis_client(),
+    settings.TASK_STATUS_CACHE_TTL,
+    settings.TASK_STATUS_CACHE_TERMINAL_TTL,
+)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +20,15 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "ocr-files"
     MINIO_USE_SSL: bool = False
+    MINIO_UPLOAD_PART_SIZE: int = 10 * 1024 * 1024
+    MINIO_UPLOAD_PARALLELISM: int = 1
+
+    # Upload settings
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_BATCH_MAX_FILES: int = 500
+
+    # Executor settings for blocking I/O issued from the event loop
+    STORAGE_IO_WORKERS: int = 16
 
     # RABBITMQ settings
     RABBITMQ_HOST: str = "rabbitmq"
@@ -26,24 +36,111 @@ class Settings(BaseSettings):
     RABBITMQ_USER: str = "dennis"
     RABBITMQ_PASSWORD: str = "tojidev"
 
+    # Queue routing settings. Images and PDFs up to EXPRESS_MAX_PDF_BYTES
+    # go to the express queue, everything else to the bulk queue.
+    QUEUE_ROUTING_ENABLED: bool = True
+    EXPRESS_QUEUE: str = "express"
+    BULK_QUEUE: str = "bulk"
+    EXPRESS_MAX_PDF_BYTES: int = 2 * 1024 * 1024
+
+    # Outbox dispatcher settings
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 0.2
+    OUTBOX_METRICS_PORT: int = 9102
+
+    # OCR engine settings. OCR_ENGINE names a registered engine; modules in
+    # OCR_ENGINE_MODULES are imported first so they can register their own.
+    OCR_ENGINE: str = "mock"
+    OCR_ENGINE_MODULES: list[str] = []
+    OCR_BATCH_MAX_SIZE: int = 16
+    OCR_BATCH_MAX_WAIT: float = 0.01
+    OCR_MOCK_BATCH_OVERHEAD: float = 0.0
+    OCR_MOCK_PAGE_COST: float = 0.0
+
+    # OCR worker settings
+    WORKER_SPOOL_DIR: str | None = None
+    WORKER_SPOOL_CHUNK_SIZE: int = 1024 * 1024
+    # Source files are kept in an LRU cache under WORKER_CACHE_DIR, shared
+    # by the worker processes of a host. Unset disables the cache.
+    WORKER_CACHE_DIR: str | None = None
+    WORKER_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024
+    WORKER_METRICS_PORT: int | None = None
+    OCR_PAGE_CHUNK_SIZE: int = 20
+    # Transient storage, database and network errors are retried with
+    # exponential backoff, resuming after the last committed batch of pages.
+    TASK_MAX_RETRIES: int = 5
+    TASK_RETRY_BACKOFF: int = 2
+    TASK_RETRY_BACKOFF_MAX: int = 300
+    RESULT_BATCH_SIZE: int = 500
+    RESULT_UPLOAD_WORKERS: int = 16
+    # "pages" writes one object per page, "packed" one JSONL object per
+    # stored batch of pages with byte offsets kept on the page_results rows.
+    RESULT_FORMAT: Literal["pages", "packed"] = "pages"
+    # Results are compressed before upload and recorded with a matching
+    # Content-Encoding; reads decode whatever an object was stored with.
+    # The level defaults to the codec's own (6 for gzip, 3 for zstd).
+    RESULT_COMPRESSION: Literal["none", "gzip", "zstd"] = "gzip"
+    RESULT_COMPRESSION_LEVEL: int | None = None
+
+    # Results API settings
+    RESULT_STREAM_PREFETCH: int = 8
+    RESULT_STREAM_SEGMENT_BYTES: int = 1024 * 1024
+
+    # Search settings. Page text is indexed with the SEARCH_TEXT_CONFIG
+    # text search configuration; "simple" does no stemming, which suits
+    # documents in any language.
+    SEARCH_TEXT_CONFIG: str = "simple"
+    SEARCH_PAGE_SIZE: int = 20
+    SEARCH_MAX_PAGE_SIZE: int = 100
+    # A search query covers a range of about SEARCH_SCAN_ROWS rows; a
+    # request runs successive ranges until it fills its limit or has
+    # covered SEARCH_SCAN_BUDGET_ROWS rows. A request that runs out of
+    # budget first returns a cursor to the rest, so the cost of a request
+    # does not grow with the table.
+    SEARCH_SCAN_ROWS: int = 100_000
+    SEARCH_SCAN_BUDGET_ROWS: int = 1_000_000
+
+    # Tracing settings. Spans go to the exporter named by TRACE_EXPORTER:
+    # "none", "stdout" or "file" (JSON lines appended to TRACE_FILE_PATH).
+    # Modules in TRACE_EXPORTER_MODULES are imported first so they can
+    # register their own.
+    TRACE_EXPORTER: str = "none"
+    TRACE_EXPORTER_MODULES: list[str] = []
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_SERVICE_NAME: str = "ocr"
+
     # REDIS settings
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    TASK_STATUS_CACHE_TTL: int = 60
+    TASK_STATUS_CACHE_TERMINAL_TTL: int = 7 * 24 * 60 * 60
+    TASK_STATUS_BATCH_MAX_IDS: int = 1000
+    TASK_EVENTS_KEEPALIVE: float = 15.0
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    # The event subscription is retried this many times, doubling the
+    # delay each time, before open streams are told to reconnect later.
+    TASK_EVENTS_RECONNECT_ATTEMPTS: int = 5
+    TASK_EVENTS_RECONNECT_DELAY: float = 1.0
+    TASK_PROGRESS_TTL: int = 24 * 60 * 60
 
     model_config = {
         "env_file": BASE_DIR / ".env",
         "extra": "ignore",
     }
 
-    def get_database_url(self) -> str:
+    def get_database_url(self, driver: str | None = None) -> str:
+        scheme = f"postgresql+{driver}" if driver else "postgresql"
         return (
-            f"postgresql://{self.POSTGRES_USER}:"
+            f"{scheme}://{self.POSTGRES_USER}:"
             f"{self.POSTGRES_PASSWORD}@"
             f"{self.POSTGRES_HOST}:"
             f"{self.POSTGRES_PORT}/"
             f"{self.POSTGRES_DB}"
         )
 
+    def get_async_database_url(self) -> str:
+        return self.get_database_url(driver="psycopg")
+
 
 settings = Settings()
@@ -0,0 +1,32 @@
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+
+storage_executor = ThreadPoolExecutor(
+    max_workers=settings.STORAGE_IO_WORKERS,
+    thread_name_prefix="storage-io",
+)
+result_upload_executor = ThreadPoolExecutor(
+    max_workers=settings.RESULT_UPLOAD_WORKERS,
+    thread_name_prefix="result-upload",
+)
+
+
+async def run_in_executor[**P, T](
+    executor: ThreadPoolExecutor,
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    # Like asyncio.to_thread, the call runs in a copy of the caller's
+    # context so that it continues the caller's trace.
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(context.run, func, *args, **kwargs),
+    )
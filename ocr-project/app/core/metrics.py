@@ -0,0 +1,123 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+DEDUPE_LOOKUPS = Counter(
+    "ocr_dedupe_lookups_total",
+    "Uploads checked against already processed files by content hash.",
+)
+DEDUPE_HITS = Counter(
+    "ocr_dedupe_hits_total",
+    "Uploads that reused the results of an already processed file.",
+)
+OUTBOX_DISPATCHED = Counter(
+    "ocr_outbox_dispatched_total",
+    "Outbox messages published to the broker and confirmed.",
+)
+OUTBOX_PUBLISH_FAILURES = Counter(
+    "ocr_outbox_publish_failures_total",
+    "Outbox batches that failed to publish and will be retried.",
+)
+OUTBOX_BATCH_SECONDS = Histogram(
+    "ocr_outbox_batch_seconds",
+    "Time to claim, publish and delete one outbox batch.",
+)
+OUTBOX_LAG_SECONDS = Gauge(
+    "ocr_outbox_lag_seconds",
+    "Age of the oldest outbox message that has not been published yet.",
+)
+SOURCE_CACHE_HITS = Counter(
+    "ocr_source_cache_hits_total",
+    "Source files served from the worker-local cache.",
+)
+SOURCE_CACHE_MISSES = Counter(
+    "ocr_source_cache_misses_total",
+    "Source files downloaded from storage into the worker-local cache.",
+)
+SOURCE_CACHE_EVICTIONS = Counter(
+    "ocr_source_cache_evictions_total",
+    "Source files evicted from the worker-local cache to stay under its cap.",
+)
+
+# Stages range from a millisecond for a status lookup to minutes for the
+# OCR of a long page range.
+STAGE_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "ocr_http_requests_in_progress",
+    "HTTP requests the API is currently handling.",
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "ocr_http_request_seconds",
+    "Time to handle an HTTP request, by route template and status.",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+
+# Children are bound once so that the hot paths skip the label lookup.
+UPLOAD_STAGE_SECONDS = Histogram(
+    "ocr_upload_stage_seconds",
+    "Time spent in each stage of handling an upload.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+UPLOAD_STORAGE_SECONDS = UPLOAD_STAGE_SECONDS.labels("storage")
+UPLOAD_DATABASE_SECONDS = UPLOAD_STAGE_SECONDS.labels("database")
+
+WORKER_STAGE_SECONDS = Histogram(
+    "ocr_worker_stage_seconds",
+    "Time spent in each stage of processing a document.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+DOWNLOAD_SECONDS = WORKER_STAGE_SECONDS.labels("download")
+COUNT_PAGES_SECONDS = WORKER_STAGE_SECONDS.labels("count_pages")
+OCR_SECONDS = WORKER_STAGE_SECONDS.labels("ocr")
+RESULT_UPLOAD_SECONDS = WORKER_STAGE_SECONDS.labels("result_upload")
+DB_WRITE_SECONDS = WORKER_STAGE_SECONDS.labels("db_write")
+COMMIT_SECONDS = WORKER_STAGE_SECONDS.labels("commit")
+
+STORAGE_BYTES = Counter(
+    "ocr_storage_bytes_total",
+    "Bytes moved to and from object storage.",
+    ["operation"],
+)
+FILE_BYTES_UPLOADED = STORAGE_BYTES.labels("file_upload")
+FILE_BYTES_DOWNLOADED = STORAGE_BYTES.labels("file_download")
+RESULT_BYTES_UPLOADED = STORAGE_BYTES.labels("result_upload")
+
+PAGES_PROCESSED = Counter(
+    "ocr_pages_processed_total",
+    "Pages recognized and stored by the workers.",
+)
+WORKER_TASKS_IN_PROGRESS = Gauge(
+    "ocr_worker_tasks_in_progress",
+    "Worker tasks currently executing.",
+    ["task"],
+    multiprocess_mode="livesum",
+)
+WORKER_TASK_RETRIES = Counter(
+    "ocr_worker_task_retries_total",
+    "Worker task attempts that failed and were retried, by error type.",
+    ["task", "error"],
+)
+WORKER_TASK_FAILURES = Counter(
+    "ocr_worker_task_failures_total",
+    "Worker tasks that failed for good, by error type.",
+    ["task", "error"],
+)
@@ -0,0 +1,95 @@
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_PROGRESS
+from app.core.tracing import TRACEPARENT, SpanContext, tracer
+
+
+class MetricsMiddleware:
+    """Tracks requests in flight and their duration by route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # Routing stores the matched route in the scope. Requests that
+            # matched none, such as scrapes of the mounted /metrics app,
+            # are not timed, which keeps the route label bounded.
+            route = scope.get("route")
+            if route is not None:
+                HTTP_REQUEST_SECONDS.labels(
+                    scope["method"],
+                    route.path,
+                    status,
+                ).observe(time.perf_counter() - started)
+
+
+class TracingMiddleware:
+    """Opens a span per request, continuing the caller's trace if any.
+
+    The response carries the trace id in a traceresponse header, so a slow
+    upload can be looked up among the exported spans.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        parent = SpanContext.from_traceparent(
+            Headers(scope=scope).get(TRACEPARENT),
+        )
+        with tracer.span(
+            f"{scope['method']} {scope['path']}",
+            parent,
+            method=scope["method"],
+            path=scope["path"],
+        ) as span:
+
+            async def send_with_trace(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["status"] = message["status"]
+                    MutableHeaders(scope=message).append(
+                        "traceresponse",
+                        span.context.traceparent,
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                if route := scope.get("route"):
+                    span.name = f"{scope['method']} {route.path}"
@@ -0,0 +1,261 @@
+import contextvars
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Self, TextIO
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Trace context travels in the W3C traceparent format, through HTTP
+# headers, outbox rows and Celery message headers alike.
+TRACEPARENT = "traceparent"
+# Wall-clock time a task was handed to the queue, for the queue-wait span.
+ENQUEUED_AT = "x-enqueued-at"
+# Statements are cut short so that bulk inserts do not bloat their spans.
+STATEMENT_MAX_LENGTH = 500
+
+type ExporterFactory = Callable[[], SpanExporter]
+
+_exporters: dict[str, ExporterFactory] = {}
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: str | None) -> Self | None:
+        parts = (value or "").split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:  # noqa: PLR2004
+            return None
+        try:
+            int(parts[1], 16)
+            int(parts[2], 16)
+        except ValueError:
+            return None
+        return cls(parts[1], parts[2])
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        end_ns = self.end_ns or self.start_ns
+        return {
+            "service": settings.TRACE_SERVICE_NAME,
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "duration_ms": (end_ns - self.start_ns) / 1e6,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: contextvars.ContextVar[SpanContext | None] = (
+    contextvars.ContextVar("current_span", default=None)
+)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None: ...
+
+
+def register_exporter(
+    name: str,
+) -> Callable[[ExporterFactory], ExporterFactory]:
+    def register(factory: ExporterFactory) -> ExporterFactory:
+        _exporters[name] = factory
+        return factory
+
+    return register
+
+
+def create_span_exporter(name: str) -> SpanExporter:
+    try:
+        factory = _exporters[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown span exporter '{name}'. Registered exporters: "
+            f"{', '.join(sorted(_exporters))}",
+        ) from None
+    return factory()
+
+
+@register_exporter("none")
+class NoopExporter(SpanExporter):
+    def export(self, span: Span) -> None:
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    """Writes each finished span as one JSON line, for offline analysis."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+@register_exporter("stdout")
+def stdout_exporter() -> SpanExporter:
+    return JsonLinesExporter(sys.stdout)
+
+
+@register_exporter("file")
+def file_exporter() -> SpanExporter:
+    # Appends are line-sized, so processes sharing the file do not
+    # interleave within a span.
+    return JsonLinesExporter(
+        Path(settings.TRACE_FILE_PATH).open("a", encoding="utf-8"),
+    )
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter, *, enabled: bool) -> None:
+        self.exporter = exporter
+        # Instrumentation of the database and the object store is only
+        # installed when spans go somewhere.
+        self.enabled = enabled
+
+    def current(self) -> SpanContext | None:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        parent: SpanContext | None = None,
+        start_ns: int | None = None,
+        **attributes: Any,
+    ) -> Span:
+        parent = parent or _current_span.get()
+        return Span(
+            name,
+            SpanContext(
+                parent.trace_id if parent else os.urandom(16).hex(),
+                os.urandom(8).hex(),
+            ),
+            parent.span_id if parent else None,
+            start_ns or time.time_ns(),
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, end_ns: int | None = None) -> None:
+        span.end_ns = end_ns or time.time_ns()
+        self.exporter.export(span)
+
+    def activate(self, span: Span) -> contextvars.Token[SpanContext | None]:
+        return _current_span.set(span.context)
+
+    def deactivate(self, token: contextvars.Token[SpanContext | None]) -> None:
+        _current_span.reset(token)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: SpanContext | None = None,
+        **attributes: Any,
+    ) -> Iterator[Span]:
+        span = self.start_span(name, parent, **attributes)
+        token = self.activate(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.deactivate(token)
+            self.end_span(span)
+
+    def inject(self) -> dict[str, Any]:
+        # Headers for work handed to a queue, to continue the trace where
+        # it is picked up.
+        headers: dict[str, Any] = {ENQUEUED_AT: time.time()}
+        if current := _current_span.get():
+            headers[TRACEPARENT] = current.traceparent
+        return headers
+
+
+def _before_cursor_execute(
+    conn: Any,
+    _cursor: Any,
+    statement: str,
+    _parameters: Any,
+    _context: Any,
+    executemany: bool,  # noqa: FBT001
+) -> None:
+    # Statements outside any trace, such as pool pings, are not recorded.
+    if tracer.current() is None:
+        return
+    span = tracer.start_span(
+        f"db {statement.split(None, 1)[0].upper()}",
+        statement=statement[:STATEMENT_MAX_LENGTH],
+        executemany=executemany,
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn: Any, *_: Any) -> None:
+    if spans := conn.info.get("trace_spans"):
+        tracer.end_span(spans.pop())
+
+
+def _handle_error(exception_context: Any) -> None:
+    connection = exception_context.connection
+    if connection is None:
+        return
+    if spans := connection.info.get("trace_spans"):
+        span = spans.pop()
+        error = exception_context.original_exception
+        span.error = f"{type(error).__name__}: {error}"
+        tracer.end_span(span)
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# Modules named in TRACE_EXPORTER_MODULES register further exporters.
+for module in settings.TRACE_EXPORTER_MODULES:
+    importlib.import_module(module)
+
+tracer = Tracer(
+    create_span_exporter(settings.TRACE_EXPORTER),
+    enabled=settings.TRACE_EXPORTER != "none",
+)
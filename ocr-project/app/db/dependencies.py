@@ -1,8 +1,9 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 
 def get_db_session() -> Generator[Session]:
@@ -11,3 +12,8 @@ def get_db_session() -> Generator[Session]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import create_database, database_exists
 
 from app.core.config import settings
+from app.core.tracing import instrument_engine, tracer
 
 engine = create_engine(settings.get_database_url(), pool_pre_ping=True)
 
@@ -10,3 +12,18 @@ if not database_exists(engine.url):
     create_database(engine.url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    settings.get_async_database_url(),
+    pool_pre_ping=True,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if tracer.enabled:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
@@ -1,12 +1,38 @@
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 
-from app.api.endpoints import files, tasks
+from app.api.endpoints import files, results, search, tasks
+from app.constant.constant import BUCKET_FILE_STORAGE, BUCKET_RESULT_STORAGE
+from app.core.executors import run_in_executor, storage_executor
+from app.core.middleware import MetricsMiddleware, TracingMiddleware
+from app.services.events.event_service import task_event_broker
+from app.services.minio.minio_service import provision_buckets
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="OCR Processing System")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await run_in_executor(
+        storage_executor,
+        provision_buckets,
+        BUCKET_FILE_STORAGE,
+        BUCKET_RESULT_STORAGE,
+    )
+    yield
+    await task_event_broker.close()
+
+
+app = FastAPI(title="OCR Processing System", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(files.router, prefix="/api/v1", tags=["File Upload"])
 app.include_router(tasks.router, prefix="/api/v1", tags=["Task Status"])
+app.include_router(results.router, prefix="/api/v1", tags=["Task Results"])
+app.include_router(search.router, prefix="/api/v1", tags=["Search"])
+app.mount("/metrics", make_asgi_app())
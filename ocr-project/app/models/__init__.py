@@ -1,6 +1,7 @@
 from .base import Base
 from .file import File
+from .outbox_message import OutboxMessage
 from .page_result import PageResult
 from .task import Task
 
-__all__ = ["Base", "File", "PageResult", "Task"]
+__all__ = ["Base", "File", "OutboxMessage", "PageResult", "Task"]
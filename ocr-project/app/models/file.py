@@ -1,29 +1,48 @@
 import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy import DateTime, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+if TYPE_CHECKING:
+    from app.models.page_result import PageResult
+    from app.models.task import Task
+
 
 class File(Base):
     __tablename__ = "files"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    filename = Column(String, nullable=False)
-    storage_path = Column(String, nullable=False, unique=True)
-    file_type = Column(String, nullable=False)
-    total_pages = Column(Integer, nullable=True)
-    uploaded_at = Column(DateTime, server_default=func.now(), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    storage_path: Mapped[str] = mapped_column(String, nullable=False)
+    file_type: Mapped[str] = mapped_column(String, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        index=True,
+    )
+    total_pages: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    uploaded_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False,
+    )
 
-    task = relationship(
+    task: Mapped["Task"] = relationship(
         "Task",
         back_populates="file",
         uselist=False,
         cascade="all, delete-orphan",
     )
-    page_results = relationship(
+    page_results: Mapped[list["PageResult"]] = relationship(
         "PageResult",
         back_populates="file",
         cascade="all, delete-orphan",
@@ -1,35 +1,79 @@
 import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+if TYPE_CHECKING:
+    from app.models.file import File
+    from app.models.task import Task
+
 
 class PageResult(Base):
     __tablename__ = "page_results"
+    __table_args__ = (
+        # Also serves lookups and cascades by file_id alone.
+        UniqueConstraint(
+            "file_id",
+            "page_number",
+            name="uq_page_results_file_id_page_number",
+        ),
+        Index(
+            "ix_page_results_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    task_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("tasks.id"),
         nullable=False,
+        index=True,
     )
-    file_id = Column(
+    file_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("files.id"),
         nullable=False,
     )
-    page_number = Column(Integer, nullable=False)
-    result_path = Column(String, nullable=False)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    updated_at = Column(
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    result_path: Mapped[str] = mapped_column(String, nullable=False)
+    result_offset: Mapped[int | None] = mapped_column(
+        BigInteger,
+        nullable=True,
+    )
+    result_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Full-text index of the page text, which itself stays in storage.
+    search_vector: Mapped[Any] = mapped_column(TSVECTOR, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         server_default=func.now(),
         onupdate=func.now(),
         nullable=False,
     )
 
-    task = relationship("Task", back_populates="page_results")
-    file = relationship("File", back_populates="page_results")
+    task: Mapped["Task"] = relationship("Task", back_populates="page_results")
+    file: Mapped["File"] = relationship("File", back_populates="page_results")
@@ -1,12 +1,26 @@
 import uuid
+from datetime import datetime
 from enum import Enum as PyEnum
+from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, String, func
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    String,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+if TYPE_CHECKING:
+    from app.models.file import File
+    from app.models.page_result import PageResult
+
 
 class TaskStatus(PyEnum):
     PENDING = "pending"
@@ -15,28 +29,53 @@ class TaskStatus(PyEnum):
     FAILED = "failed"
 
 
+TERMINAL_TASK_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED})
+
+
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    file_id = Column(
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    file_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("files.id"),
         nullable=False,
+        index=True,
     )
-    status = Column(
+    status: Mapped[TaskStatus] = mapped_column(
         Enum(TaskStatus),
         nullable=False,
         default=TaskStatus.PENDING,
     )
-    error_message = Column(String, nullable=True)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    updated_at = Column(
+    error_message: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         server_default=func.now(),
         onupdate=func.now(),
         nullable=False,
     )
 
-    file = relationship("File", back_populates="task")
-    page_results = relationship("PageResult", back_populates="task")
+    __table_args__ = (
+        # Pollers and sweepers only ever look for unfinished tasks, which
+        # stay a small slice of the table.
+        Index(
+            "ix_tasks_status_active",
+            "status",
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')"),
+        ),
+    )
+
+    file: Mapped["File"] = relationship("File", back_populates="task")
+    page_results: Mapped[list["PageResult"]] = relationship(
+        "PageResult",
+        back_populates="task",
+    )
@@ -1,6 +1,12 @@
+import uuid
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.file import File
+from app.models.task import Task, TaskStatus
 
 
 class FileRepository:
@@ -9,9 +15,53 @@ class FileRepository:
         db.flush()
         return file
 
-    def get_by_id(self, db: Session, file_id: str) -> File | None:
+    def add_many(self, db: Session, files: Sequence[dict[str, Any]]) -> None:
+        if files:
+            db.execute(insert(File), files)
+
+    def get_by_id(self, db: Session, file_id: uuid.UUID) -> File | None:
         return db.query(File).filter(File.id == file_id).first()
 
+    def get_processed_by_content_hash(
+        self,
+        db: Session,
+        content_hash: str,
+    ) -> File | None:
+        return (
+            db.query(File)
+            .join(Task, Task.file_id == File.id)
+            .filter(
+                File.content_hash == content_hash,
+                Task.status == TaskStatus.COMPLETED,
+            )
+            .order_by(File.uploaded_at)
+            .first()
+        )
+
+    def get_processed_by_content_hashes(
+        self,
+        db: Session,
+        content_hashes: Collection[str],
+    ) -> dict[str, File]:
+        if not content_hashes:
+            return {}
+        files = (
+            db.query(File)
+            .join(Task, Task.file_id == File.id)
+            .filter(
+                File.content_hash.in_(content_hashes),
+                Task.status == TaskStatus.COMPLETED,
+            )
+            .order_by(File.uploaded_at.desc())
+            .all()
+        )
+        # Oldest upload wins, matching get_processed_by_content_hash.
+        return {
+            file.content_hash: file
+            for file in files
+            if file.content_hash is not None
+        }
+
     def save(self, db: Session, file: File) -> File:
         db.add(file)
         db.flush()
@@ -0,0 +1,65 @@
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import OutboxMessage
+
+
+class OutboxRepository:
+    def add(
+        self,
+        db: Session,
+        task_name: str,
+        args: list[Any],
+        queue: str | None = None,
+        headers: dict[str, Any] | None = None,
+    ) -> None:
+        db.add(
+            OutboxMessage(
+                task_name=task_name,
+                args=args,
+                queue=queue,
+                headers=headers,
+            ),
+        )
+
+    def add_many(
+        self,
+        db: Session,
+        messages: Sequence[dict[str, Any]],
+    ) -> None:
+        if messages:
+            db.execute(insert(OutboxMessage), messages)
+
+    def claim_batch(self, db: Session, limit: int) -> Sequence[OutboxMessage]:
+        # SKIP LOCKED lets several dispatchers drain the table side by side.
+        return (
+            db.execute(
+                select(OutboxMessage)
+                .order_by(OutboxMessage.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True),
+            )
+            .scalars()
+            .all()
+        )
+
+    def delete(self, db: Session, message_ids: Sequence[int]) -> None:
+        if message_ids:
+            db.execute(
+                delete(OutboxMessage).where(OutboxMessage.id.in_(message_ids)),
+            )
+
+    def oldest_age(self, db: Session) -> float:
+        # Both timestamps come from the database clock.
+        oldest, now = db.execute(
+            select(func.min(OutboxMessage.created_at), func.now()),
+        ).one()
+        if oldest is None:
+            return 0.0
+        return max((now.replace(tzinfo=None) - oldest).total_seconds(), 0.0)
+
+
+outbox_repo = OutboxRepository()
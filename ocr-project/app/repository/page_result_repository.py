@@ -1,6 +1,28 @@
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import (
+    Row,
+    Select,
+    bindparam,
+    column,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.models import PageResult
+from app.core.config import settings
+from app.models import File, PageResult
+
+HEADLINE_OPTIONS = "MaxFragments=2, MinWords=5, MaxWords=20"
 
 
 class PageResultRepository:
@@ -9,5 +31,234 @@ class PageResultRepository:
         db.flush()
         return page_result
 
+    def add_many(
+        self,
+        db: Session,
+        page_results: Sequence[dict[str, Any]],
+    ) -> None:
+        if page_results:
+            db.execute(insert(PageResult), page_results)
+
+    def upsert_many(
+        self,
+        db: Session,
+        page_results: Sequence[dict[str, Any]],
+    ) -> None:
+        # A page written again by a retry or a duplicate delivery replaces
+        # the earlier row instead of adding a second one. Each row carries
+        # its page text as search_text, which is indexed, not stored.
+        if not page_results:
+            return
+        statement = pg_insert(PageResult).values(
+            search_vector=func.to_tsvector(
+                settings.SEARCH_TEXT_CONFIG,
+                bindparam("search_text"),
+            ),
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                constraint="uq_page_results_file_id_page_number",
+                set_={
+                    "task_id": statement.excluded.task_id,
+                    "result_path": statement.excluded.result_path,
+                    "result_offset": statement.excluded.result_offset,
+                    "result_length": statement.excluded.result_length,
+                    "search_vector": statement.excluded.search_vector,
+                    # onupdate is not applied to ON CONFLICT DO UPDATE.
+                    "updated_at": func.now(),
+                },
+            ),
+            page_results,
+        )
+
+    def get_page_numbers(
+        self,
+        db: Session,
+        file_id: uuid.UUID,
+        first_page: int,
+        last_page: int,
+    ) -> set[int]:
+        return set(
+            db.scalars(
+                select(PageResult.page_number).where(
+                    PageResult.file_id == file_id,
+                    PageResult.page_number.between(first_page, last_page),
+                ),
+            ),
+        )
+
+    def get_by_task_and_page(
+        self,
+        db: Session,
+        task_id: uuid.UUID,
+        page_number: int,
+    ) -> PageResult | None:
+        return (
+            db.query(PageResult)
+            .filter(
+                PageResult.task_id == task_id,
+                PageResult.page_number == page_number,
+            )
+            .first()
+        )
+
+    def get_locations(
+        self,
+        db: Session,
+        task_id: uuid.UUID,
+        first_page: int | None = None,
+        last_page: int | None = None,
+    ) -> Sequence[Row[tuple[int, str, int | None, int | None]]]:
+        query = select(
+            PageResult.page_number,
+            PageResult.result_path,
+            PageResult.result_offset,
+            PageResult.result_length,
+        ).where(PageResult.task_id == task_id)
+        if first_page is not None:
+            query = query.where(PageResult.page_number >= first_page)
+        if last_page is not None:
+            query = query.where(PageResult.page_number <= last_page)
+        return db.execute(query.order_by(PageResult.page_number)).all()
+
+    def copy_to(
+        self,
+        db: Session,
+        source_file_id: uuid.UUID,
+        task_id: uuid.UUID,
+        file_id: uuid.UUID,
+    ) -> None:
+        self.copy_many(db, [(source_file_id, task_id, file_id)])
+
+    def copy_many(
+        self,
+        db: Session,
+        copies: Sequence[tuple[uuid.UUID, uuid.UUID, uuid.UUID]],
+    ) -> None:
+        # One INSERT ... SELECT for every (source_file_id, task_id, file_id)
+        # of a batch, joined on a VALUES list.
+        if not copies:
+            return
+        targets = values(
+            column("source_file_id", UUID(as_uuid=True)),
+            column("task_id", UUID(as_uuid=True)),
+            column("file_id", UUID(as_uuid=True)),
+            name="targets",
+        ).data(list(copies))
+        db.execute(
+            insert(PageResult).from_select(
+                [
+                    "id",
+                    "task_id",
+                    "file_id",
+                    "page_number",
+                    "result_path",
+                    "result_offset",
+                    "result_length",
+                    "search_vector",
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    targets.c.task_id,
+                    targets.c.file_id,
+                    PageResult.page_number,
+                    PageResult.result_path,
+                    PageResult.result_offset,
+                    PageResult.result_length,
+                    PageResult.search_vector,
+                ).join(
+                    targets,
+                    targets.c.source_file_id == PageResult.file_id,
+                ),
+            ),
+        )
+
+    def estimated_count(self, db: Session) -> float:
+        # The planner's row estimate, kept current by autovacuum; counting
+        # the table would scan it. Negative until its first ANALYZE.
+        return db.execute(
+            text(
+                "SELECT reltuples FROM pg_class"
+                " WHERE oid = CAST(:table AS regclass)",
+            ),
+            {"table": PageResult.__tablename__},
+        ).scalar_one()
+
+    def search_statement(
+        self,
+        query: str,
+        limit: int,
+        after: tuple[uuid.UUID, int] | None = None,
+        before: uuid.UUID | None = None,
+    ) -> Select[Any]:
+        # Hits come in (file_id, page_number) order and only from file ids
+        # below before. The bound keeps either plan small: the unique index
+        # walks at most the rows of the range, and a bitmap scan of the GIN
+        # index only pays for a term's matches when they are few.
+        tsquery = func.websearch_to_tsquery(settings.SEARCH_TEXT_CONFIG, query)
+        statement = (
+            select(
+                PageResult.file_id,
+                PageResult.page_number,
+                PageResult.task_id,
+                PageResult.result_path,
+                PageResult.result_offset,
+                PageResult.result_length,
+                File.filename,
+            )
+            .join(File, File.id == PageResult.file_id)
+            .where(PageResult.search_vector.bool_op("@@")(tsquery))
+        )
+        if after is not None:
+            statement = statement.where(
+                tuple_(PageResult.file_id, PageResult.page_number)
+                > tuple_(*map(literal, after)),
+            )
+        if before is not None:
+            statement = statement.where(PageResult.file_id < before)
+        return statement.order_by(
+            PageResult.file_id,
+            PageResult.page_number,
+        ).limit(limit)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        limit: int,
+        after: tuple[uuid.UUID, int] | None = None,
+        before: uuid.UUID | None = None,
+    ) -> Sequence[Row[Any]]:
+        return db.execute(
+            self.search_statement(query, limit, after, before),
+        ).all()
+
+    def headlines(
+        self,
+        db: Session,
+        query: str,
+        texts: Sequence[str],
+    ) -> list[str]:
+        # Snippets of every hit in one round trip; the texts are read from
+        # storage by the caller.
+        if not texts:
+            return []
+        tsquery = func.websearch_to_tsquery(settings.SEARCH_TEXT_CONFIG, query)
+        return list(
+            db.execute(
+                select(
+                    *(
+                        func.ts_headline(
+                            settings.SEARCH_TEXT_CONFIG,
+                            page_text,
+                            tsquery,
+                            HEADLINE_OPTIONS,
+                        )
+                        for page_text in texts
+                    ),
+                ),
+            ).one(),
+        )
+
 
 page_result_repo = PageResultRepository()
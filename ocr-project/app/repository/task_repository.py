@@ -1,6 +1,11 @@
+import uuid
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from sqlalchemy import Row, insert, select
 from sqlalchemy.orm import Session
 
-from app.models.task import Task
+from app.models.task import Task, TaskStatus
 
 
 class TaskRepository:
@@ -9,9 +14,32 @@ class TaskRepository:
         db.flush()
         return task
 
-    def get_by_id(self, db: Session, task_id: str) -> Task | None:
+    def add_many(self, db: Session, tasks: Sequence[dict[str, Any]]) -> None:
+        if tasks:
+            db.execute(insert(Task), tasks)
+
+    def get_by_id(self, db: Session, task_id: uuid.UUID) -> Task | None:
         return db.query(Task).filter(Task.id == task_id).first()
 
+    def get_by_ids(
+        self,
+        db: Session,
+        task_ids: Collection[uuid.UUID],
+    ) -> Sequence[Row[tuple[uuid.UUID, TaskStatus, str | None, Any, Any]]]:
+        # Status columns only; the batch status endpoint never needs the
+        # rest of the row or the related file.
+        if not task_ids:
+            return []
+        return db.execute(
+            select(
+                Task.id,
+                Task.status,
+                Task.error_message,
+                Task.created_at,
+                Task.updated_at,
+            ).where(Task.id.in_(task_ids)),
+        ).all()
+
     def save(self, db: Session, task: Task) -> Task:
         db.add(task)
         db.flush()
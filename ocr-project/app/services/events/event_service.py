@@ -0,0 +1,302 @@
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Collection
+from typing import TYPE_CHECKING, Any
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from app.cache.task_status_cache import TaskStatusCache, task_status_cache
+from app.core.config import settings
+from app.services.redis.redis_service import (
+    get_async_redis_client,
+    get_redis_client,
+)
+
+if TYPE_CHECKING:
+    from redis.asyncio.client import PubSub
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "task-events:"
+PROGRESS_KEY_PREFIX = "task-progress:"
+STATUS_EVENT = "status"
+PROGRESS_EVENT = "progress"
+# Not an SSE event: tells the stream to end with the given retry interval.
+RETRY_EVENT = "retry"
+
+type TaskEvent = dict[str, Any]
+
+
+def publish_task_event(
+    task_id: uuid.UUID | str,
+    event: str,
+    data: dict[str, Any],
+) -> None:
+    try:
+        get_redis_client().publish(
+            f"{CHANNEL_PREFIX}{task_id}",
+            json.dumps({"event": event, "data": data}),
+        )
+    except RedisError:
+        logger.warning(
+            "Failed to publish %s event for task %s",
+            event,
+            task_id,
+            exc_info=True,
+        )
+
+
+def record_task_progress(
+    task_id: uuid.UUID | str,
+    page_numbers: Collection[int],
+    total_pages: int,
+) -> None:
+    # Page ranges finish on different workers, so the stored pages are
+    # kept in Redis rather than in any single task. A set counts a page
+    # once however often a retry or a duplicate delivery stores it.
+    key = f"{PROGRESS_KEY_PREFIX}{task_id}"
+    try:
+        pipeline = get_redis_client().pipeline(transaction=False)
+        pipeline.sadd(key, *page_numbers)
+        pipeline.expire(key, settings.TASK_PROGRESS_TTL)
+        pipeline.scard(key)
+        *_, pages_done = pipeline.execute()
+    except RedisError:
+        logger.warning(
+            "Failed to record progress for task %s",
+            task_id,
+            exc_info=True,
+        )
+        return
+    publish_task_event(
+        task_id,
+        PROGRESS_EVENT,
+        {"pages_done": pages_done, "total_pages": total_pages},
+    )
+
+
+class TaskEventBroker:
+    """Fans task events from one Redis subscription out to local queues.
+
+    The subscription covers only the channels of tasks with a local
+    subscriber. Events published while it is down, or dropped from the
+    queue of a slow subscriber, are made up for with a status event read
+    from the status cache, so no subscriber misses its terminal status.
+    If Redis stays unavailable, open streams are ended with a retry event.
+    """
+
+    def __init__(
+        self,
+        client: AsyncRedis,
+        queue_size: int,
+        status_cache: TaskStatusCache,
+        reconnect_attempts: int,
+        reconnect_delay: float,
+    ) -> None:
+        self.client = client
+        self.queue_size = queue_size
+        self.status_cache = status_cache
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.subscribers: defaultdict[str, set[asyncio.Queue[TaskEvent]]] = (
+            defaultdict(set)
+        )
+        self.reader: asyncio.Task[None] | None = None
+        # Set once the reader is subscribed, or has given up, so that no
+        # subscriber waits for it forever.
+        self.ready = asyncio.Event()
+        self.pubsub: PubSub | None = None
+        self.channels: set[str] = set()
+        self.subscription_lock = asyncio.Lock()
+        self.resyncs: dict[str, asyncio.Task[None]] = {}
+        self.stale: set[str] = set()
+
+    @contextlib.asynccontextmanager
+    async def subscribe(
+        self,
+        task_id: uuid.UUID,
+    ) -> AsyncIterator[asyncio.Queue[TaskEvent]]:
+        self._ensure_reader()
+        queue: asyncio.Queue[TaskEvent] = asyncio.Queue(self.queue_size)
+        self.subscribers[str(task_id)].add(queue)
+        try:
+            await self._update_subscription(str(task_id))
+            await self.ready.wait()
+            yield queue
+        finally:
+            queues = self.subscribers[str(task_id)]
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[str(task_id)]
+                await self._update_subscription(str(task_id))
+
+    async def close(self) -> None:
+        if self.reader:
+            self.reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.reader
+            self.reader = None
+            self.ready.clear()
+
+    def _ensure_reader(self) -> None:
+        if self.reader is None or self.reader.done():
+            self.ready.clear()
+            self.reader = asyncio.create_task(self._read_forever())
+
+    async def _update_subscription(self, task_id: str) -> None:
+        # Brings the channel of a task in line with whether it has local
+        # subscribers. Without a connection there is nothing to do: the
+        # reader subscribes every watched task once connected.
+        async with self.subscription_lock:
+            pubsub = self.pubsub
+            watched = task_id in self.subscribers
+            if pubsub is None or watched == (task_id in self.channels):
+                return
+            channel = f"{CHANNEL_PREFIX}{task_id}"
+            try:
+                if watched:
+                    await pubsub.subscribe(channel)
+                    self.channels.add(task_id)
+                else:
+                    await pubsub.unsubscribe(channel)
+                    self.channels.discard(task_id)
+            except RedisError:
+                # The reader fails on the same connection and resubscribes.
+                logger.warning(
+                    "Failed to update the subscription of task %s",
+                    task_id,
+                    exc_info=True,
+                )
+
+    async def _read_forever(self) -> None:
+        reconnect = False
+        failures = 0
+        while True:
+            try:
+                await self._read(reconnect=reconnect)
+            except RedisError:
+                reconnect = True
+                if self.ready.is_set():
+                    failures = 0
+                self.ready.clear()
+                delay = self.reconnect_delay * 2**failures
+                failures += 1
+                if failures > self.reconnect_attempts:
+                    logger.exception(
+                        "Task event subscription lost, giving up",
+                    )
+                    self._end_streams(delay)
+                    return
+                logger.warning(
+                    "Task event subscription lost, reconnecting in %.1fs",
+                    delay,
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+
+    async def _read(self, *, reconnect: bool) -> None:
+        async with self.client.pubsub() as pubsub:
+            try:
+                async with self.subscription_lock:
+                    await pubsub.connect()
+                    self.pubsub = pubsub
+                    self.channels = set(self.subscribers)
+                    if self.channels:
+                        await pubsub.subscribe(
+                            *(
+                                f"{CHANNEL_PREFIX}{task_id}"
+                                for task_id in self.channels
+                            ),
+                        )
+                self.ready.set()
+                if reconnect:
+                    self._resync(list(self.subscribers))
+                while True:
+                    message = await pubsub.get_message(timeout=None)
+                    if not message or message["type"] != "message":
+                        continue
+                    channel = message["channel"].decode()
+                    task_id = channel.removeprefix(CHANNEL_PREFIX)
+                    # The last subscriber may have left since.
+                    queues = self.subscribers.get(task_id)
+                    if not queues:
+                        continue
+                    event = json.loads(message["data"])
+                    if self._deliver(queues, event):
+                        self._resync([task_id])
+            finally:
+                self.pubsub = None
+                self.channels = set()
+
+    def _end_streams(self, retry: float) -> None:
+        # Clients reconnect after the retry interval, by which time Redis
+        # may be back; no event would reach them until then.
+        event = {"event": RETRY_EVENT, "data": {"retry": int(retry * 1000)}}
+        for queues in self.subscribers.values():
+            self._deliver(queues, event)
+        self.ready.set()
+
+    def _deliver(
+        self,
+        queues: Collection[asyncio.Queue[TaskEvent]],
+        event: TaskEvent,
+    ) -> bool:
+        # A stalled client loses its oldest event rather than holding up
+        # everybody else. Returns whether any event was dropped.
+        dropped = False
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                dropped = True
+            queue.put_nowait(event)
+        return dropped
+
+    def _resync(self, task_ids: Collection[str]) -> None:
+        # A task already being resynced is resynced once more afterwards,
+        # as its cache read may predate the events that were lost.
+        self.stale.update(
+            task_id for task_id in task_ids if task_id in self.resyncs
+        )
+        task_ids = [
+            task_id for task_id in task_ids if task_id not in self.resyncs
+        ]
+        if not task_ids:
+            return
+        resync = asyncio.create_task(self._send_cached_status(task_ids))
+        for task_id in task_ids:
+            self.resyncs[task_id] = resync
+
+    async def _send_cached_status(self, task_ids: list[str]) -> None:
+        try:
+            payloads = await self.status_cache.read_many(
+                [uuid.UUID(task_id) for task_id in task_ids],
+            )
+            for task_uuid, payload in payloads.items():
+                queues = self.subscribers.get(str(task_uuid))
+                if queues:
+                    # The cached status is at least as new as any event it
+                    # pushes out, so making room for it needs no resync.
+                    self._deliver(
+                        queues,
+                        {"event": STATUS_EVENT, "data": payload},
+                    )
+        finally:
+            for task_id in task_ids:
+                del self.resyncs[task_id]
+            again = self.stale.intersection(task_ids)
+            self.stale.difference_update(again)
+            self._resync(again)
+
+
+task_event_broker = TaskEventBroker(
+    get_async_redis_client(),
+    settings.TASK_EVENTS_QUEUE_SIZE,
+    task_status_cache,
+    settings.TASK_EVENTS_RECONNECT_ATTEMPTS,
+    settings.TASK_EVENTS_RECONNECT_DELAY,
+)
@@ -3,5 +3,5 @@ class FileService:
         self.bucket_name = bucket_name
         self.allow_types = allow_types
 
-    def is_allowed_file_type(self, content_type: str) -> bool:
+    def is_allowed_file_type(self, content_type: str | None) -> bool:
         return content_type in self.allow_types
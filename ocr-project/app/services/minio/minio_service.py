@@ -1,30 +1,127 @@
 import logging
+import threading
+from collections.abc import Callable
+from typing import override
+
+from urllib3 import BaseHTTPResponse
+from urllib3.exceptions import HTTPError
 
 from app.core.config import settings
+from app.core.tracing import tracer
 from minio import Minio
 from minio.error import S3Error
+from minio.helpers import DictType
 
 logger = logging.getLogger(__name__)
 
-minio_client = Minio(
+NO_SUCH_BUCKET = "NoSuchBucket"
+
+
+class TracedMinio(Minio):
+    """Records a span for every request the client sends to the store."""
+
+    @override
+    def _url_open(
+        self,
+        method: str,
+        region: str,
+        bucket_name: str | None = None,
+        object_name: str | None = None,
+        body: bytes | None = None,
+        headers: DictType | None = None,
+        query_params: DictType | None = None,
+        preload_content: bool = True,
+        no_body_trace: bool = False,
+    ) -> BaseHTTPResponse:
+        # Requests outside any trace, such as bucket provisioning at
+        # startup, are not recorded.
+        if tracer.current() is None:
+            return super()._url_open(
+                method,
+                region,
+                bucket_name,
+                object_name,
+                body,
+                headers,
+                query_params,
+                preload_content,
+                no_body_trace,
+            )
+        with tracer.span(
+            f"minio {method}",
+            bucket=bucket_name,
+            object=object_name,
+        ):
+            return super()._url_open(
+                method,
+                region,
+                bucket_name,
+                object_name,
+                body,
+                headers,
+                query_params,
+                preload_content,
+                no_body_trace,
+            )
+
+
+minio_client = (TracedMinio if tracer.enabled else Minio)(
     settings.MINIO_ENDPOINT,
     access_key=settings.MINIO_ACCESS_KEY,
     secret_key=settings.MINIO_SECRET_KEY,
     secure=settings.MINIO_USE_SSL,
 )
 
+_known_buckets: set[str] = set()
+_known_buckets_lock = threading.Lock()
+
 
 def get_minio_client() -> Minio:
     return minio_client
 
 
 def ensure_bucket_exists(bucket_name: str) -> None:
+    if bucket_name in _known_buckets:
+        return
+    with _known_buckets_lock:
+        if bucket_name in _known_buckets:
+            return
+        try:
+            if not minio_client.bucket_exists(bucket_name):
+                minio_client.make_bucket(bucket_name)
+                logger.info("Created bucket: %s", bucket_name)
+            else:
+                logger.debug("Bucket %s already exists", bucket_name)
+        except S3Error:
+            logger.exception("Error ensuring bucket exists")
+            raise
+        _known_buckets.add(bucket_name)
+
+
+def forget_bucket(bucket_name: str) -> None:
+    with _known_buckets_lock:
+        _known_buckets.discard(bucket_name)
+
+
+def provision_buckets(*bucket_names: str) -> None:
+    for bucket_name in bucket_names:
+        try:
+            ensure_bucket_exists(bucket_name)
+        except (S3Error, HTTPError):
+            logger.exception(
+                "Could not provision bucket %s, deferring to first write",
+                bucket_name,
+            )
+
+
+def run_with_bucket[T](bucket_name: str, operation: Callable[[], T]) -> T:
+    ensure_bucket_exists(bucket_name)
     try:
-        if not minio_client.bucket_exists(bucket_name):
-            minio_client.make_bucket(bucket_name)
-            logger.info("Created bucket: %s", bucket_name)
-        else:
-            logger.info("Bucket %s already exists", bucket_name)
-    except S3Error:
-        logger.exception("Error ensuring bucket exists")
-        raise
+        return operation()
+    except S3Error as e:
+        if e.code != NO_SUCH_BUCKET:
+            raise
+        logger.warning("Bucket %s disappeared, recreating it", bucket_name)
+    forget_bucket(bucket_name)
+    ensure_bucket_exists(bucket_name)
+    return operation()
@@ -0,0 +1,81 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future
+
+from app.services.ocr.ocr_engine import OcrEngine, PageRequest
+
+logger = logging.getLogger(__name__)
+
+type PendingPage = tuple[PageRequest, Future[str]]
+
+
+class MicroBatcher:
+    """Groups pages submitted by concurrent tasks into engine calls.
+
+    A batch is sent once it holds max_batch_size pages or max_wait seconds
+    after its first page arrived, whichever comes first. Only tasks of the
+    same process share batches, so the workers run a thread pool.
+    """
+
+    def __init__(
+        self,
+        engine: OcrEngine,
+        max_batch_size: int,
+        max_wait: float,
+    ) -> None:
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pending: queue.SimpleQueue[PendingPage] = queue.SimpleQueue()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+
+    def recognize(self, pages: Sequence[PageRequest]) -> list[str]:
+        self._ensure_thread()
+        futures: list[Future[str]] = []
+        for page in pages:
+            future: Future[str] = Future()
+            self.pending.put((page, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def _ensure_thread(self) -> None:
+        # Started on first use, so a prefork worker gets one per child
+        # process rather than a thread that does not survive the fork.
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run,
+                    name="ocr-batcher",
+                    daemon=True,
+                )
+                self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[PendingPage]) -> None:
+        try:
+            texts = self.engine.recognize([page for page, _ in batch])
+            results = list(zip(batch, texts, strict=True))
+        except Exception as e:
+            logger.exception("OCR engine failed on a batch of %d", len(batch))
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), text in results:
+            future.set_result(text)
@@ -0,0 +1,47 @@
+import logging
+import re
+import time
+from collections.abc import Buffer, Sequence
+
+from app.core.config import settings
+from app.services.ocr.ocr_engine import OcrEngine, PageRequest, register_engine
+
+logger = logging.getLogger(__name__)
+
+PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page\b")
+
+
+class MockOcrEngine(OcrEngine):
+    """Canned text with an optional cost model of a batched model call."""
+
+    def __init__(
+        self,
+        batch_overhead: float = 0,
+        page_cost: float = 0,
+    ) -> None:
+        self.batch_overhead = batch_overhead
+        self.page_cost = page_cost
+
+    def count_pages(self, file_data: Buffer, file_type: str) -> int:
+        if "pdf" in file_type:
+            return max(1, len(PDF_PAGE_PATTERN.findall(file_data)))
+        return 1
+
+    def recognize(self, pages: Sequence[PageRequest]) -> list[str]:
+        logger.debug("Mock OCR engine recognizing %d pages", len(pages))
+        if self.batch_overhead or self.page_cost:
+            time.sleep(self.batch_overhead + self.page_cost * len(pages))
+        return [
+            f"This is the content of page {page.page_number}."
+            if "pdf" in page.file_type
+            else "This is the content of the image."
+            for page in pages
+        ]
+
+
+@register_engine("mock")
+def create_mock_engine() -> MockOcrEngine:
+    return MockOcrEngine(
+        settings.OCR_MOCK_BATCH_OVERHEAD,
+        settings.OCR_MOCK_PAGE_COST,
+    )
@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from collections.abc import Buffer, Callable, Iterator, Sequence
+from dataclasses import dataclass
+
+type EngineFactory = Callable[[], OcrEngine]
+
+_engines: dict[str, EngineFactory] = {}
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    file_data: Buffer
+    file_type: str
+    page_number: int
+
+
+class OcrEngine(ABC):
+    @abstractmethod
+    def count_pages(self, file_data: Buffer, file_type: str) -> int: ...
+
+    def iter_pages(
+        self,
+        file_data: Buffer,
+        file_type: str,
+        first_page: int,
+        last_page: int,
+    ) -> Iterator[PageRequest]:
+        # Engines that can cut a single page out of the document should
+        # override this; the default hands every page the shared source.
+        for page_number in range(first_page, last_page + 1):
+            yield PageRequest(file_data, file_type, page_number)
+
+    @abstractmethod
+    def recognize(self, pages: Sequence[PageRequest]) -> list[str]:
+        """Return the text of each page, in the order given."""
+
+
+def register_engine(name: str) -> Callable[[EngineFactory], EngineFactory]:
+    def register(factory: EngineFactory) -> EngineFactory:
+        _engines[name] = factory
+        return factory
+
+    return register
+
+
+def create_ocr_engine(name: str) -> OcrEngine:
+    try:
+        factory = _engines[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown OCR engine '{name}'. Registered engines: "
+            f"{', '.join(sorted(_engines))}",
+        ) from None
+    return factory()
@@ -0,0 +1,52 @@
+import importlib
+import itertools
+from collections.abc import Buffer, Container, Iterator
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import OCR_SECONDS
+from app.core.tracing import tracer
+from app.services.ocr import mock_ocr_engine  # noqa: F401 - registers "mock"
+from app.services.ocr.batching import MicroBatcher
+from app.services.ocr.ocr_engine import create_ocr_engine
+
+# Modules named in OCR_ENGINE_MODULES register further engines on import.
+for module in settings.OCR_ENGINE_MODULES:
+    importlib.import_module(module)
+
+ocr_engine = create_ocr_engine(settings.OCR_ENGINE)
+ocr_batcher = MicroBatcher(
+    ocr_engine,
+    settings.OCR_BATCH_MAX_SIZE,
+    settings.OCR_BATCH_MAX_WAIT,
+)
+
+
+def recognize_pages(
+    file_data: Buffer,
+    file_type: str,
+    first_page: int,
+    last_page: int,
+    skip: Container[int] = frozenset(),
+) -> Iterator[dict[str, Any]]:
+    # Pages are pulled from the engine's iterator one batch at a time, so a
+    # task never holds more than a batch of page inputs and texts.
+    pages = (
+        page
+        for page in ocr_engine.iter_pages(
+            file_data,
+            file_type,
+            first_page,
+            last_page,
+        )
+        if page.page_number not in skip
+    )
+    for batch in itertools.batched(
+        pages,
+        ocr_batcher.max_batch_size,
+        strict=False,
+    ):
+        with OCR_SECONDS.time(), tracer.span("ocr", pages=len(batch)):
+            texts = ocr_batcher.recognize(batch)
+        for page, text in zip(batch, texts, strict=True):
+            yield {"page_number": page.page_number, "text": text}
@@ -0,0 +1,22 @@
+from app.core.config import settings
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+redis_client = Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+)
+async_redis_client = AsyncRedis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+)
+
+
+def get_redis_client() -> Redis:
+    return redis_client
+
+
+def get_async_redis_client() -> AsyncRedis:
+    return async_redis_client
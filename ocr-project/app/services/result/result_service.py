@@ -0,0 +1,168 @@
+import asyncio
+import json
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from itertools import islice
+from typing import Protocol
+
+from app.core.executors import run_in_executor, storage_executor
+from app.storage.result_storage import ResultStorage
+
+RANGE_UNIT = "bytes="
+
+
+class PageLocation(Protocol):
+    page_number: int
+    result_path: str
+    result_offset: int | None
+    result_length: int | None
+
+
+@dataclass
+class Segment:
+    result_path: str
+    offset: int | None = None
+    length: int | None = None
+    page_number: int | None = None
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+def parse_page_range(value: str) -> tuple[int, int]:
+    first, _, last = value.partition("-")
+    first_page = int(first)
+    last_page = int(last) if last else first_page
+    if first_page < 1 or last_page < first_page:
+        raise ValueError(f"Invalid page range '{value}'")
+    return first_page, last_page
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    # Single ranges only; multi-range requests get the full representation.
+    if not header or not header.startswith(RANGE_UNIT) or "," in header:
+        return None
+    start, _, end = header.removeprefix(RANGE_UNIT).strip().partition("-")
+    try:
+        if not start:
+            first, last = max(size - int(end), 0), size - 1
+        else:
+            first = int(start)
+            last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size or first > last:
+        raise RangeNotSatisfiableError(header)
+    return first, last
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    # If-None-Match compares weakly: a W/ prefix on either side is ignored.
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def page_record(page_number: int, text: str) -> bytes:
+    """Encode a page as served by the results endpoints."""
+    return json.dumps({"page_number": page_number, "text": text}).encode()
+
+
+class ResultService:
+    def __init__(
+        self,
+        result_storage: ResultStorage,
+        bucket_name: str,
+        prefetch: int,
+        segment_bytes: int,
+    ) -> None:
+        self.result_storage = result_storage
+        self.bucket_name = bucket_name
+        self.prefetch = prefetch
+        self.segment_bytes = segment_bytes
+
+    def plan_segments(self, pages: Sequence[PageLocation]) -> list[Segment]:
+        # Adjacent records of a packed object are fetched with one range
+        # request; per-page objects are fetched one by one.
+        segments: list[Segment] = []
+        for page in pages:
+            if page.result_offset is None or page.result_length is None:
+                segments.append(
+                    Segment(page.result_path, page_number=page.page_number),
+                )
+                continue
+            last = segments[-1] if segments else None
+            if (
+                last is not None
+                and last.page_number is None
+                and last.offset is not None
+                and last.length is not None
+                and last.result_path == page.result_path
+                and last.offset + last.length == page.result_offset
+                and last.length + page.result_length <= self.segment_bytes
+            ):
+                last.length += page.result_length
+                continue
+            segments.append(
+                Segment(
+                    page.result_path,
+                    page.result_offset,
+                    page.result_length,
+                ),
+            )
+        return segments
+
+    def read_segment(self, segment: Segment) -> bytes:
+        # Records are re-encoded so that both storage formats stream the
+        # same shape.
+        if segment.page_number is None:
+            data = self.result_storage.read_bytes(
+                segment.result_path,
+                self.bucket_name,
+                segment.offset,
+                segment.length,
+            )
+            records = (json.loads(line) for line in data.splitlines())
+            return b"".join(
+                page_record(record["page_number"], record["text"]) + b"\n"
+                for record in records
+            )
+        text = self.result_storage.read_page_text(
+            segment.result_path,
+            self.bucket_name,
+        )
+        return page_record(segment.page_number, text) + b"\n"
+
+    async def stream_ndjson(
+        self,
+        pages: Sequence[PageLocation],
+    ) -> AsyncIterator[bytes]:
+        # Keep a bounded window of reads in flight and emit them in page
+        # order, so memory stays at a few segments whatever the page count.
+        segments = iter(self.plan_segments(pages))
+        pending: deque[asyncio.Future[bytes]] = deque()
+
+        def schedule(count: int) -> None:
+            for segment in islice(segments, count):
+                pending.append(
+                    asyncio.ensure_future(
+                        run_in_executor(
+                            storage_executor,
+                            self.read_segment,
+                            segment,
+                        ),
+                    ),
+                )
+
+        schedule(self.prefetch)
+        try:
+            while pending:
+                data = await pending.popleft()
+                schedule(1)
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,142 @@
+import asyncio
+import base64
+import binascii
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.executors import run_in_executor, storage_executor
+from app.repository.page_result_repository import page_result_repo
+from app.storage.result_storage import ResultStorage
+
+if TYPE_CHECKING:
+    from sqlalchemy import Row
+
+# File ids are random UUIDs, so a range covering a fraction of the id space
+# holds about that fraction of the pages.
+UUID_SPACE = 1 << 128
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(file_id: uuid.UUID, page_number: int) -> str:
+    return base64.urlsafe_b64encode(
+        f"{file_id}:{page_number}".encode(),
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[uuid.UUID, int]:
+    try:
+        file_id, _, page_number = (
+            base64.urlsafe_b64decode(cursor).decode().partition(":")
+        )
+        return uuid.UUID(file_id), int(page_number)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(cursor) from None
+
+
+def scan_bound(
+    start: uuid.UUID | None,
+    total_rows: float,
+    scan_rows: int,
+) -> uuid.UUID | None:
+    """Return the file id that ends a scan of about scan_rows pages.
+
+    None means the scan runs to the end of the id space.
+    """
+    if total_rows <= scan_rows:
+        width = UUID_SPACE
+    else:
+        width = UUID_SPACE * scan_rows // int(total_rows)
+    end = (start.int if start else 0) + width
+    return uuid.UUID(int=end) if end < UUID_SPACE else None
+
+
+class SearchService:
+    def __init__(
+        self,
+        result_storage: ResultStorage,
+        bucket_name: str,
+    ) -> None:
+        self.result_storage = result_storage
+        self.bucket_name = bucket_name
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        after = decode_cursor(cursor) if cursor else None
+        total_rows = await db.run_sync(page_result_repo.estimated_count)
+        hits: list[Row[Any]] = []
+        next_cursor = None
+        scanned = 0
+        while True:
+            before = scan_bound(
+                after[0] if after else None,
+                total_rows,
+                settings.SEARCH_SCAN_ROWS,
+            )
+            # One row past the limit tells whether there is a next page.
+            hits.extend(
+                await db.run_sync(
+                    page_result_repo.search,
+                    query,
+                    limit + 1 - len(hits),
+                    after,
+                    before,
+                ),
+            )
+            scanned += settings.SEARCH_SCAN_ROWS
+            if len(hits) > limit:
+                hits = hits[:limit]
+                next_cursor = encode_cursor(
+                    hits[-1].file_id,
+                    hits[-1].page_number,
+                )
+                break
+            if before is None:
+                break
+            # The next range starts at the first page of the bound; pages
+            # are numbered from 1.
+            after = (before, 0)
+            if scanned >= settings.SEARCH_SCAN_BUDGET_ROWS:
+                next_cursor = encode_cursor(*after)
+                break
+
+        # The index holds no text, so snippets are cut from the pages of
+        # this response only, read from storage side by side.
+        texts = await asyncio.gather(
+            *(
+                run_in_executor(
+                    storage_executor,
+                    self.result_storage.read_page_text,
+                    hit.result_path,
+                    self.bucket_name,
+                    hit.result_offset,
+                    hit.result_length,
+                )
+                for hit in hits
+            ),
+        )
+        snippets = await db.run_sync(page_result_repo.headlines, query, texts)
+        return {
+            "query": query,
+            "hits": [
+                {
+                    "file_id": str(hit.file_id),
+                    "filename": hit.filename,
+                    "task_id": str(hit.task_id),
+                    "page_number": hit.page_number,
+                    "snippet": snippet,
+                }
+                for hit, snippet in zip(hits, snippets, strict=True)
+            ],
+            "next_cursor": next_cursor,
+        }
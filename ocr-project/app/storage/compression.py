@@ -0,0 +1,71 @@
+import functools
+import gzip
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import zstandard
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A Content-Encoding and its functions.
+
+    Several compressed records written one after another decompress as
+    one: gzip members and zstd frames both concatenate. That keeps every
+    record of a packed object readable alone through a range request, and
+    adjacent records readable together.
+    """
+
+    encoding: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _zstandard_compress(level: int, data: bytes) -> bytes:
+    # Compressor objects are not safe to share between upload threads.
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _zstandard_decompress(data: bytes) -> bytes:
+    decompressor = zstandard.ZstdDecompressor().decompressobj(
+        read_across_frames=True,
+    )
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def create_codec(name: str, level: int | None = None) -> Codec | None:
+    """Return the codec for a RESULT_COMPRESSION value, None for "none"."""
+    if name == "none":
+        return None
+    if name == GZIP:
+        return Codec(
+            GZIP,
+            # A fixed mtime keeps the output identical for identical input.
+            functools.partial(
+                gzip.compress,
+                compresslevel=6 if level is None else level,
+                mtime=0,
+            ),
+            gzip.decompress,
+        )
+    if name == ZSTD:
+        return Codec(
+            ZSTD,
+            functools.partial(
+                _zstandard_compress,
+                3 if level is None else level,
+            ),
+            _zstandard_decompress,
+        )
+    raise ValueError(f"Unknown compression '{name}'")
+
+
+def decode(data: bytes, encoding: str | None) -> bytes:
+    """Undo the Content-Encoding an object was stored with."""
+    if not encoding or encoding == "identity":
+        return data
+    codec = create_codec(encoding)
+    return codec.decompress(data) if codec else data
@@ -1,36 +1,94 @@
+import hashlib
 import logging
-from io import BytesIO
+from typing import BinaryIO, cast
 
 from fastapi import UploadFile
 from minio import Minio, S3Error
 
-from app.services.minio.minio_service import (
-    ensure_bucket_exists,
-)
+from app.core.config import settings
+from app.core.executors import run_in_executor, storage_executor
+from app.services.minio.minio_service import run_with_bucket
 
 logger = logging.getLogger(__name__)
 
 
+class ChunkedReader:
+    """File-like wrapper that never hands out more than chunk_size bytes."""
+
+    def __init__(self, source: BinaryIO, chunk_size: int) -> None:
+        self.source = source
+        self.chunk_size = chunk_size
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        chunk = self.source.read(size)
+        self.digest.update(chunk)
+        return chunk
+
+
 class FileStorage:
-    def __init__(self, minio_client: Minio) -> None:
+    def __init__(
+        self,
+        minio_client: Minio,
+        part_size: int = settings.MINIO_UPLOAD_PART_SIZE,
+        chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+        parallel_uploads: int = settings.MINIO_UPLOAD_PARALLELISM,
+    ) -> None:
         self.minio_client = minio_client
+        self.part_size = part_size
+        self.chunk_size = chunk_size
+        self.parallel_uploads = parallel_uploads
 
     async def upload_file(
         self,
         file: UploadFile,
         storage_path: str,
         bucket_name: str,
-    ) -> None:
-        ensure_bucket_exists(bucket_name)
-        data = await file.read()
-        try:
+    ) -> str:
+        return await run_in_executor(
+            storage_executor,
+            self._put_stream,
+            file,
+            storage_path,
+            bucket_name,
+        )
+
+    async def remove_file(self, storage_path: str, bucket_name: str) -> None:
+        await run_in_executor(
+            storage_executor,
+            self.minio_client.remove_object,
+            bucket_name,
+            storage_path,
+        )
+
+    def _put_stream(
+        self,
+        file: UploadFile,
+        storage_path: str,
+        bucket_name: str,
+    ) -> str:
+        # Unknown length makes the client do a multipart upload, holding at
+        # most parallel_uploads parts of part_size bytes in memory at once.
+        # The content hash is computed on the same pass over the data.
+        def put() -> str:
+            file.file.seek(0)
+            reader = ChunkedReader(file.file, self.chunk_size)
             self.minio_client.put_object(
                 bucket_name,
                 storage_path,
-                data=BytesIO(data),
-                length=len(data),
-                content_type=file.content_type,
+                # The client only ever calls read().
+                data=cast("BinaryIO", reader),
+                length=-1,
+                part_size=self.part_size,
+                num_parallel_uploads=self.parallel_uploads,
+                content_type=file.content_type or "application/octet-stream",
             )
+            return reader.digest.hexdigest()
+
+        try:
+            return run_with_bucket(bucket_name, put)
         except S3Error:
             logger.exception("Failed to upload file to MinIO")
             raise
@@ -1,36 +1,165 @@
+import contextvars
+import functools
+import json
 import logging
+from collections.abc import Iterable
+from concurrent.futures import Executor
 from io import BytesIO
 
 from minio import Minio, S3Error
+from minio.helpers import DictType
 
-from app.services.minio.minio_service import (
-    ensure_bucket_exists,
-)
+from app.services.minio.minio_service import run_with_bucket
+from app.storage.compression import Codec, decode
 
 logger = logging.getLogger(__name__)
 
 ENCODING_FORMAT = "utf-8"
+PACKED_CONTENT_TYPE = "application/x-ndjson"
 
 
 class ResultStorage:
-    def __init__(self, minio_client: Minio) -> None:
+    """Reads and writes result objects, compressed with codec if given.
+
+    The codec is recorded as the object's Content-Encoding, and reads undo
+    whatever encoding an object was stored with, so objects written
+    before or after a change of codec stay readable.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        codec: Codec | None = None,
+    ) -> None:
         self.minio_client = minio_client
+        self.codec = codec
+
+    def encode(self, text: str) -> bytes:
+        data = text.encode(ENCODING_FORMAT)
+        return self.codec.compress(data) if self.codec else data
+
+    def metadata(self) -> DictType | None:
+        return (
+            {"Content-Encoding": self.codec.encoding} if self.codec else None
+        )
 
     def upload_result(
         self,
         result_data: str,
         storage_path: str,
         bucket_name: str,
-    ) -> None:
-        ensure_bucket_exists(bucket_name)
+    ) -> int:
+        # Returns the stored size, which is what range reads address.
+        data = self.encode(result_data)
         try:
+            run_with_bucket(
+                bucket_name,
+                lambda: self.minio_client.put_object(
+                    bucket_name,
+                    storage_path,
+                    data=BytesIO(data),
+                    length=len(data),
+                    content_type="application/json",
+                    metadata=self.metadata(),
+                ),
+            )
+        except S3Error:
+            logger.exception("Failed to upload result to MinIO")
+            raise
+        return len(data)
+
+    def upload_packed(
+        self,
+        records: Iterable[str],
+        storage_path: str,
+        bucket_name: str,
+    ) -> list[tuple[int, int]]:
+        # One JSON record per line; the returned (offset, length) pairs let
+        # readers fetch a single record with a range request. Records are
+        # compressed one by one so that each can still be read alone.
+        buffer = BytesIO()
+        index = []
+        for record in records:
+            line = self.encode(record + "\n")
+            index.append((buffer.tell(), len(line)))
+            buffer.write(line)
+        size = buffer.tell()
+
+        def put() -> None:
+            buffer.seek(0)
             self.minio_client.put_object(
                 bucket_name,
                 storage_path,
-                data=BytesIO(result_data.encode(ENCODING_FORMAT)),
-                length=len(result_data),
-                content_type="application/json",
+                data=buffer,
+                length=size,
+                content_type=PACKED_CONTENT_TYPE,
+                metadata=self.metadata(),
             )
+
+        try:
+            run_with_bucket(bucket_name, put)
         except S3Error:
-            logger.exception("Failed to upload result to MinIO")
+            logger.exception("Failed to upload packed results to MinIO")
             raise
+        return index
+
+    def read_bytes(
+        self,
+        storage_path: str,
+        bucket_name: str,
+        offset: int | None = None,
+        length: int | None = None,
+    ) -> bytes:
+        # Returns the decoded bytes of the object or of the stored range.
+        # Decoding is left out of the HTTP client, which would only apply
+        # the encodings it happens to have a library for.
+        response = self.minio_client.get_object(
+            bucket_name,
+            storage_path,
+            offset=offset or 0,
+            length=length or 0,
+        )
+        try:
+            data = response.read(decode_content=False)
+            encoding = response.headers.get("Content-Encoding")
+        finally:
+            response.close()
+            response.release_conn()
+        return decode(data, encoding)
+
+    def read_result(
+        self,
+        storage_path: str,
+        bucket_name: str,
+        offset: int | None = None,
+        length: int | None = None,
+    ) -> str:
+        data = self.read_bytes(storage_path, bucket_name, offset, length)
+        return data.decode(ENCODING_FORMAT)
+
+    def read_page_text(
+        self,
+        storage_path: str,
+        bucket_name: str,
+        offset: int | None = None,
+        length: int | None = None,
+    ) -> str:
+        record = self.read_result(storage_path, bucket_name, offset, length)
+        return json.loads(record)["text"]
+
+    def upload_results(
+        self,
+        results: Iterable[tuple[str, str]],
+        bucket_name: str,
+        executor: Executor,
+    ) -> list[int]:
+        # Consuming the map re-raises the first failed upload. Each upload
+        # runs in its own copy of the caller's context, to join its trace.
+        context = contextvars.copy_context()
+        upload = functools.partial(self.upload_result, bucket_name=bucket_name)
+        return list(
+            executor.map(
+                lambda item: context.copy().run(upload, *item),
+                results,
+            ),
+        )
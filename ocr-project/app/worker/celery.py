@@ -1,6 +1,46 @@
-from celery import Celery
+import contextvars
+import os
+import time
+from typing import Any
 
+from celery import Celery, Task
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.exceptions import Retry
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from celery.worker import WorkController
+from kombu import Queue
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    multiprocess,
+    start_http_server,
+)
+
+from app.constant.constant import BUCKET_FILE_STORAGE, BUCKET_RESULT_STORAGE
 from app.core.config import settings
+from app.core.metrics import (
+    WORKER_TASK_FAILURES,
+    WORKER_TASK_RETRIES,
+    WORKER_TASKS_IN_PROGRESS,
+)
+from app.core.tracing import (
+    ENQUEUED_AT,
+    TRACEPARENT,
+    Span,
+    SpanContext,
+    tracer,
+)
+from app.services.minio.minio_service import provision_buckets
 
 broker_url = (
     f"amqp://{settings.RABBITMQ_USER}:{settings.RABBITMQ_PASSWORD}"
@@ -18,3 +58,148 @@ celery_app = Celery(
         "app.worker.file_process_worker",
     ],
 )
+# Publishes block until the broker has taken responsibility for the
+# message, so the outbox only deletes rows that are safely queued.
+celery_app.conf.broker_transport_options = {"confirm_publish": True}
+celery_app.conf.task_queues = (
+    Queue(settings.EXPRESS_QUEUE),
+    Queue(settings.BULK_QUEUE),
+)
+celery_app.conf.task_default_queue = settings.BULK_QUEUE
+# Page ranges only exist for documents too long for a single pass, so they
+# never compete with small documents on the express workers.
+celery_app.conf.task_routes = {
+    "app.worker.file_process_worker.process_page_range": {
+        "queue": settings.BULK_QUEUE,
+    },
+    "app.worker.file_process_worker.finalize_file": {
+        "queue": settings.BULK_QUEUE,
+    },
+}
+
+# Spans of the tasks running in this process, by task id, with the tokens
+# that restore the trace context when they end.
+_task_spans: dict[
+    str,
+    tuple[Span, contextvars.Token[SpanContext | None]],
+] = {}
+
+
+@worker_process_init.connect
+def provision_worker_buckets(**_: Any) -> None:
+    provision_buckets(BUCKET_FILE_STORAGE, BUCKET_RESULT_STORAGE)
+
+
+@worker_init.connect
+def provision_pool_buckets(sender: WorkController, **_: Any) -> None:
+    # Prefork children provision after the fork; every other pool runs its
+    # tasks in this process.
+    if get_implementation(sender.pool_cls) is not PreforkPool:
+        provision_worker_buckets()
+
+
+@worker_init.connect
+def start_metrics_server(**_: Any) -> None:
+    if settings.WORKER_METRICS_PORT is None:
+        return
+    # With a prefork pool the children write their samples to
+    # PROMETHEUS_MULTIPROC_DIR and the main process serves the aggregate.
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    start_http_server(settings.WORKER_METRICS_PORT, registry=registry)
+
+
+@worker_process_shutdown.connect
+def remove_process_metrics(pid: int, **_: Any) -> None:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)  # type: ignore[no-untyped-call]
+
+
+@task_prerun.connect
+def count_task_started(sender: Task, **_: Any) -> None:
+    WORKER_TASKS_IN_PROGRESS.labels(sender.name).inc()
+
+
+@task_postrun.connect
+def count_task_finished(sender: Task, **_: Any) -> None:
+    WORKER_TASKS_IN_PROGRESS.labels(sender.name).dec()
+
+
+@task_retry.connect
+def count_task_retry(sender: Task, reason: BaseException, **_: Any) -> None:
+    # The reason is the Retry raised by the task, wrapping the actual error.
+    error = reason.exc if isinstance(reason, Retry) and reason.exc else reason
+    WORKER_TASK_RETRIES.labels(sender.name, type(error).__name__).inc()
+
+
+@task_failure.connect
+def count_task_failure(
+    sender: Task,
+    exception: BaseException,
+    **_: Any,
+) -> None:
+    WORKER_TASK_FAILURES.labels(sender.name, type(exception).__name__).inc()
+
+
+@before_task_publish.connect
+def add_trace_headers(headers: dict[str, Any], **_: Any) -> None:
+    # Headers set by the publisher, such as those stored with an outbox
+    # row, win. A retry waits in the queue again, so its wait starts now.
+    for key, value in tracer.inject().items():
+        headers.setdefault(key, value)
+    if headers.get("retries"):
+        headers[ENQUEUED_AT] = time.time()
+
+
+@task_prerun.connect
+def start_task_span(task_id: str, task: Task, **_: Any) -> None:
+    # Custom headers are request attributes when the task comes from the
+    # broker and sit under request.headers when it is applied eagerly.
+    request = task.request
+    headers = request.headers or {}
+    parent = SpanContext.from_traceparent(
+        request.get(TRACEPARENT) or headers.get(TRACEPARENT),
+    )
+    queue = (request.delivery_info or {}).get("routing_key")
+    if enqueued_at := request.get(ENQUEUED_AT) or headers.get(ENQUEUED_AT):
+        tracer.end_span(
+            tracer.start_span(
+                "queue wait",
+                parent,
+                start_ns=int(float(enqueued_at) * 1e9),
+                task=task.name,
+                queue=queue,
+            ),
+        )
+    span = tracer.start_span(
+        f"task {task.name}",
+        parent,
+        task_id=task_id,
+        args=list(request.args or ()),
+        queue=queue,
+        retries=request.retries,
+    )
+    _task_spans[task_id] = (span, tracer.activate(span))
+
+
+@task_postrun.connect
+def end_task_span(task_id: str, state: str | None = None, **_: Any) -> None:
+    if task_id not in _task_spans:
+        return
+    span, token = _task_spans.pop(task_id)
+    tracer.deactivate(token)
+    span.attributes["state"] = state
+    tracer.end_span(span)
+
+
+@task_failure.connect
+def record_task_span_error(
+    task_id: str,
+    exception: BaseException,
+    **_: Any,
+) -> None:
+    if task_id in _task_spans:
+        span, _token = _task_spans[task_id]
+        span.error = f"{type(exception).__name__}: {exception}"
@@ -1,27 +1,101 @@
 # ocr-project/app/worker/file_process_worker.py
 
+import functools
+import itertools
 import json
 import logging
+import mmap
+import os
+import tempfile
 import uuid
+from collections.abc import Buffer, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import IO, Any, BinaryIO
 
+from celery import Task as CeleryTask
+from celery import chord
 from minio.error import S3Error
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from urllib3.exceptions import HTTPError
 
+from app.cache.source_cache import source_cache, source_cache_key
+from app.cache.task_status_cache import status_payload, task_status_cache
 from app.constant.constant import BUCKET_FILE_STORAGE, BUCKET_RESULT_STORAGE
+from app.core.config import settings
+from app.core.executors import result_upload_executor
+from app.core.metrics import (
+    COMMIT_SECONDS,
+    COUNT_PAGES_SECONDS,
+    DB_WRITE_SECONDS,
+    DOWNLOAD_SECONDS,
+    FILE_BYTES_DOWNLOADED,
+    PAGES_PROCESSED,
+    RESULT_BYTES_UPLOADED,
+    RESULT_UPLOAD_SECONDS,
+)
 from app.db.session import SessionLocal
-from app.models import PageResult
-from app.models.task import TaskStatus
+from app.models import File, Task
+from app.models.task import TERMINAL_TASK_STATUSES, TaskStatus
 from app.repository.file_repository import file_repo
 from app.repository.page_result_repository import page_result_repo
 from app.repository.task_repository import task_repo
+from app.services.events.event_service import (
+    STATUS_EVENT,
+    publish_task_event,
+    record_task_progress,
+)
 from app.services.minio.minio_service import get_minio_client
+from app.services.ocr.ocr_service import ocr_engine, recognize_pages
+from app.storage.compression import create_codec
 from app.storage.result_storage import ResultStorage
 
 from .celery import celery_app
 
 logger = logging.getLogger(__name__)
 
+RETRYABLE_ERRORS = (OperationalError, S3Error, HTTPError, OSError)
+MISSING_OBJECT_CODES = frozenset({"NoSuchKey", "NoSuchBucket"})
 
-@celery_app.task
+# A tsvector is capped at 1 MB; text past this point is not searchable.
+SEARCH_TEXT_MAX_CHARS = 100_000
+
+result_codec = create_codec(
+    settings.RESULT_COMPRESSION,
+    settings.RESULT_COMPRESSION_LEVEL,
+)
+
+
+class CheckpointedTask(CeleryTask):
+    """Retries transient failures with backoff, then fails the OCR task.
+
+    Pages are committed as they are stored, so a retry only recognizes the
+    pages that are still missing.
+    """
+
+    autoretry_for = RETRYABLE_ERRORS
+    max_retries = settings.TASK_MAX_RETRIES
+    retry_backoff = settings.TASK_RETRY_BACKOFF
+    retry_backoff_max = settings.TASK_RETRY_BACKOFF_MAX
+    retry_jitter = True
+
+    def on_failure(
+        self,
+        exc: BaseException,
+        _task_id: str,
+        args: tuple[Any, ...],
+        _kwargs: dict[str, Any],
+        _einfo: Any,
+    ) -> None:
+        # Runs once retries are exhausted or the error is not retryable.
+        update_task_status_in_new_session(
+            uuid.UUID(args[0]),
+            TaskStatus.FAILED,
+            str(exc),
+        )
+
+
+@celery_app.task(base=CheckpointedTask)
 def process_file(task_id_str: str) -> None:
     task_id = uuid.UUID(task_id_str)
     db = SessionLocal()
@@ -30,6 +104,10 @@ def process_file(task_id_str: str) -> None:
         if not task:
             logger.error("Task with ID %s not found.", task_id)
             return
+        if task.status in TERMINAL_TASK_STATUSES:
+            # The outbox delivers at least once; a repeat is a no-op.
+            logger.info("Task %s is already %s", task_id, task.status.value)
+            return
 
         file = file_repo.get_by_id(db, task.file_id)
         if not file:
@@ -45,57 +123,350 @@ def process_file(task_id_str: str) -> None:
             )
             return
 
-        task.status = TaskStatus.PROCESSING
-        db.commit()
+        if task.status != TaskStatus.PROCESSING:
+            task.status = TaskStatus.PROCESSING
+            db.commit()
+            announce_status(task)
 
-        minio_client = get_minio_client()
-        result_storage = ResultStorage(minio_client)
+        with spool_file(file) as source:
+            with COUNT_PAGES_SECONDS.time():
+                total_pages = ocr_engine.count_pages(source, file.file_type)
 
-        try:
-            file_object = minio_client.get_object(
-                BUCKET_FILE_STORAGE,
-                file.storage_path,
+            chunk_size = settings.OCR_PAGE_CHUNK_SIZE
+            if total_pages > chunk_size:
+                # Spread page ranges over the worker pool; the chord
+                # callback runs once every range has been stored.
+                chord(
+                    process_page_range.s(
+                        task_id_str,
+                        first_page,
+                        min(first_page + chunk_size - 1, total_pages),
+                        total_pages,
+                    )
+                    for first_page in range(1, total_pages + 1, chunk_size)
+                )(finalize_file.s(task_id_str, total_pages))
+                logger.info(
+                    "Task %s split %d pages into ranges of %d",
+                    task_id,
+                    total_pages,
+                    chunk_size,
+                )
+                return
+
+            stored_pages = store_missing_pages(
+                db,
+                task,
+                file,
+                source,
+                first_page=1,
+                last_page=total_pages,
+                total_pages=total_pages,
             )
-            file_data = file_object.read()
-        except S3Error as e:
-            raise RuntimeError(
-                f"Failed to retrieve file from MinIO: {e}",
-            ) from e
 
-        ocr_result = mock_ai_service(file_data, file.file_type)
+        complete_task(db, task, stored_pages, total_pages)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-        for page_data in ocr_result.get("pages", []):
-            page_number = page_data["page_number"]
-            page_text = page_data["text"]
-            result_path = f"{file.id}/page_{page_number}.json"
-            result_content = json.dumps({"text": page_text})
 
-            result_storage.upload_result(
-                result_content,
-                result_path,
-                BUCKET_RESULT_STORAGE,
+@celery_app.task(base=CheckpointedTask)
+def process_page_range(
+    task_id_str: str,
+    first_page: int,
+    last_page: int,
+    total_pages: int,
+) -> int:
+    task_id = uuid.UUID(task_id_str)
+    db = SessionLocal()
+    try:
+        task, file = load_task_and_file(db, task_id)
+        with spool_file(file) as source:
+            return store_missing_pages(
+                db,
+                task,
+                file,
+                source,
+                first_page=first_page,
+                last_page=last_page,
+                total_pages=total_pages,
             )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-            page_result_entry = PageResult(
-                task_id=task.id,
-                file_id=file.id,
-                page_number=page_number,
-                result_path=result_path,
-            )
-            page_result_repo.add(db, page_result_entry)
 
-        file.total_pages = ocr_result.get("total_pages", 0)
-        task.status = TaskStatus.COMPLETED
+@celery_app.task
+def finalize_file(
+    pages_per_range: list[int],
+    task_id_str: str,
+    total_pages: int,
+) -> None:
+    task_id = uuid.UUID(task_id_str)
+    db = SessionLocal()
+    try:
+        task = task_repo.get_by_id(db, task_id)
+        if not task:
+            logger.error("Task with ID %s not found.", task_id)
+            return
 
-        db.commit()
+        complete_task(db, task, sum(pages_per_range), total_pages)
     except Exception as e:
-        logger.exception("Processing failed for task %s", task_id)
+        logger.exception("Finalizing failed for task %s", task_id)
         db.rollback()
         update_task_status_in_new_session(task_id, TaskStatus.FAILED, str(e))
     finally:
         db.close()
 
 
+def complete_task(
+    db: Session,
+    task: Task,
+    stored_pages: int,
+    total_pages: int,
+) -> None:
+    # A document with pages missing is failed rather than reported as done.
+    task.file.total_pages = total_pages
+    if stored_pages == total_pages:
+        task.status = TaskStatus.COMPLETED
+        task.error_message = None
+    else:
+        logger.error(
+            "Task %s stored %d of %d pages",
+            task.id,
+            stored_pages,
+            total_pages,
+        )
+        task.status = TaskStatus.FAILED
+        task.error_message = f"Stored {stored_pages} of {total_pages} pages."
+    db.commit()
+    announce_status(task)
+
+
+def announce_status(task: Task) -> None:
+    # Cache first, then publish: subscribers that miss the event can still
+    # read the new status from the cache.
+    payload = status_payload(task)
+    task_status_cache.write(payload)
+    publish_task_event(task.id, STATUS_EVENT, payload)
+
+
+def load_task_and_file(db: Session, task_id: uuid.UUID) -> tuple[Task, File]:
+    task = task_repo.get_by_id(db, task_id)
+    if not task:
+        raise LookupError(f"Task with ID {task_id} not found.")
+    file = file_repo.get_by_id(db, task.file_id)
+    if not file:
+        raise LookupError(f"File for task {task_id} not found.")
+    return task, file
+
+
+@contextmanager
+def spool_file(file: File) -> Iterator[Buffer]:
+    # The source is memory-mapped from the local cache or a temporary file,
+    # so the document sits in the page cache instead of the worker heap and
+    # only the pages being recognized are ever touched.
+    with open_source(file) as spool:
+        if not os.fstat(spool.fileno()).st_size:
+            # Empty files cannot be mapped.
+            yield b""
+            return
+        with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            yield source
+
+
+@contextmanager
+def open_source(file: File) -> Iterator[BinaryIO]:
+    fetch = functools.partial(download_file, file)
+    if source_cache is not None:
+        with source_cache.open(source_cache_key(file), fetch) as source:
+            yield source
+        return
+    with tempfile.TemporaryFile(dir=settings.WORKER_SPOOL_DIR) as spool:
+        fetch(spool)
+        spool.flush()
+        yield spool
+
+
+def download_file(file: File, target: IO[bytes]) -> None:
+    response = None
+    try:
+        with DOWNLOAD_SECONDS.time():
+            response = get_minio_client().get_object(
+                BUCKET_FILE_STORAGE,
+                file.storage_path,
+            )
+            target.writelines(
+                response.stream(settings.WORKER_SPOOL_CHUNK_SIZE),
+            )
+        FILE_BYTES_DOWNLOADED.inc(target.tell())
+    except S3Error as e:
+        # Other storage errors propagate and are retried with backoff.
+        if e.code in MISSING_OBJECT_CODES:
+            raise LookupError(
+                f"Source file {file.storage_path} not found in storage.",
+            ) from e
+        raise
+    finally:
+        if response is not None:
+            response.close()
+            response.release_conn()
+
+
+def store_missing_pages(
+    db: Session,
+    task: Task,
+    file: File,
+    source: Buffer,
+    *,
+    first_page: int,
+    last_page: int,
+    total_pages: int,
+) -> int:
+    # Pages stored by an earlier attempt are skipped. Returns how many pages
+    # of the range are stored once this attempt is done.
+    stored = page_result_repo.get_page_numbers(
+        db,
+        file.id,
+        first_page,
+        last_page,
+    )
+    if stored:
+        logger.info(
+            "Task %s resumes pages %d-%d with %d already stored",
+            task.id,
+            first_page,
+            last_page,
+            len(stored),
+        )
+    pages = recognize_pages(
+        source,
+        file.file_type,
+        first_page,
+        last_page,
+        skip=stored,
+    )
+    return len(stored) + store_pages(db, task, file, pages, total_pages)
+
+
+def store_pages(
+    db: Session,
+    task: Task,
+    file: File,
+    pages: Iterable[dict[str, Any]],
+    total_pages: int,
+) -> int:
+    # Pages are consumed as they are recognized and committed a batch at a
+    # time, each batch a checkpoint that a retry resumes after.
+    stored_pages = 0
+    for batch in itertools.batched(
+        pages,
+        settings.RESULT_BATCH_SIZE,
+        strict=False,
+    ):
+        if settings.RESULT_FORMAT == "packed":
+            store_packed_batch(db, task, file, batch)
+        else:
+            store_page_batch(db, task, file, batch)
+        with COMMIT_SECONDS.time():
+            db.commit()
+        PAGES_PROCESSED.inc(len(batch))
+        record_task_progress(
+            task.id,
+            [page_data["page_number"] for page_data in batch],
+            total_pages,
+        )
+        stored_pages += len(batch)
+    return stored_pages
+
+
+def store_page_batch(
+    db: Session,
+    task: Task,
+    file: File,
+    batch: Sequence[dict[str, Any]],
+) -> None:
+    # Results of a batch are uploaded concurrently and their rows written
+    # with a single multi-row upsert.
+    results = [
+        (
+            json.dumps({"text": page_data["text"]}),
+            f"{file.id}/page_{page_data['page_number']}.json",
+        )
+        for page_data in batch
+    ]
+    storage = ResultStorage(get_minio_client(), result_codec)
+    with RESULT_UPLOAD_SECONDS.time():
+        lengths = storage.upload_results(
+            results,
+            BUCKET_RESULT_STORAGE,
+            result_upload_executor,
+        )
+    RESULT_BYTES_UPLOADED.inc(sum(lengths))
+    with DB_WRITE_SECONDS.time():
+        page_result_repo.upsert_many(
+            db,
+            [
+                {
+                    "task_id": task.id,
+                    "file_id": file.id,
+                    "page_number": page_data["page_number"],
+                    "result_path": result_path,
+                    "result_offset": None,
+                    "result_length": length,
+                    "search_text": page_data["text"][:SEARCH_TEXT_MAX_CHARS],
+                }
+                for page_data, (_, result_path), length in zip(
+                    batch,
+                    results,
+                    lengths,
+                    strict=True,
+                )
+            ],
+        )
+
+
+def store_packed_batch(
+    db: Session,
+    task: Task,
+    file: File,
+    batch: Sequence[dict[str, Any]],
+) -> None:
+    first_page = batch[0]["page_number"]
+    last_page = batch[-1]["page_number"]
+    result_path = f"{file.id}/pages_{first_page}-{last_page}.jsonl"
+    with RESULT_UPLOAD_SECONDS.time():
+        index = ResultStorage(get_minio_client(), result_codec).upload_packed(
+            (json.dumps(page_data) for page_data in batch),
+            result_path,
+            BUCKET_RESULT_STORAGE,
+        )
+    RESULT_BYTES_UPLOADED.inc(sum(length for _, length in index))
+    with DB_WRITE_SECONDS.time():
+        page_result_repo.upsert_many(
+            db,
+            [
+                {
+                    "task_id": task.id,
+                    "file_id": file.id,
+                    "page_number": page_data["page_number"],
+                    "result_path": result_path,
+                    "result_offset": offset,
+                    "result_length": length,
+                    "search_text": page_data["text"][:SEARCH_TEXT_MAX_CHARS],
+                }
+                for page_data, (offset, length) in zip(
+                    batch,
+                    index,
+                    strict=True,
+                )
+            ],
+        )
+
+
 def update_task_status_in_new_session(
     task_id: uuid.UUID,
     status: TaskStatus,
@@ -108,6 +479,7 @@ def update_task_status_in_new_session(
             task.status = status
             task.error_message = error_message
             session.commit()
+            announce_status(task)
     except Exception:
         logger.exception(
             "Failed to update task %s status to %s",
@@ -117,23 +489,3 @@ def update_task_status_in_new_session(
         session.rollback()
     finally:
         session.close()
-
-
-def mock_ai_service(file_data: bytes, file_type: str) -> dict:
-    logger.info("Mock AI service processing file of type %s", file_type)
-    logger.debug("File data size: %d bytes", len(file_data))
-    if "pdf" in file_type:
-        return {
-            "total_pages": 3,
-            "pages": [
-                {"page_number": 1, "text": "This is the content of page 1."},
-                {"page_number": 2, "text": "This is the content of page 2."},
-                {"page_number": 3, "text": "This is the content of page 3."},
-            ],
-        }
-    return {
-        "total_pages": 1,
-        "pages": [
-            {"page_number": 1, "text": "This is the content of the image."},
-        ],
-    }
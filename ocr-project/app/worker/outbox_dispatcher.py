@@ -0,0 +1,89 @@
+import logging
+import time
+
+from celery.exceptions import CeleryError
+from kombu.exceptions import KombuError
+from prometheus_client import start_http_server
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.metrics import (
+    OUTBOX_BATCH_SECONDS,
+    OUTBOX_DISPATCHED,
+    OUTBOX_LAG_SECONDS,
+    OUTBOX_PUBLISH_FAILURES,
+)
+from app.db.session import SessionLocal
+from app.repository.outbox_repository import outbox_repo
+
+from .celery import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """Moves committed outbox rows to the broker in batches."""
+
+    def __init__(self, batch_size: int, poll_interval: float) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def dispatch_batch(self) -> int:
+        published: list[int] = []
+        with SessionLocal() as db, OUTBOX_BATCH_SECONDS.time():
+            messages = outbox_repo.claim_batch(db, self.batch_size)
+            if not messages:
+                return 0
+            try:
+                with celery_app.producer_or_acquire() as producer:
+                    for message in messages:
+                        celery_app.send_task(
+                            message.task_name,
+                            args=message.args,
+                            queue=message.queue,
+                            headers=message.headers,
+                            producer=producer,
+                        )
+                        published.append(message.id)
+            finally:
+                # Confirmed messages are removed even when a later publish
+                # in the batch fails, so only the rest is sent again.
+                outbox_repo.delete(db, published)
+                db.commit()
+                OUTBOX_DISPATCHED.inc(len(published))
+        return len(published)
+
+    def update_lag(self) -> None:
+        with SessionLocal() as db:
+            OUTBOX_LAG_SECONDS.set(outbox_repo.oldest_age(db))
+
+    def run_forever(self) -> None:
+        while True:
+            dispatched = 0
+            try:
+                dispatched = self.dispatch_batch()
+                self.update_lag()
+            except (CeleryError, KombuError, OSError):
+                OUTBOX_PUBLISH_FAILURES.inc()
+                logger.exception("Failed to publish outbox batch")
+            except SQLAlchemyError:
+                logger.exception("Failed to read or update the outbox")
+            if dispatched < self.batch_size:
+                time.sleep(self.poll_interval)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    start_http_server(settings.OUTBOX_METRICS_PORT)
+    logger.info(
+        "Outbox dispatcher started, metrics on port %d",
+        settings.OUTBOX_METRICS_PORT,
+    )
+    OutboxDispatcher(
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_POLL_INTERVAL,
+    ).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from app.core.config import settings
+
+IMAGE_TYPES = frozenset({"image/png", "image/jpeg"})
+
+
+def queue_for(file_type: str | None, size: int | None) -> str:
+    # Images are always a single page. PDFs are routed on upload size, the
+    # only cost signal known before the page count is read by the worker.
+    if not settings.QUEUE_ROUTING_ENABLED:
+        return settings.BULK_QUEUE
+    if file_type in IMAGE_TYPES:
+        return settings.EXPRESS_QUEUE
+    if size is not None and size <= settings.EXPRESS_MAX_PDF_BYTES:
+        return settings.EXPRESS_QUEUE
+    return settings.BULK_QUEUE
@@ -0,0 +1,170 @@
+"""In-process stand-ins for the services the benchmarks would otherwise need.
+
+InMemoryMinio implements the part of the MinIO client the application
+uses, keeping objects in a dict. Every request sleeps for a fixed latency
+so that fan-out and concurrency still show up in the timings the way they
+would against a real object store.
+"""
+
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from types import SimpleNamespace
+from typing import Any, BinaryIO
+
+from minio.deleteobjects import DeleteError, DeleteObject
+from minio.error import S3Error
+from urllib3 import HTTPHeaderDict
+
+DEFAULT_PART_SIZE = 5 * 1024 * 1024
+
+
+class InMemoryResponse:
+    def __init__(
+        self,
+        data: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.data = data
+        self.headers = HTTPHeaderDict(headers or {})
+        self.position = 0
+
+    def read(
+        self,
+        amt: int | None = None,
+        *,
+        decode_content: bool = True,  # noqa: ARG002 - bodies are never decoded
+    ) -> bytes:
+        end = len(self.data) if amt is None else self.position + amt
+        chunk = self.data[self.position : end]
+        self.position += len(chunk)
+        return chunk
+
+    def stream(self, amt: int = 64 * 1024) -> Iterator[bytes]:
+        while chunk := self.read(amt):
+            yield chunk
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+class InMemoryMinio:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.buckets: set[str] = set()
+        self.objects: dict[tuple[str, str], tuple[bytes, dict[str, Any]]] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _request(self) -> None:
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _error(self, code: str, bucket_name: str, object_name: str) -> S3Error:
+        return S3Error(
+            None,
+            code,
+            f"{code}: {bucket_name}/{object_name}",
+            f"/{bucket_name}/{object_name}",
+            "",
+            "",
+            bucket_name,
+            object_name,
+        )
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        self._request()
+        return bucket_name in self.buckets
+
+    def make_bucket(self, bucket_name: str) -> None:
+        self._request()
+        self.buckets.add(bucket_name)
+
+    def put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: BinaryIO,
+        length: int,
+        *,
+        content_type: str = "application/octet-stream",
+        metadata: dict[str, str] | None = None,
+        part_size: int = 0,
+        **_: Any,
+    ) -> None:
+        if length == -1:
+            # Multipart upload: one request per part.
+            parts = []
+            while part := data.read(part_size or DEFAULT_PART_SIZE):
+                self._request()
+                parts.append(part)
+            body = b"".join(parts)
+        else:
+            self._request()
+            body = data.read(length)
+        if bucket_name not in self.buckets:
+            raise self._error("NoSuchBucket", bucket_name, object_name)
+        with self.lock:
+            self.objects[bucket_name, object_name] = (
+                body,
+                {"content_type": content_type, "metadata": metadata or {}},
+            )
+
+    def _object(self, bucket_name: str, object_name: str) -> tuple:
+        self._request()
+        try:
+            return self.objects[bucket_name, object_name]
+        except KeyError:
+            raise self._error(
+                "NoSuchKey",
+                bucket_name,
+                object_name,
+            ) from None
+
+    def get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+        **_: Any,
+    ) -> InMemoryResponse:
+        body, info = self._object(bucket_name, object_name)
+        end = offset + length if length else len(body)
+        # Standard headers such as Content-Encoding come back as sent.
+        return InMemoryResponse(body[offset:end], info["metadata"])
+
+    def stat_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        **_: Any,
+    ) -> SimpleNamespace:
+        body, info = self._object(bucket_name, object_name)
+        return SimpleNamespace(
+            size=len(body),
+            etag=f"{hash(body):x}",
+            content_type=info["content_type"],
+            metadata=info["metadata"],
+        )
+
+    def remove_object(self, bucket_name: str, object_name: str) -> None:
+        self._request()
+        with self.lock:
+            self.objects.pop((bucket_name, object_name), None)
+
+    def remove_objects(
+        self,
+        bucket_name: str,
+        delete_object_list: Iterable[DeleteObject],
+    ) -> Iterator[DeleteError]:
+        self._request()
+        with self.lock:
+            for delete_object in delete_object_list:
+                self.objects.pop((bucket_name, delete_object.name), None)
+        return iter(())
@@ -0,0 +1,327 @@
+"""Load test of a live stack: upload acceptance and end-to-end OCR latency.
+
+Uploads a weighted mix of generated documents and follows every accepted
+task to COMPLETED through the batch status endpoint. Each load level runs
+for --duration seconds, then waits up to --drain-timeout for the tasks it
+started. Two modes:
+
+- open: uploads arrive at a fixed rate per second whatever the backlog,
+  which shows where latency starts to climb as the offered load grows
+- closed: a fixed number of users each upload a document and wait for it
+  to complete before sending the next, which shows the throughput the
+  stack sustains
+
+Pass several --levels to sweep rates or user counts and find the knee of
+the capacity curve, and --mix to weight the document profiles. The report
+is JSON, on stdout or in --output:
+
+    uv run python -m benchmarks.load_test --mode open --levels 2 4 8 16
+    uv run python -m benchmarks.load_test --mode closed --levels 4 16 64
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger("benchmark")
+
+KIB = 1024
+MIB = 1024 * KIB
+MIN_SAMPLES = 2
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+@dataclass(frozen=True)
+class Profile:
+    content_type: str
+    extension: str
+    size: int
+    pages: int = 1
+
+
+PROFILES = {
+    "png": Profile("image/png", ".png", 300 * KIB),
+    "jpeg": Profile("image/jpeg", ".jpg", 800 * KIB),
+    "pdf-small": Profile("application/pdf", ".pdf", 500 * KIB, 5),
+    "pdf-large": Profile("application/pdf", ".pdf", 20 * MIB, 200),
+}
+
+
+@dataclass
+class Upload:
+    profile: str
+    started: float
+    task_id: str | None = None
+    accepted: float | None = None
+    completed: float | None = None
+    status: str | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def make_document(profile: Profile) -> bytes:
+    # A unique header keeps uploads from being deduplicated; the mock
+    # engine counts PDF pages by their page objects.
+    header = f"{uuid.uuid4()}\n".encode()
+    if profile.content_type == "application/pdf":
+        header = (
+            b"%PDF-1.4\n%" + header + b"<< /Type /Page >>\n" * profile.pages
+        )
+    return header.ljust(profile.size, b"\0")
+
+
+def mix_entry(value: str) -> tuple[str, float]:
+    name, _, weight = value.partition("=")
+    if name not in PROFILES:
+        raise argparse.ArgumentTypeError(
+            f"unknown profile {name!r}, expected one of {sorted(PROFILES)}",
+        )
+    return name, float(weight or 1)
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < MIN_SAMPLES:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+class LoadTest:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        args: argparse.Namespace,
+    ) -> None:
+        self.client = client
+        self.args = args
+        self.names = list(args.mix)
+        self.weights = list(args.mix.values())
+        self.uploads: list[Upload] = []
+        self.pending: dict[str, Upload] = {}
+        self.errors: Counter[str] = Counter()
+
+    async def upload(self) -> Upload:
+        name = random.choices(self.names, self.weights)[0]  # noqa: S311
+        profile = PROFILES[name]
+        content = make_document(profile)
+        upload = Upload(name, time.perf_counter())
+        self.uploads.append(upload)
+        try:
+            response = await self.client.post(
+                "/files",
+                files={
+                    "file": (
+                        f"{name}{profile.extension}",
+                        content,
+                        profile.content_type,
+                    ),
+                },
+            )
+        except httpx.HTTPError as e:
+            self.errors[type(e).__name__] += 1
+            upload.done.set()
+            return upload
+
+        upload.accepted = time.perf_counter()
+        if response.status_code != httpx.codes.CREATED:
+            self.errors[str(response.status_code)] += 1
+            upload.done.set()
+            return upload
+        body = response.json()
+        upload.task_id = body["task_id"]
+        if body["status"] in TERMINAL_STATUSES:
+            # Duplicates of processed files complete on upload.
+            self.finish(upload, body["status"])
+        else:
+            self.pending[upload.task_id] = upload
+        return upload
+
+    def finish(self, upload: Upload, status: str) -> None:
+        upload.completed = time.perf_counter()
+        upload.status = status
+        if status != "completed":
+            self.errors[f"task {status}"] += 1
+        upload.done.set()
+
+    async def poll(self) -> None:
+        # One batch request per interval covers every task in flight.
+        while True:
+            await asyncio.sleep(self.args.poll_interval)
+            task_ids = list(self.pending)
+            for start in range(0, len(task_ids), self.args.poll_batch):
+                chunk = task_ids[start : start + self.args.poll_batch]
+                try:
+                    response = await self.client.post(
+                        "/tasks/status:batch",
+                        json={"task_ids": chunk},
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    logger.warning("Status poll failed: %s", e)
+                    continue
+                for task_id, task in response.json()["tasks"].items():
+                    if task["status"] in TERMINAL_STATUSES:
+                        self.finish(self.pending.pop(task_id), task["status"])
+
+    async def open_loop(self, rate: float) -> None:
+        started = time.perf_counter()
+        arrivals: list[asyncio.Task[Upload]] = []
+        for index in range(int(rate * self.args.duration)):
+            await asyncio.sleep(
+                max(0.0, started + index / rate - time.perf_counter()),
+            )
+            arrivals.append(asyncio.create_task(self.upload()))
+        await asyncio.gather(*arrivals)
+
+    async def closed_loop(self, users: int) -> None:
+        deadline = time.perf_counter() + self.args.duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                upload = await self.upload()
+                await upload.done.wait()
+
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def run(self, level: float) -> dict[str, Any]:
+        poller = asyncio.create_task(self.poll())
+        started = time.perf_counter()
+        try:
+            if self.args.mode == "open":
+                await self.open_loop(level)
+            else:
+                await self.closed_loop(int(level))
+            offered_seconds = time.perf_counter() - started
+            try:
+                async with asyncio.timeout(self.args.drain_timeout):
+                    await asyncio.gather(
+                        *(upload.done.wait() for upload in self.uploads),
+                    )
+            except TimeoutError:
+                logger.warning("%d tasks did not finish", len(self.pending))
+        finally:
+            poller.cancel()
+        return self.report(level, offered_seconds)
+
+    def report(self, level: float, offered_seconds: float) -> dict[str, Any]:
+        accepted = [u for u in self.uploads if u.task_id]
+        completed = [u for u in self.uploads if u.status == "completed"]
+        last_completion = max(
+            (u.completed for u in completed),
+            default=time.perf_counter(),
+        )
+        first_start = min((u.started for u in self.uploads), default=0.0)
+        return {
+            "level": level,
+            "uploads": len(self.uploads),
+            "accepted": len(accepted),
+            "completed": len(completed),
+            "unfinished": len(self.pending),
+            "errors": dict(self.errors),
+            "accepted_per_s": len(accepted) / offered_seconds,
+            "completed_per_s": len(completed)
+            / max(last_completion - first_start, 1e-9),
+            "acceptance": percentiles(
+                [u.accepted - u.started for u in accepted],
+            ),
+            "completion": percentiles(
+                [u.completed - u.started for u in completed],
+            ),
+            "completion_by_profile": {
+                name: percentiles(
+                    [
+                        u.completed - u.started
+                        for u in completed
+                        if u.profile == name
+                    ],
+                )
+                for name in self.names
+            },
+        }
+
+
+async def run_levels(args: argparse.Namespace) -> list[dict[str, Any]]:
+    limits = httpx.Limits(max_connections=args.max_connections)
+    levels = []
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        timeout=args.request_timeout,
+        limits=limits,
+    ) as client:
+        for level in args.levels:
+            logger.info("Running %s loop at level %s", args.mode, level)
+            levels.append(await LoadTest(client, args).run(level))
+            logger.info(
+                "accepted %.1f/s, completed %.1f/s, completion p95 %s ms",
+                levels[-1]["accepted_per_s"],
+                levels[-1]["completed_per_s"],
+                levels[-1]["completion"].get("p95_ms"),
+            )
+    return levels
+
+
+def main(args: argparse.Namespace) -> None:
+    report = {
+        "mode": args.mode,
+        "duration": args.duration,
+        "mix": args.mix,
+        "levels": asyncio.run(run_levels(args)),
+    }
+    document = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + "\n")
+    else:
+        sys.stdout.write(document + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument(
+        "--levels",
+        type=float,
+        nargs="+",
+        default=[1.0, 2.0, 4.0, 8.0],
+        help="Uploads per second in open mode, users in closed mode.",
+    )
+    parser.add_argument(
+        "--mix",
+        type=mix_entry,
+        nargs="+",
+        default=[
+            ("png", 3),
+            ("jpeg", 1),
+            ("pdf-small", 2),
+            ("pdf-large", 0.2),
+        ],
+        help="Profile weights as name=weight, from: " + ", ".join(PROFILES),
+    )
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--drain-timeout", type=float, default=600.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--poll-batch", type=int, default=500)
+    parser.add_argument("--request-timeout", type=float, default=300.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    args.mix = dict(args.mix)
+    main(args)
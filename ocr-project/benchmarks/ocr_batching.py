@@ -0,0 +1,148 @@
+"""OCR throughput against micro-batch size.
+
+Recognizes a number of documents with a number of concurrent tasks, each
+sending its pages through a MicroBatcher, for a series of max batch sizes
+and reports pages/sec.
+The default engine is the mock with a fixed per-call overhead and a
+per-page cost, a rough model of a batched model invocation. Pass --engine
+to measure any registered engine instead:
+
+    uv run python -m benchmarks.ocr_batching --tasks 8 --pages 64
+    uv run python -m benchmarks.ocr_batching --pages 1 --pool prefork
+
+Tasks run the way a Celery worker pool would run them. With --pool threads,
+as the workers are deployed, every task shares the process's batcher. With
+--pool prefork each task runs in its own process with its own batcher, so
+pages of different tasks are never batched together. Either way the engine
+stands for one accelerator per host: its calls never overlap.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+from collections.abc import Buffer, Sequence
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from multiprocessing.synchronize import Lock
+
+from app.services.ocr.batching import MicroBatcher
+from app.services.ocr.mock_ocr_engine import MockOcrEngine
+from app.services.ocr.ocr_engine import (
+    OcrEngine,
+    PageRequest,
+    create_ocr_engine,
+)
+
+logger = logging.getLogger("benchmark")
+
+DOCUMENT = b"%PDF-1.4\n" + b"<< /Type /Page >>\n" * 1000
+
+
+# The batcher of the current process, as a worker process would hold it.
+batcher: MicroBatcher | None = None
+
+
+class DeviceEngine(OcrEngine):
+    """An engine whose calls from every process take turns on the device."""
+
+    def __init__(self, engine: OcrEngine, device: Lock) -> None:
+        self.engine = engine
+        self.device = device
+
+    def count_pages(self, file_data: Buffer, file_type: str) -> int:
+        return self.engine.count_pages(file_data, file_type)
+
+    def recognize(self, pages: Sequence[PageRequest]) -> list[str]:
+        with self.device:
+            return self.engine.recognize(pages)
+
+
+def create_engine(args: argparse.Namespace) -> OcrEngine:
+    return (
+        create_ocr_engine(args.engine)
+        if args.engine
+        else MockOcrEngine(args.batch_overhead, args.page_cost)
+    )
+
+
+def init_process(
+    args: argparse.Namespace,
+    batch_size: int,
+    device: Lock,
+) -> None:
+    global batcher  # noqa: PLW0603
+    batcher = MicroBatcher(
+        DeviceEngine(create_engine(args), device),
+        batch_size,
+        args.max_wait,
+    )
+
+
+def task(pages: int) -> None:
+    if batcher is None:
+        raise RuntimeError("init_process was not run")
+    batcher.recognize(
+        [
+            PageRequest(DOCUMENT, "application/pdf", page_number)
+            for page_number in range(1, pages + 1)
+        ],
+    )
+
+
+def run(batch_size: int, args: argparse.Namespace) -> float:
+    executor: Executor
+    device = multiprocessing.Lock()
+    if args.pool == "prefork":
+        executor = ProcessPoolExecutor(
+            max_workers=args.tasks,
+            initializer=init_process,
+            initargs=(args, batch_size, device),
+        )
+        # Start the processes before the clock does.
+        list(executor.map(time.sleep, [0] * args.tasks))
+    else:
+        init_process(args, batch_size, device)
+        executor = ThreadPoolExecutor(max_workers=args.tasks)
+    with executor:
+        started = time.perf_counter()
+        list(executor.map(task, [args.pages] * args.documents))
+        elapsed = time.perf_counter() - started
+    return args.documents * args.pages / elapsed
+
+
+def main(args: argparse.Namespace) -> None:
+    for batch_size in args.batch_sizes:
+        logger.info(
+            "%s, batch size %3d: %8.1f pages/s",
+            args.pool,
+            batch_size,
+            run(batch_size, args),
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine")
+    parser.add_argument(
+        "--pool",
+        choices=["threads", "prefork"],
+        default="threads",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32, 64],
+    )
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--max-wait", type=float, default=0.01)
+    parser.add_argument("--batch-overhead", type=float, default=0.02)
+    parser.add_argument("--page-cost", type=float, default=0.001)
+    main(parser.parse_args())
@@ -0,0 +1,339 @@
+"""Offline benchmark suite for the upload API, the worker and result writes.
+
+Runs the API and the worker in-process, with an in-memory MinIO stand-in
+that adds a fixed latency per request and Celery in eager mode, so neither
+an object store nor a broker is needed. Postgres and Redis are the local
+servers configured in Settings (set POSTGRES_HOST and REDIS_HOST); the
+tables live in a scratch schema that is dropped afterwards. Measures:
+
+- upload: POST /files throughput and latency at a fixed concurrency
+- worker: pages/sec of process_file over multi-page PDFs
+- status: GET /tasks/{id}/status latency once the cache is warm
+- result_fanout: store_pages throughput in each result format
+
+The results are written as JSON, to stdout or to --output, so that runs on
+different commits can be compared:
+
+    uv run python -m benchmarks.offline --label main --output main.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.endpoints import files, results
+from app.core.config import settings
+from app.db import session
+from app.main import app
+from app.models import Base, File, Task
+from app.models.task import TaskStatus
+from app.services.minio import minio_service
+from app.worker.celery import celery_app
+from app.worker.file_process_worker import process_file, store_pages
+
+from .fakes import InMemoryMinio
+
+logger = logging.getLogger("benchmark")
+
+SCHEMA = "offline_benchmark"
+BENCHMARKS = ("upload", "worker", "status", "result_fanout")
+MIN_SAMPLES = 2
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < MIN_SAMPLES:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def make_pdf(pages: int) -> bytes:
+    # The mock engine counts page objects. The random comment keeps every
+    # document unique so that uploads are never deduplicated.
+    return (
+        f"%PDF-1.4\n% {uuid.uuid4()}\n".encode()
+        + b"<< /Type /Page >>\n" * pages
+    )
+
+
+def install_stand_ins(args: argparse.Namespace) -> InMemoryMinio:
+    minio = InMemoryMinio(args.storage_latency)
+    minio_service.minio_client = minio
+    files.file_storage.minio_client = minio
+    results.result_storage.minio_client = minio
+
+    celery_app.conf.update(
+        task_always_eager=True,
+        task_eager_propagates=True,
+        result_backend="cache+memory://",
+    )
+
+    options = {"options": f"-csearch_path={SCHEMA}"}
+    engine = create_engine(settings.get_database_url(), connect_args=options)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        Base.metadata.create_all(connection)
+    session.SessionLocal.configure(bind=engine)
+    session.AsyncSessionLocal.configure(
+        bind=create_async_engine(
+            settings.get_async_database_url(),
+            connect_args=options,
+        ),
+    )
+    return minio
+
+
+def drop_schema() -> None:
+    with session.engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+async def upload(
+    client: httpx.AsyncClient,
+    filename: str,
+    content: bytes,
+    content_type: str,
+) -> tuple[str, float]:
+    started = time.perf_counter()
+    response = await client.post(
+        "/files",
+        files={"file": (filename, content, content_type)},
+    )
+    response.raise_for_status()
+    return response.json()["task_id"], time.perf_counter() - started
+
+
+async def bench_upload(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+) -> tuple[dict[str, Any], list[str]]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(index: int) -> tuple[str, float]:
+        content = f"{index}-{uuid.uuid4()}".encode().ljust(
+            args.upload_bytes,
+            b"\0",
+        )
+        async with semaphore:
+            return await upload(client, f"{index}.png", content, "image/png")
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(args.uploads)))
+    elapsed = time.perf_counter() - started
+    task_ids = [task_id for task_id, _ in outcomes]
+    return {
+        "uploads": args.uploads,
+        "upload_bytes": args.upload_bytes,
+        "concurrency": args.concurrency,
+        "uploads_per_s": args.uploads / elapsed,
+        "mib_per_s": args.uploads * args.upload_bytes / elapsed / 2**20,
+        **percentiles([latency for _, latency in outcomes]),
+    }, task_ids
+
+
+async def bench_worker(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    task_ids = []
+    for index in range(args.documents):
+        task_id, _ = await upload(
+            client,
+            f"{index}.pdf",
+            make_pdf(args.pages),
+            "application/pdf",
+        )
+        task_ids.append(task_id)
+
+    # Threads stand in for the worker processes of one host.
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.worker_concurrency) as pool:
+        list(
+            pool.map(
+                lambda task_id: process_file.apply(args=(task_id,)),
+                task_ids,
+            ),
+        )
+    elapsed = time.perf_counter() - started
+
+    with session.SessionLocal() as db:
+        completed = (
+            db.query(Task)
+            .filter(
+                Task.id.in_([uuid.UUID(task_id) for task_id in task_ids]),
+                Task.status == TaskStatus.COMPLETED,
+            )
+            .count()
+        )
+    return {
+        "documents": args.documents,
+        "pages_per_document": args.pages,
+        "worker_concurrency": args.worker_concurrency,
+        "completed": completed,
+        "seconds": elapsed,
+        "pages_per_s": args.documents * args.pages / elapsed,
+    }
+
+
+async def bench_status(
+    client: httpx.AsyncClient,
+    task_ids: list[str],
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    # One pass to fill the status cache, then timed random reads.
+    for task_id in task_ids:
+        (await client.get(f"/tasks/{task_id}/status")).raise_for_status()
+    latencies = []
+    for _ in range(args.status_requests):
+        started = time.perf_counter()
+        response = await client.get(
+            f"/tasks/{random.choice(task_ids)}/status",  # noqa: S311
+        )
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return {"tasks": len(task_ids), **percentiles(latencies)}
+
+
+def bench_result_fanout(
+    minio: InMemoryMinio,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    pages = [
+        {"page_number": number, "text": f"Benchmark text of page {number}."}
+        for number in range(1, args.fanout_pages + 1)
+    ]
+    result_format = settings.RESULT_FORMAT
+    measurements = {}
+    try:
+        for name in ("pages", "packed"):
+            settings.RESULT_FORMAT = name
+            with session.SessionLocal() as db:
+                file = File(
+                    id=uuid.uuid4(),
+                    filename="fanout.pdf",
+                    storage_path=f"fanout/{uuid.uuid4()}.pdf",
+                    file_type="application/pdf",
+                )
+                task = Task(file=file, status=TaskStatus.PROCESSING)
+                db.add_all([file, task])
+                db.commit()
+
+                requests = minio.requests
+                started = time.perf_counter()
+                store_pages(db, task, file, pages, len(pages))
+                elapsed = time.perf_counter() - started
+            measurements[name] = {
+                "pages": len(pages),
+                "seconds": elapsed,
+                "pages_per_s": len(pages) / elapsed,
+                "storage_requests": minio.requests - requests,
+            }
+    finally:
+        settings.RESULT_FORMAT = result_format
+    return measurements
+
+
+async def run(args: argparse.Namespace, minio: InMemoryMinio) -> dict:
+    measurements: dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://benchmark/api/v1",
+        timeout=60,
+    ) as client:
+        task_ids: list[str] = []
+        if {"upload", "status"} & set(args.benchmarks):
+            measurements["upload"], task_ids = await bench_upload(client, args)
+        if "worker" in args.benchmarks:
+            measurements["worker"] = await bench_worker(client, args)
+        if "status" in args.benchmarks:
+            measurements["status"] = await bench_status(
+                client,
+                task_ids,
+                args,
+            )
+    if "result_fanout" in args.benchmarks:
+        measurements["result_fanout"] = bench_result_fanout(minio, args)
+    return {name: measurements[name] for name in args.benchmarks}
+
+
+def main(args: argparse.Namespace) -> None:
+    minio = install_stand_ins(args)
+    try:
+        measurements = asyncio.run(run(args, minio))
+    finally:
+        drop_schema()
+
+    report = {
+        "label": args.label,
+        "started_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in {"label", "output"}
+        },
+        "settings": {
+            "OCR_PAGE_CHUNK_SIZE": settings.OCR_PAGE_CHUNK_SIZE,
+            "OCR_BATCH_MAX_SIZE": settings.OCR_BATCH_MAX_SIZE,
+            "RESULT_BATCH_SIZE": settings.RESULT_BATCH_SIZE,
+            "RESULT_COMPRESSION": settings.RESULT_COMPRESSION,
+            "RESULT_UPLOAD_WORKERS": settings.RESULT_UPLOAD_WORKERS,
+            "STORAGE_IO_WORKERS": settings.STORAGE_IO_WORKERS,
+        },
+        "results": measurements,
+    }
+    document = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + "\n")
+        logger.info("Wrote %s", args.output)
+    else:
+        sys.stdout.write(document + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Only the summary: per-request and per-task logs would dominate.
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+    )
+    parser.add_argument("--label")
+    parser.add_argument("--output")
+    parser.add_argument("--storage-latency", type=float, default=0.002)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--upload-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    parser.add_argument("--status-requests", type=int, default=1000)
+    parser.add_argument("--fanout-pages", type=int, default=2000)
+    main(parser.parse_args())
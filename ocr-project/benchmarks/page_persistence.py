@@ -0,0 +1,120 @@
+"""Per-page versus batched persistence of OCR page results.
+
+Writes the same synthetic document through the old one-upload-one-flush
+loop and through store_pages, against the MinIO and Postgres configured in
+Settings, and reports the wall time of each. Database rows and result
+objects are removed afterwards.
+
+    uv run python -m benchmarks.page_persistence --pages 3000
+"""
+
+import argparse
+import json
+import logging
+import time
+import uuid
+
+from minio.deleteobjects import DeleteObject
+from sqlalchemy.orm import Session
+
+from app.constant.constant import BUCKET_RESULT_STORAGE
+from app.db.session import SessionLocal
+from app.models import File, PageResult, Task
+from app.models.task import TaskStatus
+from app.repository.page_result_repository import page_result_repo
+from app.services.minio.minio_service import get_minio_client
+from app.storage.result_storage import ResultStorage
+from app.worker.file_process_worker import store_pages
+
+logger = logging.getLogger("benchmark")
+
+
+def make_pages(count: int) -> list[dict]:
+    return [
+        {"page_number": number, "text": f"Benchmark text of page {number}."}
+        for number in range(1, count + 1)
+    ]
+
+
+def store_pages_one_by_one(
+    db: Session,
+    task: Task,
+    file: File,
+    pages: list[dict],
+) -> None:
+    result_storage = ResultStorage(get_minio_client())
+    for page_data in pages:
+        result_path = f"{file.id}/page_{page_data['page_number']}.json"
+        result_storage.upload_result(
+            json.dumps({"text": page_data["text"]}),
+            result_path,
+            BUCKET_RESULT_STORAGE,
+        )
+        page_result_repo.add(
+            db,
+            PageResult(
+                task_id=task.id,
+                file_id=file.id,
+                page_number=page_data["page_number"],
+                result_path=result_path,
+            ),
+        )
+
+
+def run(strategy: str, pages: list[dict]) -> float:
+    db = SessionLocal()
+    file = File(
+        id=uuid.uuid4(),
+        filename="benchmark.pdf",
+        storage_path=f"benchmark/{uuid.uuid4()}.pdf",
+        file_type="application/pdf",
+    )
+    task = Task(file=file, status=TaskStatus.PROCESSING)
+    db.add_all([file, task])
+    db.flush()
+    try:
+        started = time.perf_counter()
+        if strategy == "per-page":
+            store_pages_one_by_one(db, task, file, pages)
+        else:
+            store_pages(db, task, file, pages, len(pages))
+        db.flush()
+        return time.perf_counter() - started
+    finally:
+        # store_pages commits as it goes, so its rows are deleted rather
+        # than rolled back.
+        db.rollback()
+        db.query(PageResult).filter(PageResult.file_id == file.id).delete()
+        db.query(Task).filter(Task.file_id == file.id).delete()
+        db.query(File).filter(File.id == file.id).delete()
+        db.commit()
+        db.close()
+        errors = get_minio_client().remove_objects(
+            BUCKET_RESULT_STORAGE,
+            (
+                DeleteObject(f"{file.id}/page_{page['page_number']}.json")
+                for page in pages
+            ),
+        )
+        for error in errors:
+            logger.warning("Cleanup failed: %s", error)
+
+
+def main(args: argparse.Namespace) -> None:
+    pages = make_pages(args.pages)
+    for strategy in ("per-page", "batched"):
+        elapsed = run(strategy, pages)
+        logger.info(
+            "%-8s %d pages in %.2fs (%.0f pages/s)",
+            strategy,
+            args.pages,
+            elapsed,
+            args.pages / elapsed,
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3000)
+    main(parser.parse_args())
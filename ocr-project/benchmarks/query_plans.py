@@ -0,0 +1,207 @@
+"""Query plans and timings before and after the task/page result indexes.
+
+Builds the schema in a scratch Postgres schema without the indexes added by
+migration b81f2c6d4e93, seeds it with synthetic files, tasks and pages,
+and runs EXPLAIN ANALYZE on the hot lookups. It then creates the indexes
+and repeats the measurements. The scratch schema is dropped afterwards.
+Uses the Postgres configured in Settings unless --url is given:
+
+    uv run python -m benchmarks.query_plans --files 20000 --pages 50
+"""
+
+import argparse
+import logging
+import re
+import statistics
+import time
+
+from sqlalchemy import Connection, create_engine, text
+
+from app.core.config import settings
+from app.models import Base
+
+logger = logging.getLogger("benchmark")
+
+SCHEMA = "index_benchmark"
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+# The same indexes as the migration, minus CONCURRENTLY: nothing else
+# writes to the scratch schema.
+INDEXES = {
+    "ix_page_results_task_id": (
+        "CREATE INDEX ix_page_results_task_id ON page_results (task_id)"
+    ),
+    "uq_page_results_file_id_page_number": (
+        "CREATE UNIQUE INDEX uq_page_results_file_id_page_number"
+        " ON page_results (file_id, page_number)"
+    ),
+    "ix_tasks_file_id": "CREATE INDEX ix_tasks_file_id ON tasks (file_id)",
+    "ix_tasks_status_active": (
+        "CREATE INDEX ix_tasks_status_active ON tasks (status)"
+        " WHERE status IN ('PENDING', 'PROCESSING')"
+    ),
+}
+
+QUERIES = {
+    "pages of a task": (
+        "SELECT page_number, result_path, result_offset, result_length"
+        " FROM page_results WHERE task_id = :task_id ORDER BY page_number"
+    ),
+    "one page of a task": (
+        "SELECT * FROM page_results"
+        " WHERE task_id = :task_id AND page_number = :page_number"
+    ),
+    "pages of a file": "SELECT * FROM page_results WHERE file_id = :file_id",
+    "task of a file": "SELECT * FROM tasks WHERE file_id = :file_id",
+    "active tasks": (
+        "SELECT id FROM tasks WHERE status IN ('PENDING', 'PROCESSING')"
+    ),
+    "delete pages of a file": (
+        "DELETE FROM page_results WHERE file_id = :file_id"
+    ),
+}
+
+
+def create_schema(connection: Connection) -> None:
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(text(f"SET search_path TO {SCHEMA}"))
+    Base.metadata.create_all(connection)
+    # Start from the schema as it was before the migration.
+    connection.execute(
+        text(
+            "ALTER TABLE page_results"
+            " DROP CONSTRAINT uq_page_results_file_id_page_number",
+        ),
+    )
+    for name in INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def seed(connection: Connection, files: int, pages: int) -> None:
+    connection.execute(
+        text(
+            "INSERT INTO files (id, filename, storage_path, file_type)"
+            " SELECT gen_random_uuid(), 'seed.pdf', 'seed/' || n || '.pdf',"
+            " 'application/pdf' FROM generate_series(1, :files) AS n",
+        ),
+        {"files": files},
+    )
+    # Roughly one task in a hundred is still pending or processing.
+    connection.execute(
+        text(
+            "INSERT INTO tasks (id, file_id, status)"
+            " SELECT gen_random_uuid(), id, CASE"
+            " WHEN random() < 0.005 THEN 'PENDING'::taskstatus"
+            " WHEN random() < 0.01 THEN 'PROCESSING'::taskstatus"
+            " ELSE 'COMPLETED'::taskstatus END FROM files",
+        ),
+    )
+    connection.execute(
+        text(
+            "INSERT INTO page_results"
+            " (id, task_id, file_id, page_number, result_path)"
+            " SELECT gen_random_uuid(), tasks.id, tasks.file_id, page,"
+            " tasks.file_id || '/page_' || page || '.json'"
+            " FROM tasks CROSS JOIN generate_series(1, :pages) AS page",
+        ),
+        {"pages": pages},
+    )
+    connection.execute(text("ANALYZE"))
+
+
+def explain(
+    connection: Connection,
+    query: str,
+    params: dict,
+    repeat: int,
+) -> tuple[float, str]:
+    timings = []
+    plan: list[str] = []
+    for _ in range(repeat):
+        # Roll back after each run so DELETE plans measure the same rows.
+        transaction = connection.begin_nested()
+        plan = list(
+            connection.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"),
+                params,
+            ).scalars(),
+        )
+        transaction.rollback()
+        match = EXECUTION_TIME.search(plan[-1])
+        if match:
+            timings.append(float(match.group(1)))
+    return statistics.median(timings), "\n".join(plan)
+
+
+def measure(
+    connection: Connection,
+    params: dict,
+    repeat: int,
+) -> dict[str, float]:
+    timings = {}
+    for name, query in QUERIES.items():
+        timings[name], plan = explain(connection, query, params, repeat)
+        logger.info("-- %s\n%s\n", name, plan)
+    return timings
+
+
+def main(args: argparse.Namespace) -> None:
+    engine = create_engine(args.url)
+    with engine.connect() as connection:
+        try:
+            create_schema(connection)
+            started = time.perf_counter()
+            seed(connection, args.files, args.pages)
+            connection.commit()
+            logger.info(
+                "Seeded %d files with %d pages each in %.1fs",
+                args.files,
+                args.pages,
+                time.perf_counter() - started,
+            )
+            row = connection.execute(
+                text(
+                    "SELECT id, file_id FROM tasks ORDER BY random() LIMIT 1",
+                ),
+            ).one()
+            params = {
+                "task_id": row.id,
+                "file_id": row.file_id,
+                "page_number": args.pages // 2 or 1,
+            }
+
+            logger.info("==== Before indexes ====")
+            before = measure(connection, params, args.repeat)
+
+            for name, statement in INDEXES.items():
+                started = time.perf_counter()
+                connection.execute(text(statement))
+                logger.info(
+                    "Built %s in %.1fs",
+                    name,
+                    time.perf_counter() - started,
+                )
+            connection.execute(text("ANALYZE"))
+            connection.commit()
+
+            logger.info("==== After indexes ====")
+            after = measure(connection, params, args.repeat)
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            connection.commit()
+
+    logger.info("%-24s %12s %12s", "query", "before ms", "after ms")
+    for name in QUERIES:
+        logger.info("%-24s %12.3f %12.3f", name, before[name], after[name])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.get_database_url())
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+"""Small-document latency under a mixed workload, with and without routing.
+
+Models the worker pools as threads taking one job at a time from their
+queue, as Celery workers with a prefetch multiplier of one do, and runs a
+simulated OCR job whose cost grows with the page count. Large PDFs arrive
+first and a steady stream of small documents follows, once with
+everything on one queue and once routed by queue_for onto separate
+express and bulk pools of the same total size. Reports the
+submit-to-finish latency percentiles of the small documents:
+
+    uv run python -m benchmarks.queue_routing --workers 4 --large 24
+"""
+
+import argparse
+import logging
+import queue
+import statistics
+import threading
+import time
+
+from app.core.config import settings
+from app.worker.routing import queue_for
+
+logger = logging.getLogger("benchmark")
+
+MIB = 1024 * 1024
+MIN_SAMPLES = 2
+
+type Job = tuple[str, int]
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < MIN_SAMPLES:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+def work(
+    jobs: queue.Queue[Job | None],
+    page_cost: float,
+    finished_at: dict[str, float],
+) -> None:
+    while (job := jobs.get()) is not None:
+        document_id, pages = job
+        time.sleep(pages * page_cost)
+        finished_at[document_id] = time.perf_counter()
+
+
+def run(args: argparse.Namespace, *, routed: bool) -> dict[str, float]:
+    if routed:
+        pools = {
+            settings.EXPRESS_QUEUE: args.express_workers,
+            settings.BULK_QUEUE: args.workers - args.express_workers,
+        }
+    else:
+        pools = {settings.BULK_QUEUE: args.workers}
+
+    queues: dict[str, queue.Queue[Job | None]] = {
+        name: queue.Queue() for name in pools
+    }
+    finished_at: dict[str, float] = {}
+    threads = [
+        threading.Thread(
+            target=work,
+            args=(queues[name], args.page_cost, finished_at),
+        )
+        for name, size in pools.items()
+        for _ in range(size)
+    ]
+    for thread in threads:
+        thread.start()
+
+    documents = [
+        ("application/pdf", 40 * MIB, args.large_pages)
+        for _ in range(args.large)
+    ]
+    documents += [("image/png", 300 * 1024, 1) for _ in range(args.small)]
+    submitted: dict[str, float] = {}
+    for index, (file_type, size, pages) in enumerate(documents):
+        document_id = f"{'small' if pages == 1 else 'large'}-{index}"
+        name = queue_for(file_type, size) if routed else settings.BULK_QUEUE
+        submitted[document_id] = time.perf_counter()
+        queues[name].put((document_id, pages))
+        if pages == 1:
+            time.sleep(args.small_interval)
+
+    for name, size in pools.items():
+        for _ in range(size):
+            queues[name].put(None)
+    for thread in threads:
+        thread.join()
+
+    return percentiles(
+        [
+            finished_at[document_id] - submitted[document_id]
+            for document_id in finished_at
+            if document_id.startswith("small")
+        ],
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    for routed in (False, True):
+        logger.info(
+            "%-10s small documents: %s",
+            "routed" if routed else "one queue",
+            run(args, routed=routed),
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--express-workers", type=int, default=1)
+    parser.add_argument("--large", type=int, default=24)
+    parser.add_argument("--large-pages", type=int, default=200)
+    parser.add_argument("--small", type=int, default=200)
+    parser.add_argument("--small-interval", type=float, default=0.02)
+    parser.add_argument("--page-cost", type=float, default=0.005)
+    main(parser.parse_args())
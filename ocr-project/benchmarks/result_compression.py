@@ -0,0 +1,204 @@
+"""Size and CPU cost of result compression on multilingual OCR text.
+
+Encodes pages exactly as the worker stores them, one compressed record per
+page, with each codec and level, and reports the compression ratio and the
+compress and decompress throughput per language. Needs no services.
+
+By default the pages are synthetic: words drawn from a sample text in each
+language, laid out in lines with page numbers, dates, amounts and a
+sprinkling of recognition errors, so that they compress roughly like real
+OCR output rather than like repeated sentences. Pass --corpus with a
+directory of UTF-8 .txt files of real OCR output, one page per form feed,
+to measure that instead:
+
+    uv run python -m benchmarks.result_compression
+    uv run python -m benchmarks.result_compression --corpus ocr-samples/
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from app.storage.compression import create_codec
+from app.storage.result_storage import ResultStorage
+
+logger = logging.getLogger("benchmark")
+
+# Article 1 of the Universal Declaration of Human Rights.
+SAMPLES = {
+    "en": "All human beings are born free and equal in dignity and rights. "
+    "They are endowed with reason and conscience and should act towards "
+    "one another in a spirit of brotherhood.",
+    "vi": "Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân phẩm "
+    "và quyền. Mọi con người đều được tạo hóa ban cho lý trí và lương tâm "
+    "và cần phải đối xử với nhau trong tình bằng hữu.",
+    "de": "Alle Menschen sind frei und gleich an Würde und Rechten geboren. "
+    "Sie sind mit Vernunft und Gewissen begabt und sollen einander im "
+    "Geist der Brüderlichkeit begegnen.",
+    "fr": "Tous les êtres humains naissent libres et égaux en dignité et en "
+    "droits. Ils sont doués de raison et de conscience et doivent agir les "
+    "uns envers les autres dans un esprit de fraternité.",
+    "ru": "Все люди рождаются свободными и равными в своем достоинстве и "
+    "правах. Они наделены разумом и совестью и должны поступать в "
+    "отношении друг друга в духе братства.",
+    "ar": "يولد جميع الناس أحرارًا متساوين في الكرامة والحقوق. وقد وهبوا "
+    "عقلاً وضميرًا وعليهم أن يعامل بعضهم بعضًا بروح الإخاء.",
+    "zh": "人人生而自由,在尊严和权利上一律平等。他们赋有理性和良心,"
+    "并应以兄弟关系的精神相对待。",
+    "ja": "すべての人間は、生まれながらにして自由であり、かつ、尊厳と権利と"
+    "について平等である。人間は、理性と良心とを授けられており、互いに同胞の"
+    "精神をもって行動しなければならない。",
+}
+# Scripts written without spaces are sampled by character.
+UNSPACED = {"zh", "ja"}
+DEFAULT_CODECS = ["none", "gzip:1", "gzip:6", "gzip:9", "zstd:1", "zstd:3"]
+# Share of lines that end in an amount, and of characters misrecognized.
+AMOUNT_RATE = 0.2
+ERROR_RATE = 0.01
+
+
+def synthetic_page(language: str, number: int, rng: random.Random) -> str:
+    sample = SAMPLES[language]
+    tokens = list(sample) if language in UNSPACED else sample.split()
+    separator = "" if language in UNSPACED else " "
+    line_tokens = 30 if language in UNSPACED else 10
+    lines = [
+        f"- {number} -",
+        f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2025",
+    ]
+    for _ in range(rng.randint(30, 50)):
+        line = separator.join(rng.choices(tokens, k=line_tokens))
+        if rng.random() < AMOUNT_RATE:
+            line += f" {rng.randint(0, 99999)},{rng.randint(0, 99):02d}"
+        lines.append(line)
+    text = "\n".join(lines)
+    # Recognition errors: characters replaced by others from the page.
+    chars = list(text)
+    for _ in range(int(len(chars) * ERROR_RATE)):
+        chars[rng.randrange(len(chars))] = rng.choice(chars)
+    return "".join(chars)
+
+
+def load_pages(args: argparse.Namespace) -> dict[str, list[str]]:
+    if args.corpus:
+        return {
+            path.stem: [
+                page
+                for page in path.read_text(encoding="utf-8").split("\f")
+                if page.strip()
+            ]
+            for path in sorted(Path(args.corpus).glob("*.txt"))
+        }
+    rng = random.Random(args.seed)  # noqa: S311
+    return {
+        language: [
+            synthetic_page(language, number, rng)
+            for number in range(1, args.pages + 1)
+        ]
+        for language in args.languages
+    }
+
+
+def measure(
+    storage: ResultStorage,
+    pages: list[str],
+    repeat: int,
+) -> dict[str, Any]:
+    # The records are the per-page result objects the worker uploads.
+    records = [json.dumps({"text": text}) for text in pages]
+    raw_bytes = sum(len(record.encode()) for record in records)
+
+    started = time.process_time()
+    for _ in range(repeat):
+        stored = [storage.encode(record) for record in records]
+    compress_seconds = (time.process_time() - started) / repeat
+
+    stored_bytes = sum(len(data) for data in stored)
+    started = time.process_time()
+    for _ in range(repeat):
+        for data in stored:
+            if storage.codec:
+                storage.codec.decompress(data)
+    decompress_seconds = (time.process_time() - started) / repeat
+
+    return {
+        "pages": len(records),
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": raw_bytes / stored_bytes,
+        "compress_mib_per_cpu_s": raw_bytes
+        / max(compress_seconds, 1e-9)
+        / 2**20,
+        "decompress_mib_per_cpu_s": raw_bytes
+        / max(decompress_seconds, 1e-9)
+        / 2**20,
+        "compress_us_per_page": compress_seconds / len(records) * 1e6,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    corpus = load_pages(args)
+    results: dict[str, dict[str, Any]] = {}
+    for spec in args.codecs:
+        name, _, level = spec.partition(":")
+        try:
+            codec = create_codec(name, int(level) if level else None)
+        except ValueError as e:
+            logger.warning("Skipping %s: %s", spec, e)
+            continue
+        storage = ResultStorage(None, codec)
+        results[spec] = {
+            language: measure(storage, pages, args.repeat)
+            for language, pages in corpus.items()
+        }
+        logger.info(
+            "%-8s %s",
+            spec,
+            "  ".join(
+                f"{language} {result['ratio']:.1f}x"
+                for language, result in results[spec].items()
+            ),
+        )
+
+    report = {
+        "source": args.corpus or "synthetic",
+        "parameters": {
+            "pages": args.pages,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    document = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(document + "\n")
+    else:
+        sys.stdout.write(document + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--codecs",
+        nargs="+",
+        default=DEFAULT_CODECS,
+        help="Codecs as name or name:level.",
+    )
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        choices=sorted(SAMPLES),
+        default=list(SAMPLES),
+    )
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus")
+    parser.add_argument("--output")
+    main(parser.parse_args())
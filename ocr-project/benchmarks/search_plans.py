@@ -0,0 +1,226 @@
+"""Query plans and timings of page search on a large synthetic table.
+
+Builds the schema in a scratch Postgres schema and seeds it with synthetic
+pages whose text contains a term on every page ("common"), a term on one
+page in a hundred ("uncommon") and a term on a handful of pages ("rare").
+For each term it runs EXPLAIN ANALYZE on the statement the search endpoint
+sends, once unbounded and once bounded to SEARCH_SCAN_ROWS rows, from the
+start of the table and from a cursor halfway through it. The scratch schema
+is dropped afterwards. Uses the Postgres configured in Settings unless
+--url is given:
+
+    uv run python -m benchmarks.search_plans --files 40000 --pages 50
+"""
+
+import argparse
+import logging
+import re
+import statistics
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import Connection, Select, create_engine, text
+
+from app.core.config import settings
+from app.models import Base, PageResult
+from app.repository.page_result_repository import page_result_repo
+from app.services.search.search_service import UUID_SPACE, scan_bound
+
+logger = logging.getLogger("benchmark")
+
+SCHEMA = "search_benchmark"
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+GIN_INDEX = "ix_page_results_search_vector"
+# Distinct filler texts; pages reuse them so seeding stays fast.
+FILLER_TEXTS = 1000
+TERMS = ("common", "uncommon", "rare")
+
+
+def create_schema(connection: Connection) -> None:
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(text(f"SET search_path TO {SCHEMA}"))
+    Base.metadata.create_all(connection)
+    # Building the GIN index once after seeding beats updating it per row.
+    connection.execute(text(f"DROP INDEX {GIN_INDEX}"))
+
+
+def seed(connection: Connection, args: argparse.Namespace) -> None:
+    connection.execute(
+        text(
+            "INSERT INTO files (id, filename, storage_path, file_type)"
+            " SELECT gen_random_uuid(), 'seed.pdf', 'seed/' || n || '.pdf',"
+            " 'application/pdf' FROM generate_series(1, :files) AS n",
+        ),
+        {"files": args.files},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO tasks (id, file_id, status)"
+            " SELECT gen_random_uuid(), id, 'COMPLETED' FROM files",
+        ),
+    )
+    # Filler words come from a vocabulary large enough that none of them
+    # matches most pages.
+    connection.execute(
+        text(
+            "CREATE TEMPORARY TABLE filler AS"
+            " SELECT n, to_tsvector(CAST(:config AS regconfig),"
+            " string_agg('w' || floor(random() * :vocabulary), ' '))"
+            " AS vector FROM generate_series(0, :texts - 1) AS n"
+            " CROSS JOIN generate_series(1, :words) GROUP BY n",
+        ),
+        {
+            "config": settings.SEARCH_TEXT_CONFIG,
+            "vocabulary": args.vocabulary,
+            "texts": FILLER_TEXTS,
+            "words": args.words,
+        },
+    )
+    total = args.files * args.pages
+    connection.execute(
+        text(
+            "INSERT INTO page_results (id, task_id, file_id, page_number,"
+            " result_path, search_vector)"
+            " SELECT gen_random_uuid(), tasks.id, tasks.file_id, page,"
+            " tasks.file_id || '/page_' || page || '.json',"
+            " filler.vector || to_tsvector(CAST(:config AS regconfig),"
+            " 'common'"
+            " || CASE WHEN random() < 0.01 THEN ' uncommon' ELSE '' END"
+            " || CASE WHEN random() < :rare THEN ' rare' ELSE '' END)"
+            " FROM tasks CROSS JOIN generate_series(1, :pages) AS page"
+            " JOIN filler ON filler.n"
+            " = abs(hashtext(tasks.file_id || '/' || page)) % :texts",
+        ),
+        {
+            "config": settings.SEARCH_TEXT_CONFIG,
+            "pages": args.pages,
+            "rare": args.rare_pages / total,
+            "texts": FILLER_TEXTS,
+        },
+    )
+    started = time.perf_counter()
+    next(
+        index
+        for index in PageResult.__table__.indexes
+        if index.name == GIN_INDEX
+    ).create(connection)
+    logger.info("Built %s in %.1fs", GIN_INDEX, time.perf_counter() - started)
+    connection.execute(text("ANALYZE"))
+
+
+def explain(
+    connection: Connection,
+    statement: Select[Any],
+    repeat: int,
+) -> tuple[float, str]:
+    compiled = statement.compile(dialect=connection.dialect)
+    timings = []
+    plan: list[str] = []
+    for _ in range(repeat):
+        plan = list(
+            connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {compiled}",
+                compiled.params,
+            ).scalars(),
+        )
+        match = EXECUTION_TIME.search(plan[-1])
+        if match:
+            timings.append(float(match.group(1)))
+    return statistics.median(timings), "\n".join(plan)
+
+
+def main(args: argparse.Namespace) -> None:
+    engine = create_engine(args.url)
+    timings: dict[tuple[str, str, str], float] = {}
+    with engine.connect() as connection:
+        try:
+            create_schema(connection)
+            started = time.perf_counter()
+            seed(connection, args)
+            connection.commit()
+            logger.info(
+                "Seeded %d files with %d pages each in %.1fs",
+                args.files,
+                args.pages,
+                time.perf_counter() - started,
+            )
+            rows = connection.execute(
+                text(
+                    "SELECT reltuples FROM pg_class"
+                    " WHERE oid = CAST('page_results' AS regclass)",
+                ),
+            ).scalar_one()
+            starts = {
+                "first page": None,
+                "halfway": (uuid.UUID(int=UUID_SPACE // 2), 0),
+            }
+            for term in TERMS:
+                for start_name, after in starts.items():
+                    bounds = {
+                        "unbounded": None,
+                        "bounded": scan_bound(
+                            after[0] if after else None,
+                            rows,
+                            args.scan_rows,
+                        ),
+                    }
+                    for bound_name, before in bounds.items():
+                        statement = page_result_repo.search_statement(
+                            term,
+                            args.limit + 1,
+                            after,
+                            before,
+                        )
+                        key = (term, start_name, bound_name)
+                        timings[key], plan = explain(
+                            connection,
+                            statement,
+                            args.repeat,
+                        )
+                        logger.info("-- %s, %s, %s\n%s\n", *key, plan)
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            connection.commit()
+
+    logger.info(
+        "%-10s %-12s %14s %14s",
+        "term",
+        "start",
+        "unbounded ms",
+        "bounded ms",
+    )
+    for term in TERMS:
+        for start_name in ("first page", "halfway"):
+            logger.info(
+                "%-10s %-12s %14.3f %14.3f",
+                term,
+                start_name,
+                timings[term, start_name, "unbounded"],
+                timings[term, start_name, "bounded"],
+            )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.get_database_url())
+    parser.add_argument("--files", type=int, default=40000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--words", type=int, default=100)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--rare-pages", type=int, default=20)
+    parser.add_argument(
+        "--scan-rows",
+        type=int,
+        default=settings.SEARCH_SCAN_ROWS,
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=settings.SEARCH_PAGE_SIZE,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""Many simultaneous subscribers on the task events stream.
+
+Uploads a few documents, attaches a large number of Server-Sent Events
+subscribers spread over their tasks, and reports how many connected, how
+long connecting took and how long after upload acceptance each subscriber
+saw the terminal status. Run it against a live stack:
+
+    uv run python benchmarks/sse_subscribers.py --subscribers 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+import httpx
+
+logger = logging.getLogger("benchmark")
+
+TERMINAL_STATUSES = {"completed", "failed"}
+MIN_SAMPLES = 2
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < MIN_SAMPLES:
+        return {"count": len(samples)}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+async def upload(client: httpx.AsyncClient, pages: int) -> tuple[str, float]:
+    body = b"%PDF-1.4\n" + b"<< /Type /Page >>\n" * pages
+    response = await client.post(
+        "/files",
+        files={"file": ("events.pdf", body, "application/pdf")},
+    )
+    response.raise_for_status()
+    return response.json()["task_id"], time.perf_counter()
+
+
+async def subscribe(
+    client: httpx.AsyncClient,
+    task_id: str,
+    connected: list[float],
+) -> float | None:
+    started = time.perf_counter()
+    async with client.stream("GET", f"/tasks/{task_id}/events") as response:
+        response.raise_for_status()
+        connected.append(time.perf_counter() - started)
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line.removeprefix("event:").strip()
+            elif line.startswith("data:") and event == "status":
+                data = json.loads(line.removeprefix("data:"))
+                if data["status"] in TERMINAL_STATUSES:
+                    return time.perf_counter()
+    return None
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.subscribers + args.tasks)
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        limits=limits,
+        timeout=httpx.Timeout(None),
+    ) as client:
+        uploads = await asyncio.gather(
+            *(upload(client, args.pages) for _ in range(args.tasks)),
+        )
+        connected: list[float] = []
+        subscribers = []
+        for index in range(args.subscribers):
+            task_id, accepted_at = uploads[index % args.tasks]
+            subscribers.append(
+                (
+                    accepted_at,
+                    asyncio.create_task(subscribe(client, task_id, connected)),
+                ),
+            )
+        results = await asyncio.gather(
+            *(task for _, task in subscribers),
+            return_exceptions=True,
+        )
+
+    delivered = [
+        finished_at - accepted_at
+        for (accepted_at, _), finished_at in zip(
+            subscribers,
+            results,
+            strict=True,
+        )
+        if isinstance(finished_at, float)
+    ]
+    errors = [result for result in results if isinstance(result, Exception)]
+    logger.info("subscribers: %d, errors: %d", args.subscribers, len(errors))
+    logger.info("connect: %s", percentiles(connected))
+    logger.info("upload -> terminal event: %s", percentiles(delivered))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=60)
+    asyncio.run(main(parser.parse_args()))
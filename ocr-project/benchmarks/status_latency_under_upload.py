@@ -0,0 +1,129 @@
+"""Status endpoint latency while large uploads run against the same API.
+
+Polls GET /tasks/{id}/status at a fixed rate, first on an idle API and then
+while a number of large uploads are streamed concurrently, and prints the
+latency percentiles for both phases. Run it against a live stack:
+
+    uv run python benchmarks/status_latency_under_upload.py --uploads 8
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import time
+
+import httpx
+
+logger = logging.getLogger("benchmark")
+
+MIB = 1024 * 1024
+
+
+class ZeroStream(io.RawIOBase):
+    def __init__(self, size: int) -> None:
+        self.remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        count = min(len(buffer), self.remaining)
+        buffer[:count] = b"\0" * count
+        self.remaining -= count
+        return count
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+async def create_task(client: httpx.AsyncClient) -> str:
+    response = await client.post(
+        "/files",
+        files={"file": ("probe.png", b"\x89PNG\r\n\x1a\n", "image/png")},
+    )
+    response.raise_for_status()
+    return response.json()["task_id"]
+
+
+async def poll_status(
+    client: httpx.AsyncClient,
+    task_id: str,
+    duration: float,
+    interval: float,
+) -> list[float]:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(f"/tasks/{task_id}/status")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(max(0.0, interval - samples[-1]))
+    return samples
+
+
+async def upload_until(
+    client: httpx.AsyncClient,
+    size: int,
+    stop: asyncio.Event,
+) -> int:
+    uploaded = 0
+    while not stop.is_set():
+        response = await client.post(
+            "/files",
+            files={"file": ("large.pdf", ZeroStream(size), "application/pdf")},
+        )
+        response.raise_for_status()
+        uploaded += size
+    return uploaded
+
+
+async def main(args: argparse.Namespace) -> None:
+    timeout = httpx.Timeout(None)
+    async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+        task_id = await create_task(client)
+
+        idle = await poll_status(client, task_id, args.duration, args.interval)
+
+        stop = asyncio.Event()
+        uploads = [
+            asyncio.create_task(
+                upload_until(client, args.size_mb * MIB, stop),
+            )
+            for _ in range(args.uploads)
+        ]
+        started = time.perf_counter()
+        loaded = await poll_status(
+            client,
+            task_id,
+            args.duration,
+            args.interval,
+        )
+        stop.set()
+        uploaded = sum(await asyncio.gather(*uploads))
+        elapsed = time.perf_counter() - started
+
+    logger.info("idle:   %s", percentiles(idle))
+    logger.info("loaded: %s", percentiles(loaded))
+    logger.info("upload throughput: %.1f MiB/s", uploaded / MIB / elapsed)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.models import Base
+
+
+@pytest.fixture
+def db_schema():
+    # The tables live in a throwaway schema of the configured database.
+    schema = f"test_{uuid.uuid4().hex}"
+    engine = create_engine(settings.get_database_url())
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"CREATE SCHEMA {schema}"))
+            connection.execute(text(f"SET search_path TO {schema}"))
+            Base.metadata.create_all(connection)
+    except OperationalError:
+        pytest.skip("Postgres is not available")
+    yield schema
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_schema):
+    # NullPool: every test runs its own event loop, so connections must
+    # not outlive it.
+    engine = create_async_engine(
+        settings.get_async_database_url(),
+        poolclass=NullPool,
+        connect_args={"options": f"-csearch_path={db_schema}"},
+    )
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+@pytest.fixture
+def sync_session_factory(db_schema):
+    engine = create_engine(
+        settings.get_database_url(),
+        connect_args={"options": f"-csearch_path={db_schema}"},
+    )
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import io
+import json
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import event, select
+from starlette.datastructures import Headers
+
+from app.api.endpoints import files
+from app.models import File, OutboxMessage, PageResult, Task
+from app.models.task import TaskStatus
+
+ORIGINAL = b"%PDF-1.4\n<< /Type /Page >>\n"
+
+
+@pytest.fixture(autouse=True)
+def storage(monkeypatch):
+    removed = []
+
+    async def upload_file(file, storage_path, bucket_name):
+        return hashlib.sha256(await file.read()).hexdigest()
+
+    async def remove_file(storage_path, bucket_name):
+        removed.append(storage_path)
+
+    monkeypatch.setattr(files.file_storage, "upload_file", upload_file)
+    monkeypatch.setattr(files.file_storage, "remove_file", remove_file)
+    return removed
+
+
+async def seed(session_factory, status, data=ORIGINAL, name="original"):
+    async with session_factory() as db:
+        file = File(
+            filename=f"{name}.pdf",
+            storage_path=f"{name}.pdf",
+            file_type="application/pdf",
+            content_hash=hashlib.sha256(data).hexdigest(),
+            total_pages=2,
+        )
+        task = Task(file=file, status=status)
+        db.add_all(
+            [
+                file,
+                task,
+                *(
+                    PageResult(
+                        task=task,
+                        file=file,
+                        page_number=page,
+                        result_path=f"{name}/page_{page}.json",
+                    )
+                    for page in (1, 2)
+                ),
+            ],
+        )
+        await db.commit()
+        return file
+
+
+async def upload(session_factory, data):
+    file = UploadFile(
+        io.BytesIO(data),
+        size=len(data),
+        filename="scan.pdf",
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+    async with session_factory() as db:
+        response = await files.upload_file(file, db)
+    body = json.loads(response.body)
+    async with session_factory() as db:
+        task = await db.get(Task, body["task_id"])
+        new_file = await db.get(File, task.file_id)
+        pages = (
+            await db.scalars(
+                select(PageResult).where(PageResult.file_id == new_file.id),
+            )
+        ).all()
+        messages = (await db.scalars(select(OutboxMessage))).all()
+    return body, task, new_file, pages, messages
+
+
+def test_duplicate_of_processed_file_reuses_results(session_factory, storage):
+    async def run():
+        original = await seed(session_factory, TaskStatus.COMPLETED)
+        return original, await upload(session_factory, ORIGINAL)
+
+    original, (body, task, new_file, pages, messages) = asyncio.run(run())
+
+    assert body["status"] == TaskStatus.COMPLETED.value
+    assert task.status == TaskStatus.COMPLETED
+    assert new_file.storage_path == original.storage_path
+    assert new_file.total_pages == 2
+    assert sorted((page.page_number, page.result_path) for page in pages) == [
+        (1, "original/page_1.json"),
+        (2, "original/page_2.json"),
+    ]
+    assert all(page.task_id == task.id for page in pages)
+    assert messages == []
+    # The uploaded copy of the blob is dropped in favour of the original.
+    assert storage == [f"{new_file.id}.pdf"]
+
+
+def test_duplicate_of_unprocessed_file_is_enqueued(session_factory, storage):
+    async def run():
+        await seed(session_factory, TaskStatus.PENDING)
+        return await upload(session_factory, ORIGINAL)
+
+    body, task, new_file, pages, messages = asyncio.run(run())
+
+    assert body["status"] == TaskStatus.PENDING.value
+    assert task.status == TaskStatus.PENDING
+    assert new_file.storage_path == f"{new_file.id}.pdf"
+    assert pages == []
+    assert [message.args for message in messages] == [[str(task.id)]]
+    assert storage == []
+
+
+def test_different_content_is_not_deduplicated(session_factory, storage):
+    async def run():
+        await seed(session_factory, TaskStatus.COMPLETED)
+        return await upload(session_factory, ORIGINAL + b"%%EOF\n")
+
+    body, task, new_file, pages, messages = asyncio.run(run())
+
+    assert body["status"] == TaskStatus.PENDING.value
+    assert new_file.storage_path == f"{new_file.id}.pdf"
+    assert pages == []
+    assert [message.args for message in messages] == [[str(task.id)]]
+    assert storage == []
+
+
+def test_batch_copies_duplicate_results_in_one_statement(session_factory):
+    second = b"%PDF-1.4\n<< /Type /Page >>\n%%EOF\n"
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO page_results"):
+            statements.append(statement)
+
+    async def run():
+        await seed(session_factory, TaskStatus.COMPLETED)
+        await seed(session_factory, TaskStatus.COMPLETED, second, "second")
+        uploads = [
+            UploadFile(
+                io.BytesIO(data),
+                size=len(data),
+                filename="scan.pdf",
+                headers=Headers({"content-type": "application/pdf"}),
+            )
+            for data in (ORIGINAL, second, b"%PDF-1.4\nnew\n")
+        ]
+        async with session_factory() as db:
+            event.listen(
+                db.sync_session.bind,
+                "before_cursor_execute",
+                record,
+            )
+            response = await files.upload_files(uploads, db)
+        async with session_factory() as db:
+            pages = (
+                await db.execute(
+                    select(Task.id, PageResult.result_path).join(
+                        PageResult,
+                        PageResult.task_id == Task.id,
+                    ),
+                )
+            ).all()
+        return json.loads(response.body)["results"], pages
+
+    results, pages = asyncio.run(run())
+
+    assert [result["status"] for result in results] == [
+        TaskStatus.COMPLETED.value,
+        TaskStatus.COMPLETED.value,
+        TaskStatus.PENDING.value,
+    ]
+    copied = {
+        (str(task_id), path)
+        for task_id, path in pages
+        if str(task_id) in {results[0]["task_id"], results[1]["task_id"]}
+    }
+    assert copied == {
+        (results[0]["task_id"], "original/page_1.json"),
+        (results[0]["task_id"], "original/page_2.json"),
+        (results[1]["task_id"], "second/page_1.json"),
+        (results[1]["task_id"], "second/page_2.json"),
+    }
+    assert len(statements) == 1
@@ -0,0 +1,133 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+from minio.error import S3Error
+
+from app.models import File, Task
+from app.models.task import TaskStatus
+from app.worker import file_process_worker
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.body = io.BytesIO(data)
+        self.closed = False
+        self.released = False
+
+    def stream(self, amt):
+        while chunk := self.body.read(amt):
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        self.released = True
+
+
+def test_spool_file_maps_source_and_releases_connection(monkeypatch):
+    data = b"%PDF-1.4\n" + b"<< /Type /Page >>\n" * 50
+    response = FakeResponse(data)
+    minio = SimpleNamespace(get_object=lambda bucket, path: response)
+    monkeypatch.setattr(file_process_worker, "get_minio_client", lambda: minio)
+    monkeypatch.setattr(
+        file_process_worker.settings,
+        "WORKER_SPOOL_CHUNK_SIZE",
+        64,
+    )
+    file = SimpleNamespace(storage_path="doc.pdf")
+
+    with file_process_worker.spool_file(file) as source:
+        assert not isinstance(source, bytes)
+        assert source[:] == data
+        assert file_process_worker.ocr_engine.count_pages(
+            source,
+            "application/pdf",
+        ) == 50
+
+    assert response.closed
+    assert response.released
+
+
+def test_spool_file_handles_empty_source(monkeypatch):
+    response = FakeResponse(b"")
+    minio = SimpleNamespace(get_object=lambda bucket, path: response)
+    monkeypatch.setattr(file_process_worker, "get_minio_client", lambda: minio)
+
+    with file_process_worker.spool_file(
+        SimpleNamespace(storage_path="empty.pdf"),
+    ) as source:
+        assert source == b""
+
+    assert response.released
+
+
+@pytest.mark.parametrize(
+    ("pages_per_range", "status"),
+    [([20, 20, 5], TaskStatus.COMPLETED), ([20, 12, 5], TaskStatus.FAILED)],
+)
+def test_finalize_file_fails_incomplete_documents(
+    monkeypatch,
+    sync_session_factory,
+    pages_per_range,
+    status,
+):
+    monkeypatch.setattr(
+        file_process_worker,
+        "SessionLocal",
+        sync_session_factory,
+    )
+    announced = []
+    monkeypatch.setattr(file_process_worker, "announce_status", announced.append)
+    with sync_session_factory() as db:
+        task = Task(
+            file=File(
+                filename="scan.pdf",
+                storage_path="scan.pdf",
+                file_type="application/pdf",
+            ),
+            status=TaskStatus.PROCESSING,
+        )
+        db.add(task)
+        db.commit()
+        task_id = task.id
+
+    file_process_worker.finalize_file(pages_per_range, str(task_id), 45)
+
+    with sync_session_factory() as db:
+        task = db.get(Task, task_id)
+        assert task.status == status
+        assert task.file.total_pages == 45
+        if status == TaskStatus.FAILED:
+            assert task.error_message == "Stored 37 of 45 pages."
+    assert len(announced) == 1
+
+
+@pytest.mark.parametrize(
+    ("code", "error"),
+    [("InternalError", S3Error), ("NoSuchKey", LookupError)],
+)
+def test_download_errors_are_retried_unless_the_source_is_gone(
+    monkeypatch,
+    code,
+    error,
+):
+    def get_object(bucket, path):
+        raise S3Error(None, code, "failed", path, "request", "host")
+
+    monkeypatch.setattr(
+        file_process_worker,
+        "get_minio_client",
+        lambda: SimpleNamespace(get_object=get_object),
+    )
+
+    with pytest.raises(error) as raised:
+        file_process_worker.download_file(
+            SimpleNamespace(storage_path="doc.pdf"),
+            io.BytesIO(),
+        )
+    assert isinstance(
+        raised.value,
+        file_process_worker.RETRYABLE_ERRORS,
+    ) == (code == "InternalError")
@@ -0,0 +1,84 @@
+import asyncio
+import io
+import tracemalloc
+
+from fastapi import UploadFile
+from minio.helpers import read_part_data
+from starlette.datastructures import Headers
+
+from app.services.minio import minio_service
+from app.storage.file_storage import ChunkedReader, FileStorage
+
+MIB = 1024 * 1024
+PART_SIZE = 5 * MIB
+
+
+class ZeroStream(io.RawIOBase):
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        assert whence == io.SEEK_SET
+        self.position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self.size - self.position)
+        buffer[:count] = b"\0" * count
+        self.position += count
+        return count
+
+
+class DiscardingMinio:
+    def __init__(self) -> None:
+        self.received = 0
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        assert length == -1
+        while part := read_part_data(data, kwargs["part_size"]):
+            self.received += len(part)
+
+
+def upload_peak_memory(size: int) -> tuple[int, int]:
+    client = DiscardingMinio()
+    storage = FileStorage(client, part_size=PART_SIZE, chunk_size=MIB)
+    upload = UploadFile(
+        file=ZeroStream(size),
+        filename="scan.pdf",
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+    tracemalloc.start()
+    try:
+        asyncio.run(storage.upload_file(upload, "scan.pdf", "files"))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return client.received, peak
+
+
+def test_chunked_reader_caps_read_size():
+    reader = ChunkedReader(io.BytesIO(b"x" * 10), chunk_size=4)
+    assert reader.read() == b"xxxx"
+    assert reader.read(100) == b"xxxx"
+    assert reader.read(1) == b"x"
+    assert reader.read() == b"x"
+    assert reader.read() == b""
+
+
+def test_upload_memory_stays_flat(monkeypatch):
+    monkeypatch.setattr(minio_service, "_known_buckets", {"files"})
+
+    small_received, small_peak = upload_peak_memory(20 * MIB)
+    large_received, large_peak = upload_peak_memory(400 * MIB)
+
+    assert small_received == 20 * MIB
+    assert large_received == 400 * MIB
+    assert large_peak < 4 * PART_SIZE
+    assert large_peak < small_peak * 1.5
@@ -0,0 +1,57 @@
+from minio.error import S3Error
+
+from app.services.minio import minio_service
+
+
+class CountingMinio:
+    def __init__(self) -> None:
+        self.bucket_checks = 0
+        self.created = []
+
+    def bucket_exists(self, bucket_name):
+        self.bucket_checks += 1
+        return bucket_name not in ("lost", "new")
+
+    def make_bucket(self, bucket_name):
+        self.created.append(bucket_name)
+
+
+def no_such_bucket(bucket_name):
+    return S3Error(
+        None,
+        minio_service.NO_SUCH_BUCKET,
+        "The specified bucket does not exist",
+        f"/{bucket_name}",
+        "request-id",
+        "host-id",
+        bucket_name=bucket_name,
+    )
+
+
+def test_bucket_is_checked_once(monkeypatch):
+    client = CountingMinio()
+    monkeypatch.setattr(minio_service, "minio_client", client)
+    monkeypatch.setattr(minio_service, "_known_buckets", set())
+
+    for _ in range(300):
+        minio_service.run_with_bucket("results", lambda: None)
+
+    assert client.bucket_checks == 1
+    assert client.created == []
+
+
+def test_write_recreates_bucket_on_no_such_bucket(monkeypatch):
+    client = CountingMinio()
+    monkeypatch.setattr(minio_service, "minio_client", client)
+    monkeypatch.setattr(minio_service, "_known_buckets", {"lost"})
+    attempts = []
+
+    def write():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise no_such_bucket("lost")
+        return "ok"
+
+    assert minio_service.run_with_bucket("lost", write) == "ok"
+    assert client.created == ["lost"]
+    assert len(attempts) == 2
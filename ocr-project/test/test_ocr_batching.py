@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.ocr.batching import MicroBatcher
+from app.services.ocr.mock_ocr_engine import MockOcrEngine
+from app.services.ocr.ocr_engine import PageRequest
+from app.services.ocr.ocr_service import recognize_pages
+
+
+class RecordingEngine(MockOcrEngine):
+    def __init__(self):
+        super().__init__(batch_overhead=0.01)
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def recognize(self, pages):
+        with self.lock:
+            self.batch_sizes.append(len(pages))
+        return super().recognize(pages)
+
+
+def pages(count):
+    return [
+        PageRequest(b"%PDF", "application/pdf", number)
+        for number in range(1, count + 1)
+    ]
+
+
+def test_pages_of_concurrent_tasks_share_batches():
+    engine = RecordingEngine()
+    batcher = MicroBatcher(engine, max_batch_size=8, max_wait=0.05)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(batcher.recognize, [pages(3)] * 4))
+
+    assert results == [
+        [f"This is the content of page {number}." for number in (1, 2, 3)],
+    ] * 4
+    assert sum(engine.batch_sizes) == 12
+    assert max(engine.batch_sizes) <= 8
+    assert len(engine.batch_sizes) < 4
+
+
+def test_engine_errors_reach_every_caller():
+    class FailingEngine(MockOcrEngine):
+        def recognize(self, pages):
+            raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(FailingEngine(), max_batch_size=4, max_wait=0)
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.recognize(pages(2))
+
+
+def test_recognize_pages_skips_stored_pages():
+    document = b"%PDF-1.4\n" + b"<< /Type /Page >>\n" * 6
+
+    recognized = recognize_pages(
+        document,
+        "application/pdf",
+        2,
+        6,
+        skip={3, 4},
+    )
+
+    assert [page["page_number"] for page in recognized] == [2, 5, 6]
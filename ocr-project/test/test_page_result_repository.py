@@ -0,0 +1,72 @@
+from app.api.endpoints.results import result_etag
+from app.models import File, PageResult, Task
+from app.repository.page_result_repository import page_result_repo
+
+
+def test_upsert_replaces_location_and_moves_updated_at(sync_session_factory):
+    with sync_session_factory() as db:
+        task = Task(
+            file=File(
+                filename="scan.pdf",
+                storage_path="scan.pdf",
+                file_type="application/pdf",
+            ),
+        )
+        db.add(task)
+        db.commit()
+        row = {
+            "task_id": task.id,
+            "file_id": task.file_id,
+            "page_number": 1,
+            "result_path": f"{task.file_id}/page_1.json",
+            "result_offset": None,
+            "result_length": 40,
+            "search_text": "first pass",
+        }
+        page_result_repo.upsert_many(db, [row])
+        db.commit()
+        first = db.query(PageResult).one()
+        first_etag = result_etag(first)
+        first_updated_at = first.updated_at
+
+        # A retry rewrites the same object with text of the same length.
+        page_result_repo.upsert_many(db, [{**row, "search_text": "retried"}])
+        db.commit()
+        db.expire_all()
+        second = db.query(PageResult).one()
+
+        assert second.updated_at > first_updated_at
+        assert result_etag(second) != first_etag
+
+
+def test_upsert_indexes_the_page_text(sync_session_factory):
+    with sync_session_factory() as db:
+        task = Task(
+            file=File(
+                filename="scan.pdf",
+                storage_path="scan.pdf",
+                file_type="application/pdf",
+            ),
+        )
+        db.add(task)
+        db.commit()
+        row = {
+            "task_id": task.id,
+            "file_id": task.file_id,
+            "page_number": 1,
+            "result_path": f"{task.file_id}/page_1.json",
+            "result_offset": None,
+            "result_length": 40,
+            "search_text": "Quarterly report",
+        }
+        page_result_repo.upsert_many(db, [row])
+        db.commit()
+        first = page_result_repo.search(db, "quarterly", 10)
+
+        # A retry with new text replaces the indexed words too.
+        page_result_repo.upsert_many(db, [{**row, "search_text": "Annual"}])
+        db.commit()
+
+        assert [hit.page_number for hit in first] == [1]
+        assert page_result_repo.search(db, "quarterly", 10) == []
+        assert len(page_result_repo.search(db, "annual", 10)) == 1
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.minio import minio_service
+from app.services.result.result_service import (
+    RangeNotSatisfiableError,
+    ResultService,
+    etag_matches,
+    parse_byte_range,
+    parse_page_range,
+)
+from app.storage.compression import create_codec
+from app.storage.result_storage import ResultStorage
+from test_result_storage import DictMinio
+
+
+def location(page_number, path, offset=None, length=None):
+    return SimpleNamespace(
+        page_number=page_number,
+        result_path=path,
+        result_offset=offset,
+        result_length=length,
+    )
+
+
+def test_parse_page_range():
+    assert parse_page_range("10-20") == (10, 20)
+    assert parse_page_range("7") == (7, 7)
+    with pytest.raises(ValueError):
+        parse_page_range("20-10")
+
+
+def test_parse_byte_range():
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-5", 100) == (95, 99)
+    assert parse_byte_range("bytes=0-1000", 100) == (0, 99)
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_byte_range("bytes=100-", 100)
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('"other"', False),
+        ('W/"abc"', True),
+        ('"other","abc"', True),
+        ('"other" ,  W/"abc"', True),
+        ('"other", "more"', False),
+        ("*", True),
+        ('"abc', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches('"abc"', if_none_match) is expected
+
+
+def test_plan_segments_merges_adjacent_packed_records():
+    service = ResultService(None, "results", prefetch=4, segment_bytes=100)
+    segments = service.plan_segments(
+        [
+            location(1, "f/pages_1-3.jsonl", 0, 40),
+            location(2, "f/pages_1-3.jsonl", 40, 40),
+            location(3, "f/pages_1-3.jsonl", 80, 40),
+            location(4, "f/page_4.json"),
+        ],
+    )
+
+    assert [(s.offset, s.length, s.page_number) for s in segments] == [
+        (0, 80, None),
+        (80, 40, None),
+        (None, None, 4),
+    ]
+
+
+def test_both_storage_formats_stream_the_same_records(monkeypatch):
+    monkeypatch.setattr(minio_service, "_known_buckets", {"results"})
+    storage = ResultStorage(DictMinio(), create_codec("gzip"))
+    pages = [{"page_number": n, "text": f"page {n}"} for n in (1, 2, 3)]
+    index = storage.upload_packed(
+        [json.dumps({**page, "confidence": 0.9}) for page in pages],
+        "f/pages_1-3.jsonl",
+        "results",
+    )
+    for page in pages:
+        storage.upload_result(
+            json.dumps({"text": page["text"]}),
+            f"f/page_{page['page_number']}.json",
+            "results",
+        )
+    service = ResultService(storage, "results", prefetch=2, segment_bytes=100)
+
+    async def stream(locations):
+        return b"".join([data async for data in service.stream_ndjson(locations)])
+
+    packed = asyncio.run(
+        stream(
+            [
+                location(n, "f/pages_1-3.jsonl", offset, length)
+                for n, (offset, length) in enumerate(index, 1)
+            ],
+        ),
+    )
+    per_page = asyncio.run(
+        stream([location(n, f"f/page_{n}.json") for n in (1, 2, 3)]),
+    )
+
+    assert packed == per_page
+    assert [json.loads(line) for line in packed.splitlines()] == pages
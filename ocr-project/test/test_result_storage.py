@@ -0,0 +1,72 @@
+import pytest
+
+from app.services.minio import minio_service
+from app.storage.compression import create_codec
+from app.storage.result_storage import ResultStorage
+
+TEXT = "Tất cả mọi người sinh ra đều được tự do và bình đẳng. " * 20
+
+
+class StoredResponse:
+    def __init__(self, data, headers):
+        self.data = data
+        self.headers = headers
+
+    def read(self, decode_content=True):
+        assert not decode_content
+        return self.data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class DictMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket_name, object_name, data, length, **kwargs):
+        self.objects[object_name] = (data.read(), kwargs.get("metadata"))
+        assert len(self.objects[object_name][0]) == length
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        data, metadata = self.objects[object_name]
+        end = offset + length if length else len(data)
+        return StoredResponse(data[offset:end], metadata or {})
+
+
+@pytest.fixture(autouse=True)
+def known_bucket(monkeypatch):
+    monkeypatch.setattr(minio_service, "_known_buckets", {"results"})
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_non_ascii_result_round_trip(compression):
+    client = DictMinio()
+    storage = ResultStorage(client, create_codec(compression))
+
+    stored = storage.upload_result(TEXT, "page_1.json", "results")
+
+    data, metadata = client.objects["page_1.json"]
+    assert stored == len(data)
+    if compression == "gzip":
+        assert metadata == {"Content-Encoding": "gzip"}
+        assert stored < len(TEXT.encode())
+    assert storage.read_result("page_1.json", "results") == TEXT
+
+
+def test_packed_records_are_readable_alone_and_together():
+    client = DictMinio()
+    storage = ResultStorage(client, create_codec("gzip"))
+
+    index = storage.upload_packed(["one", "two", "three"], "p.jsonl", "results")
+
+    offset, length = index[1]
+    assert storage.read_result("p.jsonl", "results", offset, length) == "two\n"
+    assert storage.read_result("p.jsonl", "results") == "one\ntwo\nthree\n"
+    # Objects written before compression was enabled stay readable.
+    plain = ResultStorage(client)
+    plain.upload_packed(["four"], "old.jsonl", "results")
+    assert storage.read_result("old.jsonl", "results") == "four\n"
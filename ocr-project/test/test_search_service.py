@@ -0,0 +1,223 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models import File, Task
+from app.repository.page_result_repository import page_result_repo
+from app.services.search.search_service import (
+    UUID_SPACE,
+    InvalidCursorError,
+    SearchService,
+    decode_cursor,
+    encode_cursor,
+    scan_bound,
+)
+
+LOW_FILE_ID = uuid.UUID(int=UUID_SPACE // 8)
+HIGH_FILE_ID = uuid.UUID(int=UUID_SPACE // 8 * 7)
+TEXTS = {
+    (LOW_FILE_ID, 1): "The invoice is due in March.",
+    (LOW_FILE_ID, 2): "Nothing to see on this page.",
+    (HIGH_FILE_ID, 1): "A second invoice, paid in April.",
+    (HIGH_FILE_ID, 2): "The last invoice of the year.",
+}
+
+
+class FakeResultStorage:
+    def read_page_text(self, storage_path, bucket_name, offset, length):
+        return TEXTS[uuid.UUID(storage_path.split("/")[0]), length]
+
+
+@pytest.fixture
+def pages(sync_session_factory):
+    # The page number doubles as the fake stored length, which is how
+    # FakeResultStorage finds the text of a page.
+    with sync_session_factory() as db:
+        for file_id in (HIGH_FILE_ID, LOW_FILE_ID):
+            db.add(
+                Task(
+                    file=File(
+                        id=file_id,
+                        filename=f"{file_id}.pdf",
+                        storage_path=f"{file_id}.pdf",
+                        file_type="application/pdf",
+                    ),
+                ),
+            )
+        db.flush()
+        page_result_repo.upsert_many(
+            db,
+            [
+                {
+                    "task_id": db.query(Task.id)
+                    .filter(Task.file_id == file_id)
+                    .scalar(),
+                    "file_id": file_id,
+                    "page_number": page_number,
+                    "result_path": f"{file_id}/page_{page_number}.json",
+                    "result_offset": None,
+                    "result_length": page_number,
+                    "search_text": page_text,
+                }
+                for (file_id, page_number), page_text in TEXTS.items()
+            ],
+        )
+        db.commit()
+        db.execute(text("ANALYZE page_results"))
+        db.commit()
+
+
+def test_cursor_round_trip():
+    file_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(file_id, 12)) == (file_id, 12)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm9wZQ==", "YTox"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_scan_bound():
+    start = uuid.UUID(int=UUID_SPACE // 4)
+
+    assert scan_bound(None, 1000, 100) == uuid.UUID(int=UUID_SPACE // 10)
+    assert scan_bound(start, 1000, 500) == uuid.UUID(int=UUID_SPACE // 4 * 3)
+    assert scan_bound(start, 1000, 800) is None
+    # A table that was never analyzed has no row estimate.
+    assert scan_bound(None, -1, 100) is None
+
+
+@pytest.mark.usefixtures("pages")
+def test_search_orders_and_bounds_hits(sync_session_factory):
+    with sync_session_factory() as db:
+        hits = page_result_repo.search(db, "invoice", 10)
+        after = page_result_repo.search(
+            db,
+            "invoice",
+            10,
+            after=(HIGH_FILE_ID, 1),
+        )
+        before = page_result_repo.search(
+            db,
+            "invoice",
+            10,
+            before=HIGH_FILE_ID,
+        )
+        phrase = page_result_repo.search(db, '"second invoice"', 10)
+
+    assert [(hit.file_id, hit.page_number) for hit in hits] == [
+        (LOW_FILE_ID, 1),
+        (HIGH_FILE_ID, 1),
+        (HIGH_FILE_ID, 2),
+    ]
+    assert hits[0].filename == f"{LOW_FILE_ID}.pdf"
+    assert [(hit.file_id, hit.page_number) for hit in after] == [
+        (HIGH_FILE_ID, 2),
+    ]
+    assert [(hit.file_id, hit.page_number) for hit in before] == [
+        (LOW_FILE_ID, 1),
+    ]
+    assert [(hit.file_id, hit.page_number) for hit in phrase] == [
+        (HIGH_FILE_ID, 1),
+    ]
+
+
+def test_headlines_mark_the_matches(sync_session_factory):
+    with sync_session_factory() as db:
+        snippets = page_result_repo.headlines(
+            db,
+            "invoice",
+            [TEXTS[LOW_FILE_ID, 1], TEXTS[HIGH_FILE_ID, 2]],
+        )
+
+    # Fragments are cut around the matches.
+    assert snippets == [
+        "<b>invoice</b> is due in March",
+        "last <b>invoice</b> of the year",
+    ]
+
+
+async def _search(session_factory, query, limit, cursor=None):
+    service = SearchService(FakeResultStorage(), "results")
+    async with session_factory() as db:
+        return await service.search(db, query, limit, cursor)
+
+
+@pytest.mark.usefixtures("pages")
+def test_search_pages_through_the_scan_bounds(session_factory, monkeypatch):
+    # Two of the four rows per range and one range per request: each
+    # request covers half of the id space, one file.
+    monkeypatch.setattr(settings, "SEARCH_SCAN_ROWS", 2)
+    monkeypatch.setattr(settings, "SEARCH_SCAN_BUDGET_ROWS", 2)
+
+    first = asyncio.run(_search(session_factory, "invoice", 1))
+    second = asyncio.run(
+        _search(session_factory, "invoice", 1, first["next_cursor"]),
+    )
+    third = asyncio.run(
+        _search(session_factory, "invoice", 1, second["next_cursor"]),
+    )
+
+    assert first["hits"] == [
+        {
+            "file_id": str(LOW_FILE_ID),
+            "filename": f"{LOW_FILE_ID}.pdf",
+            "task_id": first["hits"][0]["task_id"],
+            "page_number": 1,
+            "snippet": "<b>invoice</b> is due in March",
+        },
+    ]
+    # The budget ran out before a second hit; the cursor moves on to the
+    # second half rather than to the last hit.
+    assert decode_cursor(first["next_cursor"]) == (
+        uuid.UUID(int=UUID_SPACE // 2),
+        0,
+    )
+    assert [hit["page_number"] for hit in second["hits"]] == [1]
+    assert decode_cursor(second["next_cursor"]) == (HIGH_FILE_ID, 1)
+    assert [hit["page_number"] for hit in third["hits"]] == [2]
+    assert third["next_cursor"] is None
+
+
+@pytest.mark.usefixtures("pages")
+def test_search_finds_a_rare_term_in_one_request(
+    session_factory,
+    monkeypatch,
+):
+    # A range per quarter of the id space; the only match sits in the last.
+    monkeypatch.setattr(settings, "SEARCH_SCAN_ROWS", 1)
+
+    result = asyncio.run(_search(session_factory, "april", 10))
+
+    assert [
+        (hit["file_id"], hit["page_number"]) for hit in result["hits"]
+    ] == [(str(HIGH_FILE_ID), 1)]
+    assert result["next_cursor"] is None
+
+
+@pytest.mark.usefixtures("pages")
+def test_search_returns_a_cursor_when_the_budget_runs_out(
+    session_factory,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "SEARCH_SCAN_ROWS", 1)
+    monkeypatch.setattr(settings, "SEARCH_SCAN_BUDGET_ROWS", 2)
+
+    first = asyncio.run(_search(session_factory, "april", 10))
+    second = asyncio.run(
+        _search(session_factory, "april", 10, first["next_cursor"]),
+    )
+
+    # Two quarters scanned, no hit: the cursor resumes at the third.
+    assert first["hits"] == []
+    assert decode_cursor(first["next_cursor"]) == (
+        uuid.UUID(int=UUID_SPACE // 2),
+        0,
+    )
+    assert [hit["page_number"] for hit in second["hits"]] == [1]
+    assert second["next_cursor"] is None
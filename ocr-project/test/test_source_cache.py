@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from app.cache.source_cache import SourceCache
+
+
+def fetcher(data, calls):
+    def fetch(target):
+        calls.append(data)
+        target.write(data)
+
+    return fetch
+
+
+def test_second_open_is_served_from_cache(tmp_path):
+    cache = SourceCache(str(tmp_path), max_bytes=1024)
+    calls = []
+
+    for _ in range(2):
+        with cache.open("a" * 64, fetcher(b"document", calls)) as source:
+            assert source.read() == b"document"
+
+    assert calls == [b"document"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SourceCache(str(tmp_path), max_bytes=20)
+    calls = []
+
+    for key in ("aa", "bb"):
+        with cache.open(key, fetcher(b"x" * 8, calls)):
+            pass
+    # Make "bb" the older entry, as if "aa" had just been read.
+    os.utime(tmp_path / "objects" / "bb", (0, 0))
+    with cache.open("cc", fetcher(b"y" * 8, calls)):
+        pass
+
+    assert sorted(os.listdir(tmp_path / "objects")) == ["aa", "cc"]
+
+
+def test_oversized_files_are_not_cached(tmp_path):
+    cache = SourceCache(str(tmp_path), max_bytes=4)
+    calls = []
+
+    for _ in range(2):
+        with cache.open("aa", fetcher(b"too large", calls)) as source:
+            assert source.read() == b"too large"
+
+    assert len(calls) == 2
+    assert not os.listdir(tmp_path / "objects")
+    assert not os.listdir(tmp_path / "downloads")
+
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    cache = SourceCache(str(tmp_path), max_bytes=1024)
+
+    def fetch(target):
+        target.write(b"partial")
+        raise RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError), cache.open("aa", fetch):
+        pass
+
+    assert not os.listdir(tmp_path / "objects")
+    assert not os.listdir(tmp_path / "downloads")
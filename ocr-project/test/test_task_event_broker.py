@@ -0,0 +1,152 @@
+import asyncio
+import contextlib
+import json
+import uuid
+
+from redis.exceptions import ConnectionError
+
+from app.services.events.event_service import (
+    CHANNEL_PREFIX,
+    PROGRESS_EVENT,
+    RETRY_EVENT,
+    STATUS_EVENT,
+    TaskEventBroker,
+)
+
+TASK_ID = uuid.uuid4()
+COMPLETED = {"task_id": str(TASK_ID), "status": "completed"}
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def connect(self):
+        self.redis.connects += 1
+        if self.redis.down:
+            raise ConnectionError
+
+    async def subscribe(self, *channels):
+        self.redis.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.redis.channels.difference_update(channels)
+
+    async def get_message(self, timeout):
+        message = await self.redis.messages.get()
+        if isinstance(message, Exception):
+            raise message
+        return message
+
+
+class FakeRedis:
+    def __init__(self, messages=(), *, down=False):
+        self.messages = asyncio.Queue()
+        for message in messages:
+            self.messages.put_nowait(message)
+        self.down = down
+        self.connects = 0
+        self.channels = set()
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakeStatusCache:
+    async def read_many(self, task_ids):
+        return {TASK_ID: COMPLETED} if TASK_ID in task_ids else {}
+
+
+def progress(pages_done):
+    return {
+        "type": "message",
+        "channel": f"{CHANNEL_PREFIX}{TASK_ID}".encode(),
+        "data": json.dumps(
+            {"event": PROGRESS_EVENT, "data": {"pages_done": pages_done}},
+        ),
+    }
+
+
+async def receive(messages, *, reconnect):
+    # The connection drops once the messages are read.
+    redis = FakeRedis([*messages, ConnectionError()])
+    broker = TaskEventBroker(redis, 2, FakeStatusCache(), 0, 0)
+    queue = asyncio.Queue(2)
+    broker.subscribers[str(TASK_ID)].add(queue)
+    with contextlib.suppress(ConnectionError):
+        await broker._read(reconnect=reconnect)
+    while broker.resyncs:
+        await next(iter(broker.resyncs.values()))
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_reconnect_sends_the_cached_status():
+    events = asyncio.run(receive([], reconnect=True))
+
+    assert events == [{"event": STATUS_EVENT, "data": COMPLETED}]
+
+
+def test_dropped_events_are_made_up_with_the_cached_status():
+    events = asyncio.run(
+        receive([progress(n) for n in (1, 2, 3)], reconnect=False),
+    )
+
+    assert events[-1] == {"event": STATUS_EVENT, "data": COMPLETED}
+
+
+def test_no_resync_without_loss():
+    unwatched = {
+        "type": "message",
+        "channel": f"{CHANNEL_PREFIX}{uuid.uuid4()}".encode(),
+        "data": "not decoded",
+    }
+
+    events = asyncio.run(
+        receive([unwatched, progress(1)], reconnect=False),
+    )
+
+    assert [event["event"] for event in events] == [PROGRESS_EVENT]
+
+
+def test_subscribes_to_watched_tasks_only():
+    redis = FakeRedis()
+    broker = TaskEventBroker(redis, 2, FakeStatusCache(), 0, 0)
+    other_id = uuid.uuid4()
+
+    async def watch():
+        async with broker.subscribe(TASK_ID):
+            async with broker.subscribe(other_id):
+                both = set(redis.channels)
+            one = set(redis.channels)
+        await broker.close()
+        return both, one
+
+    both, one = asyncio.run(watch())
+
+    assert both == {
+        f"{CHANNEL_PREFIX}{TASK_ID}",
+        f"{CHANNEL_PREFIX}{other_id}",
+    }
+    assert one == {f"{CHANNEL_PREFIX}{TASK_ID}"}
+    assert redis.channels == set()
+
+
+def test_streams_end_with_a_retry_hint_when_redis_stays_down():
+    redis = FakeRedis(down=True)
+    broker = TaskEventBroker(redis, 2, FakeStatusCache(), 2, 0.001)
+
+    async def watch():
+        async with broker.subscribe(TASK_ID) as queue:
+            return queue.get_nowait()
+
+    event = asyncio.run(watch())
+
+    # Two retries, waiting 1ms and 2ms; the client is told to wait 4ms.
+    assert redis.connects == 3
+    assert event == {"event": RETRY_EVENT, "data": {"retry": 4}}
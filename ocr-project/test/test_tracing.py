@@ -0,0 +1,47 @@
+import pytest
+
+from app.core.tracing import (
+    ENQUEUED_AT,
+    TRACEPARENT,
+    SpanContext,
+    SpanExporter,
+    Tracer,
+)
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_traceparent_round_trip():
+    context = SpanContext("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331")
+
+    assert SpanContext.from_traceparent(context.traceparent) == context
+    assert SpanContext.from_traceparent("00-not-a-trace-01") is None
+    assert SpanContext.from_traceparent(None) is None
+
+
+def test_nested_spans_share_the_trace_and_record_errors():
+    exporter = RecordingExporter()
+    tracer = Tracer(exporter, enabled=True)
+    parent = SpanContext("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331")
+
+    with tracer.span("request", parent) as request:
+        with pytest.raises(RuntimeError), tracer.span("db"):
+            raise RuntimeError("boom")
+        headers = tracer.inject()
+
+    db, outer = exporter.spans
+    assert outer is request
+    assert outer.parent_id == parent.span_id
+    assert db.parent_id == outer.context.span_id
+    assert db.context.trace_id == parent.trace_id
+    assert db.error == "RuntimeError: boom"
+    assert outer.error is None
+    assert headers[TRACEPARENT] == outer.context.traceparent
+    assert ENQUEUED_AT in headers
+    assert tracer.current() is None